@@ -0,0 +1,97 @@
+"""Recall and latency of the IVF-PQ index against a brute-force scan.
+
+    python benchmarks/bench_database.py --n 1000000 --dim 64 --probes 4 8 16 32
+
+Vectors are unit-length draws around random cluster centres, like the
+spectrum embeddings of :func:`spectranova.database.embed_spectra`.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from spectranova.database.index import IVFPQIndex, exact_search
+
+
+def dataset(rng, n, dim, clusters, block=1 << 20):
+    centres = rng.standard_normal((clusters, dim)).astype(np.float32)
+    x = np.empty((n, dim), dtype=np.float32)
+    for start in range(0, n, block):
+        rows = min(block, n - start)
+        chunk = centres[rng.integers(clusters, size=rows)] + 0.5 * rng.standard_normal((rows, dim), dtype=np.float32)
+        x[start:start + rows] = chunk / np.linalg.norm(chunk, axis=1, keepdims=True)
+    return x
+
+
+def latencies(func, queries):
+    times = []
+    for q in queries:
+        start = time.perf_counter()
+        func(q[None, :])
+        times.append(time.perf_counter() - start)
+    return 1e3 * np.array(times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=64)
+    parser.add_argument("--clusters", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--lists", type=int, default=None, help="inverted lists (default: 2 * sqrt(n))")
+    parser.add_argument("--subvectors", type=int, default=16)
+    parser.add_argument("--probes", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--rerank", type=int, default=8, help="re-rank rerank * k candidates exactly (0: off)")
+    parser.add_argument("--brute-queries", type=int, default=20, help="queries timed with the brute-force scan")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    x = dataset(rng, args.n, args.dim, args.clusters)
+    queries = x[rng.choice(args.n, args.queries, replace=False)]
+    queries = queries + 0.1 * rng.standard_normal(queries.shape, dtype=np.float32)
+    n_lists = args.lists or int(2 * np.sqrt(args.n))
+
+    start = time.perf_counter()
+    index = IVFPQIndex(args.dim, n_lists, args.subvectors)
+    sample = x[np.sort(rng.choice(args.n, min(args.n, index.train_rows), replace=False))]
+    index.train(sample)
+    train_s = time.perf_counter() - start
+    start = time.perf_counter()
+    index.add(x)
+    add_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    _, truth = exact_search(x, queries, args.k)
+    batch_brute_s = time.perf_counter() - start
+    brute_ms = latencies(lambda q: exact_search(x, q, args.k), queries[:args.brute_queries])
+    build = {"n": args.n, "dim": args.dim, "n_lists": n_lists, "subvectors": args.subvectors,
+             "train_s": train_s, "add_s": add_s, "index_bytes": int(index.codes.nbytes + index.ids.nbytes),
+             "brute_p50_ms": float(np.percentile(brute_ms, 50)), "brute_batch_s": batch_brute_s}
+    print("  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in build.items()))
+
+    def lookup(ids):
+        return x[ids]
+
+    results = []
+    for n_probe in args.probes:
+        def search(q):
+            return index.search(q, args.k, n_probe, args.rerank or None, lookup)
+
+        _, found = search(queries)
+        recall = np.mean([len(set(a) & set(b)) / args.k for a, b in zip(truth, found)])
+        ms = latencies(search, queries)
+        row = {"n_probe": n_probe, "recall": float(recall), "p50_ms": float(np.percentile(ms, 50)),
+               "p99_ms": float(np.percentile(ms, 99)), "speedup": build["brute_p50_ms"] / float(np.percentile(ms, 50))}
+        results.append(row)
+        print("  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in row.items()))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"build": build, "search": results}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Write and read throughput of the feature store against feature CSVs.
+
+    python benchmarks/bench_feature_store.py --rows 1000000 --chunk 4096
+
+Rows are appended in runner-sized chunks through each writer, then read
+back in full (CSV parsing against store range reads) and as one column
+projection.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from spectranova.core.parallel import CSVFeatureWriter
+from spectranova.ml.features import FEATURE_NAMES
+from spectranova.ml.store import FeatureStore, FeatureStoreWriter
+from spectranova.ml.training import iter_feature_csv
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def write(writer, rows, keys, chunk):
+    for lo in range(0, len(rows), chunk):
+        writer.write(keys[lo:lo + chunk], rows[lo:lo + chunk])
+    writer.close()
+
+
+def disk_bytes(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--chunk", type=int, default=4096, help="rows per writer call")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    rows = rng.standard_normal((args.rows, len(FEATURE_NAMES))).astype(np.float32)
+    keys = [f"spectra/class{i % 8}/{i:08d}.npy" for i in range(args.rows)]
+    column = FEATURE_NAMES[0]
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, store_path = os.path.join(tmp, "f.csv"), os.path.join(tmp, "f.store")
+        csv_write, _ = timed(lambda: write(CSVFeatureWriter(csv_path, FEATURE_NAMES), rows, keys, args.chunk))
+        store_write, _ = timed(lambda: write(FeatureStoreWriter(store_path, FEATURE_NAMES), rows, keys, args.chunk))
+        csv_read, _ = timed(lambda: sum(len(p) for p, _ in iter_feature_csv(csv_path)))
+        store_read, _ = timed(lambda: sum(len(k) for k, _ in FeatureStore(store_path).iter_chunks()))
+        store_column, _ = timed(lambda: float(FeatureStore(store_path).column(column).sum()))
+        result = {
+            "rows": args.rows,
+            "columns": len(FEATURE_NAMES),
+            "csv_mb": disk_bytes(csv_path) / 2 ** 20,
+            "store_mb": disk_bytes(store_path) / 2 ** 20,
+            "csv_write_rows_per_s": args.rows / csv_write,
+            "store_write_rows_per_s": args.rows / store_write,
+            "csv_read_rows_per_s": args.rows / csv_read,
+            "store_read_rows_per_s": args.rows / store_read,
+            "store_column_rows_per_s": args.rows / store_column,
+        }
+    print("  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in result.items()))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(result, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Import-time and CLI start-up benchmark.
+
+Each target runs in a fresh interpreter; the median and minimum wall time
+over ``--repeat`` runs are reported, optionally as JSON.
+
+    python benchmarks/bench_import.py --repeat 20 --json import_times.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS = ("spectral_analysis.py", "wavelet_analysis.py", "batch_analyse.py", "train_classifier.py")
+
+TARGETS = {
+    "python": [sys.executable, "-c", "pass"],
+    "import spectranova": [sys.executable, "-c", "import spectranova"],
+    "import spectranova.signal": [sys.executable, "-c", "import spectranova.signal"],
+    "spectranova.compute_fft": [sys.executable, "-c", "import spectranova; spectranova.compute_fft"],
+    "spectranova.extract_features": [sys.executable, "-c", "import spectranova; spectranova.extract_features"],
+}
+TARGETS.update({f"scripts/{name} --help": [sys.executable, os.path.join(ROOT, "scripts", name), "--help"]
+                for name in SCRIPTS})
+
+
+def time_command(cmd, repeat, env):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(cmd, env=env, check=True, stdout=subprocess.DEVNULL)
+        samples.append(time.perf_counter() - start)
+    return {"median_ms": 1e3 * statistics.median(samples), "min_ms": 1e3 * min(samples), "repeat": repeat}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [os.path.join(ROOT, "src"), env.get("PYTHONPATH")]))
+    results = {name: time_command(cmd, args.repeat, env) for name, cmd in TARGETS.items()}
+    for name, r in results.items():
+        print(f"{name:40s} median {r['median_ms']:8.1f} ms   min {r['min_ms']:8.1f} ms")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Per-call overhead of the stage instrumentation.
+
+    python benchmarks/bench_instrument.py --samples 256
+
+Times a small ``compute_fft`` call (where fixed overhead matters most)
+and a no-op instrumented function unwrapped, wrapped but disabled,
+enabled, and enabled with memory tracking.
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from spectranova.core import instrument
+from spectranova.signal.fourier import compute_fft
+
+
+@instrument.instrumented("noop")
+def noop(x):
+    return x
+
+
+def per_call(func, args, kwargs, repeat, number):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func(*args, **kwargs)
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", type=int, default=256)
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    x = np.random.default_rng(0).standard_normal(args.samples)
+    results = []
+    for name, func, call_args, kwargs in (("noop", noop, (x,), {}),
+                                          ("fft", compute_fft, (x, 1000.0), {"cache": False})):
+        row = {"case": name}
+        # The disk_cached layer below needs its cache= keyword, so unwrap one level only.
+        row["bare_us"] = 1e6 * per_call(func.__wrapped__, call_args, kwargs, args.repeat, args.number)
+        for mode, memory in (("disabled", None), ("enabled", False), ("memory", True)):
+            instrument.disable()
+            if memory is not None:
+                instrument.enable(memory=memory)
+            row[f"{mode}_us"] = 1e6 * per_call(func, call_args, kwargs, args.repeat, args.number)
+        instrument.disable()
+        row["disabled_overhead_ns"] = 1e3 * (row["disabled_us"] - row["bare_us"])
+        row["enabled_overhead_us"] = row["enabled_us"] - row["bare_us"]
+        results.append(row)
+        print("  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in row.items()))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Per-spectrum cost of batch peak detection and catalog line matching.
+
+    python benchmarks/bench_lines.py --lines 1000000 --spectra 64 --peaks 300
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from spectranova.signal.lines import LineCatalog, doppler_factor
+from spectranova.signal.peaks import find_peaks_batch
+
+
+def timed(func, *args, repeat=5, **kwargs):
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=1_000_000, help="catalog size")
+    parser.add_argument("--spectra", type=int, default=64, help="spectra per batch")
+    parser.add_argument("--bins", type=int, default=65536)
+    parser.add_argument("--peaks", type=int, default=300, help="lines present in each spectrum")
+    parser.add_argument("--velocity", type=float, default=25e3, help="radial velocity of the source (m/s)")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    lo, hi = 1e9, 2e9
+    rest = rng.uniform(lo, hi, args.lines)
+    start = time.perf_counter()
+    catalog = LineCatalog(rest, widths=np.full(args.lines, 500.0))
+    build_s = time.perf_counter() - start
+
+    freqs = np.linspace(lo, hi, args.bins)
+    step = freqs[1] - freqs[0]
+    spectra = 1e-3 * rng.random((args.spectra, args.bins))
+    for row in spectra:
+        centres = catalog.freqs[rng.choice(args.lines, args.peaks, replace=False)] * doppler_factor(args.velocity)
+        row += np.exp(-0.5 * ((freqs[None, :] - centres[:, None]) / (1.5 * step)) ** 2).sum(axis=0)
+
+    detect_s, peaks = timed(find_peaks_batch, freqs, spectra, snr=20.0, distance=2)
+    match_s, matches = timed(catalog.match, peaks, tolerance=0.1 * step, velocity=args.velocity, best=True)
+    first = slice(peaks.offsets[0], peaks.offsets[1])
+    single_s, _ = timed(catalog.match, peaks.freqs[first], tolerance=0.1 * step, velocity=args.velocity, best=True)
+    result = {
+        "lines": args.lines,
+        "spectra": args.spectra,
+        "bins": args.bins,
+        "peaks_per_spectrum": float(np.diff(peaks.offsets).mean()),
+        "identified_fraction": matches.peak.size / max(peaks.freqs.size, 1),
+        "catalog_build_s": build_s,
+        "detect_ms_per_spectrum": 1e3 * detect_s / args.spectra,
+        "match_ms_per_spectrum": 1e3 * match_s / args.spectra,
+        "match_ms_single_spectrum": 1e3 * single_s,
+    }
+    print("  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in result.items()))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(result, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Read throughput of the block loaders against whole-file reads.
+
+    python benchmarks/bench_loaders.py --mb 256 --csv-rows 2000000
+
+Each format is written to a temporary directory and read twice, once
+through ``iter_blocks`` and once the naive way (``wave`` frames,
+``np.fromfile``, ``np.loadtxt``).  Throughput is file bytes per second
+with the file in the page cache; peak memory is from a separate
+tracemalloc run.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+import wave
+
+import numpy as np
+
+from spectranova.core.loaders import iter_blocks
+
+
+def consume(blocks):
+    # Touch every sample so mapped pages are really read.
+    total = 0.0
+    for block in blocks:
+        total += float(np.add.reduce(block, axis=None))
+    return total
+
+
+def measure(func):
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    # Traced separately: tracemalloc slows the parser's small allocations.
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return seconds, peak
+
+
+def read_wave(path):
+    with wave.open(path, "rb") as wf:
+        raw = wf.readframes(wf.getnframes())
+    return np.frombuffer(raw, dtype=np.int16) / 32768.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=int, default=256, help="size of the WAV and raw files")
+    parser.add_argument("--csv-rows", type=int, default=2_000_000)
+    parser.add_argument("--block", type=int, default=1 << 20, help="samples per block")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        n = args.mb * 2 ** 20 // 4
+        pcm = rng.integers(-2 ** 15, 2 ** 15, (n, 2), dtype=np.int16)
+        wav_path = os.path.join(tmp, "s.wav")
+        with wave.open(wav_path, "wb") as wf:
+            wf.setnchannels(2)
+            wf.setsampwidth(2)
+            wf.setframerate(48000)
+            wf.writeframes(pcm.tobytes())
+        raw_path = os.path.join(tmp, "s.raw")
+        rng.standard_normal(n).astype("<f4").tofile(raw_path)
+        csv_path = os.path.join(tmp, "s.csv")
+        np.savetxt(csv_path, rng.standard_normal((args.csv_rows, 2)), delimiter=",", fmt="%.9g")
+        del pcm
+
+        cases = [
+            ("wav", wav_path, lambda: consume(iter_blocks(wav_path, args.block)),
+             lambda: float(read_wave(wav_path).sum())),
+            ("wav_raw", wav_path, lambda: consume(iter_blocks(wav_path, args.block, raw=True)), None),
+            ("raw", raw_path, lambda: consume(iter_blocks(raw_path, args.block, dtype="<f4")),
+             lambda: float(np.fromfile(raw_path, dtype="<f4").astype(float).sum())),
+            ("csv", csv_path, lambda: consume(iter_blocks(csv_path, args.block)),
+             lambda: float(np.loadtxt(csv_path, delimiter=",").sum())),
+        ]
+        for name, path, blocked, naive in cases:
+            size = os.path.getsize(path)
+            blocked()  # warm the page cache
+            seconds, peak = measure(blocked)
+            row = {"case": name, "file_mb": size / 2 ** 20, "blocks_gb_s": size / seconds / 1e9,
+                   "blocks_peak_mb": peak / 2 ** 20}
+            if naive is not None:
+                seconds, peak = measure(naive)
+                row.update(naive_gb_s=size / seconds / 1e9, naive_peak_mb=peak / 2 ** 20)
+            results.append(row)
+            print("  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in row.items()))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Accuracy and speed of the fast Lomb-Scargle against the direct sums.
+
+    python benchmarks/bench_lombscargle.py --sizes 1000 10000 100000 --n-freq 100000
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from spectranova.signal.lombscargle import lombscargle, lombscargle_batch
+
+# Largest N * F evaluated with the direct method.
+DIRECT_LIMIT = 2e9
+
+
+def light_curve(rng, n):
+    t = np.sort(rng.uniform(0.0, 1000.0, n))
+    y = np.sin(2 * np.pi * 0.37 * t) + 0.5 * rng.standard_normal(n)
+    return t, y, rng.uniform(0.5, 1.5, n)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--n-freq", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=64, help="curves in the batched-mode run")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    grid = dict(f0=1e-3, df=1e-3 * 1000 / args.n_freq, n_freq=args.n_freq)
+    results = []
+    for n in args.sizes:
+        t, y, dy = light_curve(rng, n)
+        fast_s, (_, fast) = timed(lombscargle, t, y, dy, **grid)
+        row = {"n": n, "n_freq": args.n_freq, "fast_s": fast_s}
+        if n * args.n_freq <= DIRECT_LIMIT:
+            direct_s, (_, direct) = timed(lombscargle, t, y, dy, method="direct", **grid)
+            row.update(direct_s=direct_s, speedup=direct_s / fast_s, max_abs_error=float(np.max(np.abs(fast - direct))))
+        results.append(row)
+        print("  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in row.items()))
+
+    curves = [light_curve(rng, 2000) for _ in range(args.batch)]
+    times, values, errors = zip(*curves)
+    batch_s, _ = timed(lombscargle_batch, times, values, errors, **grid)
+    loop_s, _ = timed(lambda: [lombscargle(t, y, dy, **grid) for t, y, dy in curves])
+    batch = {"curves": args.batch, "batch_s": batch_s, "loop_s": loop_s}
+    print("  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in batch.items()))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump({"single": results, "batch": batch}, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
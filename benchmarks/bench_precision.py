@@ -0,0 +1,87 @@
+"""Peak memory and speed of single against double precision transforms.
+
+    python benchmarks/bench_precision.py --n 1048576 --scales 64 --batch 512
+
+Inputs are 16-bit integer samples; peak memory is measured with
+tracemalloc, which sees NumPy's array allocations.
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from spectranova.ml.features import extract_features_batch
+from spectranova.signal.fourier import compute_fft
+from spectranova.signal.spectrogram import compute_spectrogram
+from spectranova.signal.welch import compute_welch
+from spectranova.wavelet.cwt import compute_cwt
+
+
+def measure(func, repeat):
+    func()  # warm plan, window and filter-bank caches
+    tracemalloc.start()
+    result = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best, peak, result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--n", type=int, default=1 << 20, help="samples per signal")
+    parser.add_argument("--fs", type=float, default=48000.0)
+    parser.add_argument("--nperseg", type=int, default=1024)
+    parser.add_argument("--scales", type=int, default=64)
+    parser.add_argument("--cwt-n", type=int, default=1 << 17, help="samples in the CWT input")
+    parser.add_argument("--batch", type=int, default=512, help="frames in the feature batch")
+    parser.add_argument("--frame", type=int, default=4096)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    x = (8000 * np.sin(2 * np.pi * 440 * np.arange(args.n) / args.fs)
+         + 1000 * rng.standard_normal(args.n)).astype(np.int16)
+    frames = x[:args.batch * args.frame].reshape(-1, args.frame)
+    cases = {
+        "fft": (lambda p: compute_fft(x, args.fs, precision=p, cache=False), 1),
+        "welch": (lambda p: compute_welch(x, args.fs, nperseg=args.nperseg, precision=p, cache=False), 1),
+        "spectrogram": (lambda p: compute_spectrogram(x, args.fs, nperseg=args.nperseg, precision=p,
+                                                      cache=False), 2),
+        "cwt": (lambda p: compute_cwt(x[:args.cwt_n], scales=args.scales, fs=args.fs, precision=p,
+                                      cache=False), 1),
+        "features": (lambda p: extract_features_batch(frames, args.fs, precision=p), 0),
+    }
+    results = []
+    for name, (func, index) in cases.items():
+        double_s, double_peak, double = measure(lambda: func("double"), args.repeat)
+        single_s, single_peak, single = measure(lambda: func("single"), args.repeat)
+        double, single = double[index], single[index]
+        row = {
+            "case": name,
+            "dtype": str(single.dtype),
+            "double_s": double_s,
+            "single_s": single_s,
+            "speedup": double_s / single_s,
+            "double_peak_mb": double_peak / 2**20,
+            "single_peak_mb": single_peak / 2**20,
+            "memory_ratio": single_peak / double_peak,
+            "max_rel_error": float(np.max(np.abs(single - double)) / np.max(np.abs(double))),
+        }
+        results.append(row)
+        print("  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in row.items()))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Time and allocations per call of the preprocessing kernels.
+
+    python benchmarks/bench_preprocess.py --signals 256 --samples 16384 --dtype float32
+
+Each kernel writes into a preallocated ``out`` and is compared with the
+usual NumPy expression (``scipy.signal.detrend`` for detrending, when
+SciPy is installed).  Allocation peaks are measured with tracemalloc on
+a separate call.
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+import numpy as np
+
+from spectranova.core.utils import apply_window, demean, detrend, minmax_scale, normalize_signal, preprocess, zscore
+from spectranova.signal.window import get_window_info
+
+
+def naive_detrend(x):
+    try:
+        from scipy.signal import detrend as scipy_detrend
+    except ImportError:
+        t = np.arange(x.shape[-1])
+        coeffs = np.polynomial.polynomial.polyfit(t, x.T, 1)
+        return x - np.polynomial.polynomial.polyval(t, coeffs)
+    return scipy_detrend(x, axis=-1)
+
+
+def measure(func, repeat):
+    func()
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--signals", type=int, default=256)
+    parser.add_argument("--samples", type=int, default=16384)
+    parser.add_argument("--dtype", default="float32", choices=("float32", "float64"))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    x = (rng.standard_normal((args.signals, args.samples)) + np.linspace(0, 3, args.samples)).astype(args.dtype)
+    out = np.empty_like(x)
+    win = get_window_info("hann", args.samples).window
+    cases = {
+        "normalize": (lambda: normalize_signal(x, out=out), lambda: x / np.max(np.abs(x), axis=-1, keepdims=True)),
+        "demean": (lambda: demean(x, out=out), lambda: x - x.mean(axis=-1, keepdims=True)),
+        "zscore": (lambda: zscore(x, out=out),
+                   lambda: (x - x.mean(axis=-1, keepdims=True)) / x.std(axis=-1, keepdims=True)),
+        "minmax": (lambda: minmax_scale(x, out=out),
+                   lambda: (x - x.min(axis=-1, keepdims=True)) / np.ptp(x, axis=-1, keepdims=True)),
+        "detrend": (lambda: detrend(x, 1, out=out), lambda: naive_detrend(x)),
+        "window": (lambda: apply_window(x, "hann", out=out), lambda: x * win),
+        "chain": (lambda: preprocess(x, 1, "zscore", "hann", out=out),
+                  lambda: naive_detrend(x) / naive_detrend(x).std(axis=-1, keepdims=True) * win),
+    }
+    results = []
+    for name, (kernel, naive) in cases.items():
+        kernel_s, kernel_peak = measure(kernel, args.repeat)
+        naive_s, naive_peak = measure(naive, args.repeat)
+        row = {
+            "case": name,
+            "kernel_ms": 1e3 * kernel_s,
+            "naive_ms": 1e3 * naive_s,
+            "kernel_alloc_mb": kernel_peak / 2**20,
+            "naive_alloc_mb": naive_peak / 2**20,
+            "array_mb": x.nbytes / 2**20,
+        }
+        results.append(row)
+        print("  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in row.items()))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""End-to-end latency of the streaming pipeline on a replayed recording.
+
+    python benchmarks/bench_stream.py --channels 64 --fs 20000 --block 256 --seconds 10
+"""
+
+import argparse
+import json
+
+import numpy as np
+
+from spectranova.ml.anomaly import SpectralAnomalyDetector
+from spectranova.ml.features import extract_features_batch
+from spectranova.stream.pipeline import Pipeline
+from spectranova.stream.sources import ArraySource
+from spectranova.stream.stages import AnomalyStage, FeatureStage, NormalizeStage, SpectrumStage
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--channels", type=int, default=64)
+    parser.add_argument("--fs", type=float, default=20000.0)
+    parser.add_argument("--block", type=int, default=256, help="samples per block (the STFT hop)")
+    parser.add_argument("--nperseg", type=int, default=512)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--trees", type=int, default=25, help="isolation trees in the detector")
+    parser.add_argument("--queue-size", type=int, default=4)
+    parser.add_argument("--policy", default="block")
+    parser.add_argument("--flat-out", action="store_true", help="replay as fast as possible instead of in real time")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((args.channels, int(args.fs * args.seconds))).astype(np.float32)
+    train, _ = extract_features_batch(rng.standard_normal((512, args.nperseg)), args.fs)
+    detector = SpectralAnomalyDetector(n_estimators=args.trees, random_state=0).fit(train)
+    pipeline = Pipeline(
+        ArraySource(data, args.block, args.fs, realtime=not args.flat_out),
+        [NormalizeStage(decay=0.999), SpectrumStage(args.fs, nperseg=args.nperseg),
+         FeatureStage(), AnomalyStage(detector)],
+        queue_size=args.queue_size,
+        policy=args.policy,
+    )
+    stats = pipeline.run()
+    e2e = stats["end_to_end"]
+    print(f"frames={stats['frames_out']} dropped={stats['dropped']} "
+          f"p50={e2e['p50_ms']:.3g}ms p99={e2e['p99_ms']:.3g}ms max={e2e['max_ms']:.3g}ms")
+    for name, stage in stats["stages"].items():
+        lat = stage["latency"]
+        print(f"  {name:<10} mean={lat['mean_ms']:.3g}ms p99={lat['p99_ms']:.3g}ms")
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(dict(vars(args), **stats), fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
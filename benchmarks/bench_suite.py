@@ -0,0 +1,286 @@
+"""Benchmark suite over the transforms and ML stages, with regression checks.
+
+Every case runs over a grid of signal lengths, batch sizes and
+precisions on deterministic synthetic data; results are written as a
+JSON baseline, and ``compare`` flags cases that got slower than a
+threshold (exiting with status 1, so it can gate an upgrade)::
+
+    python benchmarks/bench_suite.py run --output baseline.json
+    # ... upgrade numpy / scipy / spectranova ...
+    python benchmarks/bench_suite.py run --output current.json
+    python benchmarks/bench_suite.py compare baseline.json current.json --threshold 0.10
+
+``run --quick`` uses a small grid, ``-k`` selects cases by substring.
+Baselines only compare meaningfully on the same machine.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Run straight from a checkout, as the usage above shows, without installing.
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from spectranova.core.precision import resolve_precision
+from spectranova.signal.window import clear_window_cache, get_window
+
+FS = 8000.0
+GRID = {"n": (1024, 16384), "batch": (1, 64), "dtype": ("single", "double")}
+QUICK_GRID = {"n": (1024,), "batch": (1, 16), "dtype": ("single", "double")}
+# Feature rows scored by the classifier and anomaly cases per signal in the batch.
+ROWS_PER_SIGNAL = 16
+
+
+def make_signals(n, batch, dtype):
+    """Return a reproducible ``(batch, n)`` array of tones plus noise."""
+    rng = np.random.default_rng([n, batch])
+    t = np.arange(n) / FS
+    freqs = rng.uniform(50.0, FS / 4, (batch, 1))
+    x = np.sin(2 * np.pi * freqs * t) + 0.3 * np.sin(2 * np.pi * 3.1 * freqs * t)
+    x += 0.5 * rng.standard_normal((batch, n))
+    return x.astype(resolve_precision(dtype).real)
+
+
+def make_features(rows, seed=0):
+    """Return reproducible feature rows from two shifted classes, and their labels."""
+    from spectranova.ml.features import FEATURE_NAMES
+
+    rng = np.random.default_rng(seed)
+    labels = rng.integers(0, 2, rows)
+    features = rng.standard_normal((rows, len(FEATURE_NAMES))) + labels[:, None]
+    return features.astype(np.float32), labels
+
+
+_MODELS = {}
+
+
+def _model(kind, dtype):
+    # Fitting is setup, not the measured call; fit each model once per run.
+    key = (kind, dtype)
+    if key not in _MODELS:
+        features, labels = make_features(2000)
+        if kind == "classifier":
+            from spectranova.ml.classifier import SpectralClassifier
+
+            model = SpectralClassifier("rf", n_estimators=50, max_depth=12, random_state=0).fit(features, labels)
+            if resolve_precision(dtype).real == np.float32:
+                model.compact(np.float32)
+        elif kind == "iforest":
+            from spectranova.ml.anomaly import SpectralAnomalyDetector
+
+            model = SpectralAnomalyDetector(n_estimators=50, random_state=0).fit(features)
+        else:
+            from spectranova.ml.anomaly import HalfSpaceTrees
+
+            model = HalfSpaceTrees(n_trees=25, depth=8, window=256, random_state=0).fit(features)
+        _MODELS[key] = model
+    return _MODELS[key]
+
+
+def _fft(n, batch, dtype):
+    from spectranova.signal.fourier import compute_fft
+
+    x = make_signals(n, batch, dtype)
+    return lambda: compute_fft(x, FS, precision=dtype, cache=False)
+
+
+def _welch(n, batch, dtype):
+    from spectranova.signal.welch import compute_welch
+
+    x = make_signals(n, batch, dtype)
+    return lambda: compute_welch(x, FS, nperseg=256, precision=dtype, cache=False)
+
+
+def _spectrogram(n, batch, dtype):
+    from spectranova.signal.spectrogram import compute_spectrogram
+
+    rows = list(make_signals(n, batch, dtype))
+    return lambda: [compute_spectrogram(x, FS, nperseg=256, precision=dtype, cache=False) for x in rows]
+
+
+def _window(n):
+    def run():
+        clear_window_cache()
+        get_window("hann", n)
+        get_window(("kaiser", 8.6), n)
+
+    return run
+
+
+def _cwt(n, batch, dtype):
+    from spectranova.wavelet.cwt import compute_cwt
+
+    rows = list(make_signals(n, batch, dtype))
+    return lambda: [compute_cwt(x, "morlet", fs=FS, precision=dtype, cache=False) for x in rows]
+
+
+def _features(n, batch, dtype):
+    from spectranova.ml.features import extract_features_batch
+
+    x = make_signals(n, batch, dtype)
+    return lambda: extract_features_batch(x, FS, precision=dtype)
+
+
+def _classifier(batch, dtype):
+    model = _model("classifier", dtype)
+    rows = make_features(batch * ROWS_PER_SIGNAL, seed=1)[0]
+    return lambda: model.predict_proba(rows)
+
+
+def _iforest(batch):
+    model = _model("iforest", None)
+    rows = make_features(batch * ROWS_PER_SIGNAL, seed=1)[0]
+    return lambda: model.score_samples(rows)
+
+
+def _half_space_trees(batch):
+    model = _model("half_space_trees", None)
+    rows = make_features(batch * ROWS_PER_SIGNAL, seed=1)[0]
+    return lambda: model.score_samples(rows)
+
+
+# name -> (setup returning the timed callable, grid axes it takes).
+CASES = {
+    "signal.fourier.compute_fft": (_fft, ("n", "batch", "dtype")),
+    "signal.welch.compute_welch": (_welch, ("n", "batch", "dtype")),
+    "signal.spectrogram.compute_spectrogram": (_spectrogram, ("n", "batch", "dtype")),
+    "signal.window.get_window": (_window, ("n",)),
+    "wavelet.cwt.compute_cwt": (_cwt, ("n", "batch", "dtype")),
+    "ml.features.extract_features_batch": (_features, ("n", "batch", "dtype")),
+    "ml.classifier.predict_proba": (_classifier, ("batch", "dtype")),
+    "ml.anomaly.isolation_forest": (_iforest, ("batch",)),
+    "ml.anomaly.half_space_trees": (_half_space_trees, ("batch",)),
+}
+
+
+def case_id(name, params):
+    return name + "[" + ",".join(f"{k}={v}" for k, v in params.items()) + "]"
+
+
+def iter_cases(grid, select=None):
+    """Yield ``(case_id, name, params)`` for every case and grid point."""
+    for name, (_, axes) in CASES.items():
+        if select and not any(s in name for s in select):
+            continue
+        for values in itertools.product(*(grid[axis] for axis in axes)):
+            params = dict(zip(axes, values))
+            yield case_id(name, params), name, params
+
+
+def time_call(func, min_time, repeat):
+    """Return per-call times of ``repeat`` samples, each looping for at least ``min_time`` seconds."""
+    func()  # warm plan, window and filter-bank caches
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(1.2 * min_time / elapsed)))
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+    return samples, number
+
+
+def _environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=ROOT, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    return {"python": platform.python_version(), "numpy": np.__version__, "platform": platform.platform(),
+            "machine": platform.machine(), "cpus": os.cpu_count(), "commit": commit,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z")}
+
+
+def run(args):
+    grid = dict(QUICK_GRID if args.quick else GRID)
+    for axis in grid:
+        if getattr(args, axis) is not None:
+            grid[axis] = getattr(args, axis)
+    results = {}
+    for key, name, params in iter_cases(grid, args.k):
+        setup = CASES[name][0]
+        samples, number = time_call(setup(**params), args.min_time, args.repeat)
+        results[key] = {"case": name, "params": params, "min": min(samples), "median": statistics.median(samples),
+                        "stdev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+                        "repeat": len(samples), "number": number}
+        print(f"{key:70s} min {1e3 * results[key]['min']:10.4f} ms   median {1e3 * results[key]['median']:10.4f} ms")
+    report = {"environment": _environment(), "grid": grid, "results": results}
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+    return 0
+
+
+def compare_results(base, new, threshold=0.10, stat="min"):
+    """Return ``(rows, regressions)`` comparing two ``run`` reports.
+
+    Each row is ``(case_id, base_seconds, new_seconds, ratio)`` for a case
+    present in both; a regression is a row whose ratio exceeds
+    ``1 + threshold``.  A case timed at zero in the baseline has ratio 1
+    if it still is, else infinity.
+    """
+    rows = []
+    for key in sorted(set(base["results"]) & set(new["results"])):
+        before, after = base["results"][key][stat], new["results"][key][stat]
+        ratio = after / before if before > 0 else 1.0 if after <= 0 else float("inf")
+        rows.append((key, before, after, ratio))
+    return rows, [row for row in rows if row[3] > 1.0 + threshold]
+
+
+def compare(args):
+    with open(args.baseline) as fh:
+        base = json.load(fh)
+    with open(args.current) as fh:
+        new = json.load(fh)
+    rows, regressions = compare_results(base, new, args.threshold, args.stat)
+    for key, before, after, ratio in rows:
+        flag = "SLOWER" if ratio > 1.0 + args.threshold else "faster" if ratio < 1.0 - args.threshold else ""
+        print(f"{key:70s} {1e3 * before:10.4f} -> {1e3 * after:10.4f} ms  x{ratio:5.2f}  {flag}")
+    for key in sorted(set(base["results"]) ^ set(new["results"])):
+        print(f"{key:70s} only in {'baseline' if key in base['results'] else 'current'}")
+    print(f"{len(regressions)} of {len(rows)} cases slower by more than {100 * args.threshold:.0f}% ({args.stat})")
+    return 1 if regressions else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    p = commands.add_parser("run", help="time every case and write a JSON report")
+    p.add_argument("--output", help="write the report (a baseline) to this file")
+    p.add_argument("--quick", action="store_true", help="use the small grid")
+    p.add_argument("-k", action="append", help="only run cases whose name contains this (repeatable)")
+    p.add_argument("--n", type=int, nargs="+", help="signal lengths (overrides the grid)")
+    p.add_argument("--batch", type=int, nargs="+", help="batch sizes (overrides the grid)")
+    p.add_argument("--dtype", nargs="+", choices=("single", "double"), help="precisions (overrides the grid)")
+    p.add_argument("--repeat", type=int, default=5, help="timing samples per case")
+    p.add_argument("--min-time", type=float, default=0.05, help="seconds each sample loops for")
+    p.set_defaults(func=run)
+    p = commands.add_parser("compare", help="flag cases slower than a baseline")
+    p.add_argument("baseline")
+    p.add_argument("current")
+    p.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown as a fraction")
+    p.add_argument("--stat", choices=("min", "median"), default="min")
+    p.set_defaults(func=compare)
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
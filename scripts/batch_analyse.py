@@ -1,4 +1,50 @@
 """CLI script for batch spectral analysis."""
 
+import argparse
+import functools
+import logging
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input_dir", required=True, help="directory searched recursively for signal files")
+    parser.add_argument("--output", default="features.store",
+                        help="feature store directory to write, or a CSV file if it ends in .csv")
+    parser.add_argument("--fs", type=float, default=1.0, help="sample rate for files that do not record one")
+    parser.add_argument("--window", default="hann")
+    parser.add_argument("--extensions", nargs="+", default=None, help="file extensions to include (default: all supported)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=16, help="files per submitted task")
+    parser.add_argument("--resume", action="store_true", help="continue from the output's checkpoint")
+    parser.add_argument("--cache-dir", default=None, help="reuse results cached under this directory")
+    parser.add_argument("--progress-every", type=int, default=1000)
+    parser.add_argument("--log-level", default="INFO")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Imported after argument parsing so that --help and usage errors stay fast.
+    from spectranova.core.cache import ResultCache
+    from spectranova.core.parallel import BatchRunner, CSVFeatureWriter, iter_files
+    from spectranova.core.utils import SIGNAL_EXTENSIONS
+    from spectranova.ml.features import FEATURE_NAMES, featurize_file
+    from spectranova.ml.store import FeatureStoreWriter
+
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(levelname)s %(message)s")
+    cache = ResultCache(args.cache_dir) if args.cache_dir else False
+    runner = BatchRunner(
+        functools.partial(featurize_file, fs=args.fs, window=args.window, cache=cache),
+        FEATURE_NAMES,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        progress_every=args.progress_every,
+    )
+    paths = iter_files(args.input_dir, tuple(args.extensions or SIGNAL_EXTENSIONS))
+    writer = CSVFeatureWriter if args.output.lower().endswith(".csv") else FeatureStoreWriter
+    stats = runner.run(paths, args.output, resume=args.resume, writer_factory=writer)
+    return 1 if stats["failed"] and not stats["processed"] else 0
+
+
 if __name__ == "__main__":
-    pass
+    raise SystemExit(main())
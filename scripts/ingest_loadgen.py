@@ -0,0 +1,92 @@
+"""Load generator for the ingestion server: reports throughput and latency percentiles."""
+
+import argparse
+import json
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--unix", help="connect to this Unix socket instead of TCP")
+    parser.add_argument("--sensors", type=int, default=16, help="concurrent sensor connections")
+    parser.add_argument("--frames", type=int, default=1000, help="frames sent per sensor")
+    parser.add_argument("--samples", type=int, default=2048, help="samples per frame")
+    parser.add_argument("--fs", type=float, default=20000.0)
+    parser.add_argument("--op", choices=("welch", "features"), default="welch")
+    parser.add_argument("--inflight", type=int, default=8, help="unanswered frames allowed per sensor")
+    parser.add_argument("--rate", type=float, default=0.0, help="frames per second per sensor (0: as fast as possible)")
+    parser.add_argument("--json", help="write the summary to this file")
+    return parser.parse_args(argv)
+
+
+async def run_sensor(args, sensor, frame, latencies):
+    import asyncio
+    import time
+
+    from spectranova.service.client import IngestClient
+
+    client = await IngestClient.connect(args.host, args.port, args.unix)
+    window = asyncio.Semaphore(args.inflight)
+    start = time.perf_counter()
+
+    async def one(i):
+        sent = time.perf_counter()
+        try:
+            await client.request(sensor, frame, args.fs, args.op)
+            latencies.append(time.perf_counter() - sent)
+        finally:
+            window.release()
+
+    tasks = []
+    for i in range(args.frames):
+        if args.rate:
+            delay = start + i / args.rate - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        await window.acquire()
+        tasks.append(asyncio.ensure_future(one(i)))
+    await asyncio.gather(*tasks)
+    await client.close()
+
+
+async def generate(args):
+    import asyncio
+    import time
+
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_sensor(args, sensor, rng.standard_normal(args.samples).astype(np.float32), latencies)
+        for sensor in range(args.sensors)
+    ))
+    elapsed = time.perf_counter() - start
+    ms = np.asarray(latencies) * 1e3
+    return {
+        "frames": int(ms.size),
+        "seconds": elapsed,
+        "frames_per_s": ms.size / elapsed,
+        "samples_per_s": ms.size * args.samples / elapsed,
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    import asyncio
+
+    summary = asyncio.run(generate(args))
+    print("  ".join(f"{k}={v:.4g}" if isinstance(v, float) else f"{k}={v}" for k, v in summary.items()))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(dict(vars(args), **summary), fh, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
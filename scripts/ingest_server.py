@@ -0,0 +1,56 @@
+"""Run the SpectraNova ingestion server."""
+
+import argparse
+import logging
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--unix", help="also listen on this Unix socket path")
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    parser.add_argument("--workers", type=int, default=None, help="pool size (default: CPU count)")
+    parser.add_argument("--batch-window-ms", type=float, default=2.0, help="time to gather frames into a batch")
+    parser.add_argument("--max-batch", type=int, default=256)
+    parser.add_argument("--max-pending", type=int, default=4096, help="queued frames before senders are throttled")
+    parser.add_argument("--nperseg", type=int, default=256, help="Welch segment length")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="record per-stage timings and serve them on this port (thread executor only)")
+    parser.add_argument("--log-level", default="INFO")
+    return parser.parse_args(argv)
+
+
+async def serve(args):
+    from spectranova.service.server import IngestServer
+
+    if args.metrics_port is not None:
+        from spectranova.core import instrument
+
+        instrument.enable()
+        instrument.serve(args.metrics_port, args.host)
+    server = IngestServer(args.executor, args.workers, args.batch_window_ms / 1000.0, args.max_batch,
+                          args.max_pending, args.nperseg)
+    await server.start(args.host, args.port)
+    if args.unix:
+        await server.start(path=args.unix)
+    try:
+        await server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    import asyncio
+
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(levelname)s %(message)s")
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
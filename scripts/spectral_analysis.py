@@ -1,4 +1,42 @@
 """CLI script for spectral analysis."""
 
+import argparse
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input", required=True, help="signal file (.npy, .csv, .txt or .wav)")
+    parser.add_argument("--method", choices=("periodogram", "welch", "multitaper"), default="welch")
+    parser.add_argument("--window", default="hann")
+    parser.add_argument("--nperseg", type=int, default=256, help="Welch segment length")
+    parser.add_argument("--nw", type=float, default=4.0, help="multitaper time-bandwidth product")
+    parser.add_argument("--fs", type=float, default=1.0, help="sample rate for files that do not record one")
+    parser.add_argument("--output", help="write freq,psd rows to this CSV instead of printing a summary")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Imported after argument parsing so that --help and usage errors stay fast.
+    import numpy as np
+
+    from spectranova.core.utils import load_signal
+    from spectranova.signal.multitaper import compute_multitaper
+    from spectranova.signal.welch import compute_welch
+
+    signal, fs = load_signal(args.input)
+    fs = fs or args.fs
+    if args.method == "multitaper":
+        freqs, psd = compute_multitaper(signal, fs, nw=args.nw)
+    else:
+        nperseg = len(signal) if args.method == "periodogram" else args.nperseg
+        freqs, psd = compute_welch(signal, fs, args.window, nperseg=nperseg)
+    if args.output:
+        np.savetxt(args.output, np.column_stack((freqs, psd)), delimiter=",", header="freq,psd", comments="")
+    else:
+        print(f"{args.method} PSD: {freqs.size} bins, peak at {freqs[np.argmax(psd)]:.6g} Hz")
+    return 0
+
+
 if __name__ == "__main__":
-    pass
+    raise SystemExit(main())
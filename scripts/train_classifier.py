@@ -1,4 +1,82 @@
 """CLI script for training classifiers."""
 
+import argparse
+import functools
+import json
+import logging
+import os
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--data", help="labelled directory with one subdirectory of signal files per class")
+    source.add_argument("--features", help="feature store or CSV written by batch_analyse.py (labels from parent directories)")
+    parser.add_argument("--model", choices=("rf", "svm"), default="rf")
+    parser.add_argument("--name", default=None, help="model name under --models-dir (default: the model type)")
+    parser.add_argument("--models-dir", default=os.path.join("data", "models"))
+    parser.add_argument("--cache-dir", default=os.path.join("data", "processed", "training"),
+                        help="where features and training sets are kept between runs")
+    parser.add_argument("--grid", default=None,
+                        help='JSON {"param": [values]} to search instead of the default grid')
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunk-rows", type=int, default=65536, help="feature rows converted per chunk")
+    parser.add_argument("--max-rows", type=int, default=None, help="train each search trial and the final refit on at most this many rows")
+    parser.add_argument("--fs", type=float, default=1.0, help="sample rate for files that do not record one")
+    parser.add_argument("--window", default="hann")
+    parser.add_argument("--compact", action="store_true", help="store the forest as float32")
+    parser.add_argument("--report", default=None, help="also write the training report to this JSON file")
+    parser.add_argument("--log-level", default="INFO")
+    return parser.parse_args(argv)
+
+
+def featurize(args):
+    """Extract features for every file under ``--data``, resuming earlier runs."""
+    from spectranova.core.parallel import BatchRunner, iter_files
+    from spectranova.ml.features import FEATURE_NAMES, featurize_file
+    from spectranova.ml.store import FeatureStoreWriter
+
+    os.makedirs(args.cache_dir, exist_ok=True)
+    key = os.path.abspath(args.data).strip(os.sep).replace(os.sep, "_")
+    output = os.path.join(args.cache_dir, f"{key}-{args.window}-{args.fs:g}.store")
+    runner = BatchRunner(functools.partial(featurize_file, fs=args.fs, window=args.window),
+                         FEATURE_NAMES, workers=args.workers)
+    # The store only commits when rows change, so an up-to-date run keeps
+    # the cached training set valid.
+    stats = runner.run(iter_files(args.data), output, resume=True, writer_factory=FeatureStoreWriter)
+    return output, stats
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Imported after argument parsing so that --help and usage errors stay fast.
+    from spectranova.ml.training import train
+
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(levelname)s %(message)s")
+    grid = json.loads(args.grid) if args.grid else None
+    if args.data:
+        source, stats = featurize(args)
+    else:
+        source, stats = args.features, None
+    path, report = train(source, args.name or args.model, args.model, grid, args.folds, args.seed,
+                         args.workers, root=args.data, cache_dir=args.cache_dir,
+                         models_dir=args.models_dir, chunk_rows=args.chunk_rows,
+                         max_rows=args.max_rows, compact=args.compact,
+                         extra={"featurize": stats} if stats else None)
+    timings = report["timings"]
+    print(f"model: {path}")
+    print(f"rows: {report['n_rows']}  best: {report['best_params']}  "
+          f"cv accuracy: {report['cv_accuracy']:.4f} +/- {report['cv_std']:.4f}")
+    print(f"build {timings['build_seconds']:.1f}s ({timings['build_rows_per_s']:.0f} rows/s), "
+          f"search {timings['search_seconds']:.1f}s ({timings['trials']} trials), "
+          f"refit {timings['refit_seconds']:.1f}s ({timings['refit_rows_per_s']:.0f} rows/s)")
+    if args.report:
+        with open(args.report, "w") as fh:
+            json.dump(report, fh, indent=2, default=str)
+    return 0
+
+
 if __name__ == "__main__":
-    pass
+    raise SystemExit(main())
@@ -1,4 +1,37 @@
 """CLI script for wavelet analysis."""
 
+import argparse
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--input", required=True, help="signal file (.npy, .csv, .txt or .wav)")
+    parser.add_argument("--wavelet", choices=("morlet", "mexh", "paul"), default="morlet")
+    parser.add_argument("--scales", type=int, default=32, help="number of log-spaced scales")
+    parser.add_argument("--fs", type=float, default=1.0, help="sample rate for files that do not record one")
+    parser.add_argument("--decimate", type=int, default=1, help="keep every k-th time sample")
+    parser.add_argument("--float32", action="store_true", help="store the scalogram as float32")
+    parser.add_argument("--output", help="write the scalogram power to this .npy file")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    # Imported after argument parsing so that --help and usage errors stay fast.
+    import numpy as np
+
+    from spectranova.core.utils import load_signal
+    from spectranova.wavelet.scalogram import compute_scalogram
+
+    signal, fs = load_signal(args.input)
+    freqs, power = compute_scalogram(
+        signal, args.wavelet, args.scales, fs or args.fs, out=args.output,
+        dtype=np.float32 if args.float32 else None, decimate=args.decimate,
+    )
+    dominant = freqs[np.argmax(power.mean(axis=1))]
+    print(f"{args.wavelet} scalogram {power.shape}, dominant frequency {dominant:.6g} Hz")
+    return 0
+
+
 if __name__ == "__main__":
-    pass
+    raise SystemExit(main())
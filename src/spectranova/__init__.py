@@ -1,3 +1,25 @@
 """SpectraNova: Spectral analysis and signal intelligence."""
 
+from spectranova._lazy import attach
+
 __version__ = "0.1.0"
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "core": "core",
+    "database": "database",
+    "ml": "ml",
+    "signal": "signal",
+    "service": "service",
+    "stream": "stream",
+    "wavelet": "wavelet",
+    "compute_fft": "signal",
+    "compute_multitaper": "signal",
+    "compute_spectrogram": "signal",
+    "compute_welch": "signal",
+    "get_window": "signal",
+    "compute_cwt": "wavelet",
+    "compute_scalogram": "wavelet",
+    "extract_features": "ml",
+    "extract_features_batch": "ml",
+    "SpectralAnalysisError": "core",
+})
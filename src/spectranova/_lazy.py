@@ -0,0 +1,30 @@
+"""PEP 562 lazy attribute loading for the package namespaces."""
+
+import importlib
+
+
+def attach(package, attributes):
+    """Return ``(__getattr__, __dir__, __all__)`` for ``package``.
+
+    ``attributes`` maps each public name to the module defining it; a name
+    that maps to itself (e.g. ``{"signal": "signal"}``) is a subpackage.
+    Modules are imported on first attribute access only.
+    """
+    names = sorted(attributes)
+
+    def __getattr__(name):
+        try:
+            module = attributes[name]
+        except KeyError:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}") from None
+        if module == name:
+            value = importlib.import_module(f"{package}.{name}")
+        else:
+            value = getattr(importlib.import_module(f"{package}.{module}"), name)
+        setattr(importlib.import_module(package), name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(names) | set(vars(importlib.import_module(package))))
+
+    return __getattr__, __dir__, names
@@ -1 +1,32 @@
 """Core utilities for SpectraNova."""
+
+from spectranova._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "SpectralAnalysisError": "exceptions",
+    "SignalType": "types",
+    "LRUCache": "cache",
+    "ResultCache": "cache",
+    "disk_cached": "cache",
+    "get_result_cache": "cache",
+    "set_result_cache": "cache",
+    "load_signal": "utils",
+    "normalize_signal": "utils",
+    "demean": "utils",
+    "detrend": "utils",
+    "zscore": "utils",
+    "minmax_scale": "utils",
+    "apply_window": "utils",
+    "preprocess": "utils",
+    "SignalFile": "loaders",
+    "iter_blocks": "loaders",
+    "iter_csv": "loaders",
+    "open_signal": "loaders",
+    "instrument": "instrument",
+    "instrumented": "instrument",
+    "get_precision": "precision",
+    "set_precision": "precision",
+    "use_precision": "precision",
+    "BatchRunner": "parallel",
+    "iter_files": "parallel",
+})
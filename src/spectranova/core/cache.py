@@ -0,0 +1,314 @@
+"""Caches shared by the transform engines.
+
+:class:`LRUCache` keeps plans, windows and filter banks in memory;
+:class:`ResultCache` keeps whole results on disk, addressed by a hash of
+their inputs, so repeated runs over the same files skip recomputation.
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+import spectranova
+from spectranova.core.precision import resolve_precision
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None
+
+
+def _nbytes(value):
+    """Best-effort size of a cached value in bytes."""
+    if isinstance(value, (tuple, list)):
+        return sum(_nbytes(v) for v in value)
+    return int(getattr(value, "nbytes", 0))
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache.
+
+    Entries are evicted once more than ``maxsize`` keys are held or, when
+    ``maxbytes`` is given, once the summed ``nbytes`` of the cached values
+    exceeds that budget.
+    """
+
+    def __init__(self, maxsize=128, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    @property
+    def nbytes(self):
+        """Summed size of the cached values."""
+        return self._nbytes
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` and mark it as recently used."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        """Insert ``value`` under ``key``, evicting old entries as needed."""
+        size = _nbytes(value)
+        with self._lock:
+            if key in self._data:
+                self._nbytes -= _nbytes(self._data.pop(key))
+            self._data[key] = value
+            self._nbytes += size
+            self._evict()
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for ``key``, building it with ``factory()`` on a miss."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        """Drop every entry and reset the statistics."""
+        with self._lock:
+            self._data.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """Return hit/miss counters and current occupancy."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "nbytes": self._nbytes,
+            "maxbytes": self.maxbytes,
+        }
+
+    def _evict(self):
+        while self._data and (
+            (self.maxsize is not None and len(self._data) > self.maxsize)
+            or (self.maxbytes is not None and self._nbytes > self.maxbytes and len(self._data) > 1)
+        ):
+            _, old = self._data.popitem(last=False)
+            self._nbytes -= _nbytes(old)
+
+
+_MISSING = object()
+
+
+DEFAULT_CACHE_DIR = os.path.join("data", "processed", "cache")
+
+
+class ResultCache:
+    """Content-addressed on-disk cache of computation results.
+
+    Each entry is a directory named by a SHA-256 key, holding one ``.npy``
+    file per array in the result and a ``meta.json`` describing how to
+    rebuild it; arrays are memory-mapped read-only on a hit.  Entries are
+    published with an atomic rename, so concurrent worker processes never
+    observe partial writes.  Reads refresh an entry's mtime and, every
+    ``check_every`` writes, the least recently used entries are evicted
+    until the cache is below ``max_bytes``.
+    """
+
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=10 * 2**30, check_every=64):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.check_every = check_every
+        self._writes = 0
+        os.makedirs(root, exist_ok=True)
+
+    @staticmethod
+    def make_key(name, arguments, version=""):
+        """Hash a function name, a version tag and ``{parameter: value}`` arguments."""
+        h = hashlib.sha256(name.encode() + b"\0" + str(version).encode())
+        for param in sorted(arguments):
+            h.update(b"\0" + param.encode() + b"=")
+            _hash_value(h, arguments[param])
+        return h.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.root, key[:2], key)
+
+    def get(self, key, default=None):
+        """Return the cached result for ``key`` or ``default`` on a miss."""
+        path = self._path(key)
+        try:
+            with open(os.path.join(path, "meta.json")) as fh:
+                spec = json.load(fh)
+            value = _decode(spec, path)
+            os.utime(path)
+        except (OSError, ValueError):
+            return default
+        return value
+
+    def put(self, key, value):
+        """Store ``value`` under ``key`` unless another process already did."""
+        path = self._path(key)
+        if os.path.isdir(path):
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.root)
+        try:
+            files = []
+            spec = _encode(value, files)
+            for i, array in enumerate(files):
+                np.save(os.path.join(tmp, f"{i}.npy"), array)
+            with open(os.path.join(tmp, "meta.json"), "w") as fh:
+                json.dump(spec, fh)
+            os.rename(tmp, path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        self._writes += 1
+        if self.check_every and self._writes % self.check_every == 0:
+            self.evict()
+
+    def entries(self):
+        """Return ``(mtime, nbytes, path)`` for every entry."""
+        found = []
+        for shard in os.scandir(self.root):
+            if not shard.is_dir() or shard.name.startswith("."):
+                continue
+            for entry in os.scandir(shard.path):
+                try:
+                    size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                    found.append((entry.stat().st_mtime, size, entry.path))
+                except OSError:
+                    continue  # removed by a concurrent eviction
+        return found
+
+    def evict(self, max_bytes=None):
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        with open(os.path.join(self.root, ".lock"), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            entries = sorted(self.entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total <= limit:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                total -= size
+        return total
+
+    def clear(self):
+        """Delete every entry."""
+        self.evict(max_bytes=0)
+
+
+def _hash_value(h, value):
+    if isinstance(value, (list, tuple)) and value and all(np.ndim(v) > 0 for v in value):
+        h.update(b"seq%d" % len(value))
+        for v in value:
+            _hash_value(h, v)
+    elif isinstance(value, np.ndarray) or (isinstance(value, (list, tuple)) and value):
+        array = np.ascontiguousarray(value)
+        h.update(f"{array.dtype.str}{array.shape}".encode())
+        h.update(array.data if array.dtype != object else repr(array.tolist()).encode())
+    else:
+        h.update(repr(value).encode())
+
+
+def _encode(value, files):
+    if isinstance(value, np.ndarray):
+        files.append(value)
+        return {"npy": len(files) - 1}
+    if isinstance(value, tuple):
+        return {"tuple": [_encode(v, files) for v in value]}
+    if isinstance(value, dict):
+        return {"dict": [[k, _encode(v, files)] for k, v in value.items()]}
+    if isinstance(value, np.generic):
+        value = value.item()
+    return {"value": value}
+
+
+def _decode(spec, path):
+    if "npy" in spec:
+        return np.load(os.path.join(path, f"{spec['npy']}.npy"), mmap_mode="r")
+    if "tuple" in spec:
+        return tuple(_decode(v, path) for v in spec["tuple"])
+    if "dict" in spec:
+        return {k: _decode(v, path) for k, v in spec["dict"]}
+    return spec["value"]
+
+
+_default_result_cache = None
+
+
+def set_result_cache(cache):
+    """Make ``cache`` (a :class:`ResultCache` or ``None``) the process default."""
+    global _default_result_cache
+    _default_result_cache = cache
+
+
+def get_result_cache():
+    """Return the process-default :class:`ResultCache`, if any."""
+    return _default_result_cache
+
+
+def disk_cached(func=None, *, version=0):
+    """Let ``func`` opt into a :class:`ResultCache` through a ``cache=`` keyword.
+
+    ``cache=None`` (the default) uses the process default set with
+    :func:`set_result_cache`, ``cache=False`` bypasses caching and a
+    :class:`ResultCache` instance is used directly.  The key covers the
+    function name, ``spectranova.__version__``, the function's
+    ``cache_version`` (``version``; bump it when a fix changes the output)
+    and every bound argument, arrays by content, with a ``precision``
+    argument resolved against the current policy.  Arrays in a cached
+    result come back as read-only memory maps.
+    """
+    if func is None:
+        return functools.partial(disk_cached, version=version)
+    signature = inspect.signature(func)
+    name = f"{func.__module__}.{func.__qualname__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, cache=None, **kwargs):
+        if cache is None:
+            cache = _default_result_cache
+        if not cache:
+            return func(*args, **kwargs)
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        if "precision" in bound.arguments:
+            bound.arguments["precision"] = resolve_precision(bound.arguments["precision"]).name
+        key = cache.make_key(name, bound.arguments, f"{spectranova.__version__}/{wrapper.cache_version}")
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = func(*args, **kwargs)
+            cache.put(key, result)
+        return result
+
+    wrapper.cache_version = version
+    return wrapper
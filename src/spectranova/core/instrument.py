@@ -0,0 +1,345 @@
+"""Opt-in per-stage instrumentation of the transforms and model calls.
+
+Instrumented functions (the FFT, Welch, spectrogram, CWT, feature and
+predict paths, signal loading and preprocessing) record, per stage, the
+call and error counts, histograms of wall-clock and CPU time, the bytes
+of array arguments processed and, with ``memory=True``, the peak
+allocation of a call as seen by :mod:`tracemalloc`.  Nothing is
+recorded until :func:`enable` is called (or ``SPECTRANOVA_INSTRUMENT``
+is set to ``1``, or to ``memory`` for allocations as well); while
+disabled a wrapped call costs one flag check.  Times are inclusive, so a
+stage calling another counts the inner call too::
+
+    instrument.enable()
+    server = instrument.serve(9464)      # GET /metrics or /metrics.json
+    ...
+    instrument.write_metrics("spectranova.prom")
+"""
+
+import bisect
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+
+# Upper bounds (seconds) of the time histogram buckets; a final +Inf bucket is implied.
+BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2,
+           0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Read by every wrapped call; module globals keep the disabled path to one lookup.
+_enabled = False
+_memory = False
+_started_tracemalloc = False
+
+# Per-thread stack of open memory frames, [baseline, carried peak], for nested stages.
+_local = threading.local()
+
+
+class _Histogram:
+    __slots__ = ("counts", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def to_dict(self):
+        return {"sum": self.total, "max": self.max, "counts": list(self.counts)}
+
+
+class _Stage:
+    __slots__ = ("calls", "errors", "nbytes", "wall", "cpu", "peak_alloc")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.nbytes = 0
+        self.wall = _Histogram()
+        self.cpu = _Histogram()
+        self.peak_alloc = None
+
+    def to_dict(self):
+        return {"calls": self.calls, "errors": self.errors, "bytes": self.nbytes,
+                "peak_alloc": self.peak_alloc, "wall_seconds": self.wall.to_dict(),
+                "cpu_seconds": self.cpu.to_dict()}
+
+
+class _Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def record(self, stage, wall, cpu, nbytes, peak, failed):
+        with self._lock:
+            stats = self._stages.get(stage)
+            if stats is None:
+                stats = self._stages[stage] = _Stage()
+            stats.calls += 1
+            stats.errors += failed
+            stats.nbytes += nbytes
+            stats.wall.observe(wall)
+            stats.cpu.observe(cpu)
+            if peak is not None:
+                stats.peak_alloc = max(stats.peak_alloc or 0, peak)
+
+    def snapshot(self):
+        with self._lock:
+            return {name: stats.to_dict() for name, stats in sorted(self._stages.items())}
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+
+_REGISTRY = _Registry()
+
+
+def enable(memory=False):
+    """Start recording; with ``memory`` also track peak allocations.
+
+    Memory tracking starts :mod:`tracemalloc` if it is not already
+    running, which slows every allocation by several times.  Peaks are
+    approximate while several threads run instrumented stages at once.
+    """
+    global _enabled, _memory, _started_tracemalloc
+    import tracemalloc
+
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+        _started_tracemalloc = True
+    _memory = bool(memory)
+    _enabled = True
+
+
+def disable():
+    """Stop recording; the statistics gathered so far are kept."""
+    global _enabled, _memory, _started_tracemalloc
+    _enabled = _memory = False
+    if _started_tracemalloc:
+        import tracemalloc
+
+        tracemalloc.stop()
+        _started_tracemalloc = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    """Discard every recorded statistic."""
+    _REGISTRY.reset()
+
+
+def _input_nbytes(args, kwargs):
+    """Summed size of the array arguments (and lists or tuples of arrays)."""
+    total = 0
+    for value in (*args, *kwargs.values()):
+        if isinstance(value, np.ndarray):
+            total += value.nbytes
+        elif isinstance(value, (list, tuple)):
+            total += sum(v.nbytes for v in value if isinstance(v, np.ndarray))
+    return total
+
+
+def _frames():
+    try:
+        return _local.frames
+    except AttributeError:
+        _local.frames = []
+        return _local.frames
+
+
+def _enter_memory():
+    import tracemalloc
+
+    stack = _frames()
+    current, peak = tracemalloc.get_traced_memory()
+    # The peak is about to be reset; keep the enclosing stage's so far.
+    if stack:
+        stack[-1][1] = max(stack[-1][1], peak)
+    tracemalloc.reset_peak()
+    frame = [current, current]
+    stack.append(frame)
+    return frame
+
+
+def _exit_memory(frame):
+    import tracemalloc
+
+    stack = _frames()
+    peak = max(frame[1], tracemalloc.get_traced_memory()[1])
+    if stack and stack[-1] is frame:
+        stack.pop()
+    if stack:
+        stack[-1][1] = max(stack[-1][1], peak)
+    return max(0, peak - frame[0])
+
+
+class measure:
+    """Context manager recording the enclosed block as one call of ``stage``.
+
+    Does nothing while instrumentation is disabled.  ``nbytes`` is the
+    amount of data the block processes.
+    """
+
+    __slots__ = ("stage", "nbytes", "_active", "_frame", "_wall", "_cpu")
+
+    def __init__(self, stage, nbytes=0):
+        self.stage = stage
+        self.nbytes = nbytes
+
+    def __enter__(self):
+        self._active = _enabled
+        if self._active:
+            self._frame = _enter_memory() if _memory else None
+            self._cpu = time.thread_time()
+            self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._active:
+            wall = time.perf_counter() - self._wall
+            # CPU time of the calling thread; work in BLAS threads is not included.
+            cpu = time.thread_time() - self._cpu
+            peak = _exit_memory(self._frame) if self._frame is not None else None
+            _REGISTRY.record(self.stage, wall, cpu, int(self.nbytes), peak, exc_type is not None)
+        return False
+
+
+def instrumented(stage, nbytes=_input_nbytes):
+    """Decorator recording every call of the wrapped function as ``stage``.
+
+    ``nbytes(args, kwargs)`` gives the data processed by a call; the
+    default sums the array arguments.  It is only evaluated while
+    instrumentation is enabled.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with measure(stage, nbytes(args, kwargs)):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def snapshot():
+    """Return the recorded statistics as a JSON-serialisable dict.
+
+    ``stages`` maps each stage to its ``calls``, ``errors``, ``bytes``,
+    ``peak_alloc`` (``None`` without memory tracking) and the
+    ``wall_seconds`` / ``cpu_seconds`` histograms: ``sum``, ``max`` and
+    per-bucket ``counts`` for the upper bounds in ``buckets`` plus +Inf.
+    """
+    return {"enabled": _enabled, "memory": _memory, "timestamp": time.time(),
+            "buckets": list(BUCKETS), "stages": _REGISTRY.snapshot()}
+
+
+def to_json(indent=None):
+    """Return :func:`snapshot` as a JSON string."""
+    return json.dumps(snapshot(), indent=indent)
+
+
+def _histogram_lines(name, stage, hist):
+    lines, cumulative = [], 0
+    for bound, count in zip(BUCKETS + (float("inf"),), hist["counts"]):
+        cumulative += count
+        le = "+Inf" if bound == float("inf") else repr(bound)
+        lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+    lines.append(f'{name}_sum{{stage="{stage}"}} {hist["sum"]!r}')
+    lines.append(f'{name}_count{{stage="{stage}"}} {cumulative}')
+    return lines
+
+
+def to_prometheus():
+    """Return the recorded statistics in the Prometheus text exposition format."""
+    stages = _REGISTRY.snapshot()
+    out = []
+    for metric, kind, help_text, field in (
+            ("spectranova_calls_total", "counter", "Calls per instrumented stage.", "calls"),
+            ("spectranova_errors_total", "counter", "Calls that raised, per stage.", "errors"),
+            ("spectranova_bytes_total", "counter", "Bytes of array arguments processed, per stage.", "bytes"),
+            ("spectranova_peak_alloc_bytes", "gauge", "Largest peak allocation of one call, per stage.",
+             "peak_alloc")):
+        out += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        out += [f'{metric}{{stage="{name}"}} {stats[field]}'
+                for name, stats in stages.items() if stats[field] is not None]
+    for metric, help_text, field in (
+            ("spectranova_wall_seconds", "Wall-clock time per call.", "wall_seconds"),
+            ("spectranova_cpu_seconds", "CPU time of the calling thread per call.", "cpu_seconds")):
+        out += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+        for name, stats in stages.items():
+            out += _histogram_lines(metric, name, stats[field])
+    return "\n".join(out) + "\n"
+
+
+def write_metrics(path):
+    """Atomically write the statistics to ``path``; returns ``path``.
+
+    A ``.json`` path gets :func:`to_json`, anything else the Prometheus
+    text format (e.g. a ``.prom`` file for node_exporter's textfile
+    collector).
+    """
+    target = os.path.abspath(os.fspath(path))
+    text = to_json(indent=2) if target.lower().endswith(".json") else to_prometheus()
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(target))
+    with os.fdopen(fd, "w") as fh:
+        fh.write(text)
+    os.replace(tmp, target)
+    return path
+
+
+def serve(port=9464, host="127.0.0.1"):
+    """Serve ``/metrics`` (Prometheus) and ``/metrics.json`` from a daemon thread.
+
+    Returns the ``ThreadingHTTPServer``; ``port=0`` picks a free port
+    (see ``server.server_address``) and ``server.shutdown()`` stops it.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            route = self.path.split("?", 1)[0]
+            if route == "/metrics":
+                body, ctype = to_prometheus(), "text/plain; version=0.0.4; charset=utf-8"
+            elif route == "/metrics.json":
+                body, ctype = to_json(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), Handler)
+    except OSError as exc:
+        raise SpectralAnalysisError(f"cannot serve metrics on {host}:{port}: {exc}") from None
+    threading.Thread(target=server.serve_forever, name="spectranova-metrics", daemon=True).start()
+    return server
+
+
+_setting = os.environ.get("SPECTRANOVA_INSTRUMENT", "").strip().lower()
+if _setting and _setting not in ("0", "false", "no", "off"):
+    enable(memory=_setting == "memory")
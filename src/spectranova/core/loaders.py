@@ -0,0 +1,445 @@
+"""Memory-mapped and chunked loaders for signal files.
+
+WAV PCM, raw binary, ``.npy`` and FITS image data are memory-mapped, so
+opening a file reads only its header and every read touches just the
+pages it slices.  CSV/text files cannot be mapped and are parsed in
+bounded row chunks instead.  :func:`iter_blocks` walks any of them in
+fixed-size blocks, which is how long recordings reach the transforms
+without ever being held in RAM whole::
+
+    welch = OnlineWelch(fs, nperseg=4096)
+    for block in iter_blocks("run.wav", 1 << 20, channel=0):
+        welch.update(block)
+"""
+
+import os
+import re
+import struct
+import warnings
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.precision import resolve_precision
+
+FITS_EXTENSIONS = (".fits", ".fit", ".fts")
+RAW_EXTENSIONS = (".raw", ".bin", ".dat")
+TEXT_EXTENSIONS = (".csv", ".txt")
+
+# WAVE format tags: integer PCM, IEEE float and WAVE_FORMAT_EXTENSIBLE,
+# whose real tag leads the sub-format GUID.
+_WAVE_PCM, _WAVE_FLOAT, _WAVE_EXTENSIBLE = 1, 3, 0xFFFE
+
+# FITS files are 2880-byte blocks; headers are 80-character cards.
+_FITS_BLOCK = 2880
+_FITS_CARD = 80
+_FITS_DTYPES = {8: ">u1", 16: ">i2", 32: ">i4", 64: ">i8", -32: ">f4", -64: ">f8"}
+_FITS_STRING = re.compile(r"'((?:[^']|'')*)'")
+
+# Rows parsed per loadtxt call: about 1 MB of float64 per column.
+_CSV_CHUNK_ROWS = 131072
+
+
+def _check_blocking(block_size, hop):
+    block_size = int(block_size)
+    hop = block_size if hop is None else int(hop)
+    if block_size < 1 or hop < 1:
+        raise SpectralAnalysisError("block_size and hop must be positive")
+    return block_size, hop
+
+
+def _pad_block(block, block_size):
+    width = [(0, 0)] * (block.ndim - 1) + [(0, block_size - block.shape[-1])]
+    return np.pad(block, width)
+
+
+def _decode_int24(view):
+    """Widen packed little-endian 24-bit samples to int32."""
+    b = np.ascontiguousarray(view).view(np.uint8).reshape(view.shape + (3,))
+    return (b[..., 0].astype(np.int32) | (b[..., 1].astype(np.int32) << 8)
+            | (b[..., 2].view(np.int8).astype(np.int32) << 16))
+
+
+def _memmap(path, dtype, offset, shape):
+    if 0 in shape:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", offset=offset, shape=shape)
+
+
+class SignalFile:
+    """Samples of a signal file, read lazily from a memory map.
+
+    ``data`` is the stored 2-D array with samples along ``axis``: 0 for
+    interleaved frames (WAV, raw interleaved), 1 for one row per channel.
+    A stored value ``v`` stands for ``zero + scale * v`` in physical
+    units.  Use as a context manager, or call :meth:`close`, to release
+    the map.
+    """
+
+    def __init__(self, data, fs=None, axis=0, scale=1.0, zero=0.0, path=None, header=None):
+        if data.ndim != 2 or axis not in (0, 1):
+            raise SpectralAnalysisError("data must be 2-D with samples along axis 0 or 1")
+        self.data = data
+        self.fs = fs
+        self.axis = axis
+        self.scale = float(scale)
+        self.zero = float(zero)
+        self.path = path
+        self.header = header or {}
+
+    @property
+    def n_samples(self):
+        return self.data.shape[self.axis]
+
+    @property
+    def channels(self):
+        return self.data.shape[1 - self.axis]
+
+    def __len__(self):
+        return self.n_samples
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Drop the map; arrays returned with ``raw=True`` keep it alive."""
+        self.data = None
+
+    def read(self, start=0, stop=None, channel=None, precision=None, raw=False):
+        """Return samples ``start:stop`` as ``(channels, n)``, or ``(n,)`` for one ``channel``.
+
+        Values are scaled to physical units in ``precision`` (see
+        :mod:`spectranova.core.precision`).  With ``raw`` the stored
+        samples are returned as a view of the map, without copying
+        (24-bit PCM is widened to int32, which copies).
+        """
+        start, stop, _ = slice(start, stop).indices(self.n_samples)
+        view = self.data[start:stop].T if self.axis == 0 else self.data[:, start:stop]
+        if channel is not None:
+            view = view[channel]
+        if view.dtype.kind == "V":
+            view = _decode_int24(view)
+        if raw:
+            return view
+        x = np.array(view, dtype=resolve_precision(precision).real)
+        if self.scale != 1.0:
+            x *= self.scale
+        if self.zero:
+            x += self.zero
+        return x
+
+    def blocks(self, block_size, hop=None, channel=None, start=0, stop=None, pad=False,
+               precision=None, raw=False):
+        """Yield consecutive :meth:`read` blocks of ``block_size`` samples.
+
+        Blocks start every ``hop`` samples (default ``block_size``) from
+        ``start``.  The last block, which reaches ``stop``, may be short;
+        with ``pad`` it is zero-padded to ``block_size``.
+        """
+        block_size, hop = _check_blocking(block_size, hop)
+        start, stop, _ = slice(start, stop).indices(self.n_samples)
+        pos = start
+        while pos < stop:
+            end = min(pos + block_size, stop)
+            block = self.read(pos, end, channel, precision, raw)
+            yield _pad_block(block, block_size) if pad and end - pos < block_size else block
+            if end == stop:
+                break
+            pos += hop
+
+
+def open_wav(path):
+    """Memory-map the samples of a PCM or IEEE-float ``.wav`` file.
+
+    8, 16, 24 and 32-bit integer samples are scaled to [-1, 1); the sample
+    rate is read from the header.  Returns a :class:`SignalFile` with
+    interleaved channels.
+    """
+    path = os.fspath(path)
+    file_size = os.path.getsize(path)
+    with open(path, "rb") as fh:
+        riff = fh.read(12)
+        if len(riff) < 12 or riff[:4] not in (b"RIFF", b"RF64") or riff[8:] != b"WAVE":
+            raise SpectralAnalysisError(f"not a WAV file: {path}")
+        fmt = None
+        while True:
+            head = fh.read(8)
+            if len(head) < 8:
+                raise SpectralAnalysisError(f"WAV file has no data chunk: {path}")
+            chunk_id, size = head[:4], struct.unpack("<I", head[4:])[0]
+            if chunk_id == b"fmt ":
+                fmt = fh.read(size)
+                fh.seek(size & 1, 1)
+            elif chunk_id == b"data":
+                offset = fh.tell()
+                break
+            else:
+                fh.seek(size + (size & 1), 1)
+    if fmt is None or len(fmt) < 16:
+        raise SpectralAnalysisError(f"WAV file has no format chunk: {path}")
+    tag, channels, rate, _, align, bits = struct.unpack("<HHIIHH", fmt[:16])
+    if tag == _WAVE_EXTENSIBLE and len(fmt) >= 26:
+        tag = struct.unpack("<H", fmt[24:26])[0]
+    scale, zero = 1.0, 0.0
+    if tag == _WAVE_PCM and bits in (8, 16, 24, 32):
+        dtype = {8: "u1", 16: "<i2", 24: "V3", 32: "<i4"}[bits]
+        scale = 2.0 ** (1 - bits)
+        zero = -1.0 if bits == 8 else 0.0
+    elif tag == _WAVE_FLOAT and bits in (32, 64):
+        dtype = "<f4" if bits == 32 else "<f8"
+    else:
+        raise SpectralAnalysisError(f"unsupported WAV encoding: format {tag}, {bits} bits")
+    # Streaming writers and RF64 leave the size unset; trust the file length then.
+    available = file_size - offset
+    n_bytes = available if size in (0, 0xFFFFFFFF) else min(size, available)
+    data = _memmap(path, dtype, offset, (n_bytes // align, channels))
+    return SignalFile(data, float(rate), axis=0, scale=scale, zero=zero, path=path)
+
+
+def open_raw(path, dtype="<f4", channels=1, fs=None, offset=0, layout="interleaved", scale=1.0,
+             zero=0.0):
+    """Memory-map headerless binary samples of ``dtype`` after ``offset`` bytes.
+
+    ``layout`` is ``"interleaved"`` (frame after frame) or ``"planar"``
+    (each channel's samples contiguous).  Trailing bytes short of a whole
+    frame are ignored.
+    """
+    path = os.fspath(path)
+    dtype = np.dtype(dtype)
+    if channels < 1:
+        raise SpectralAnalysisError("channels must be positive")
+    n = (os.path.getsize(path) - offset) // (dtype.itemsize * channels)
+    if layout == "interleaved":
+        shape, axis = (n, channels), 0
+    elif layout == "planar":
+        shape, axis = (channels, n), 1
+    else:
+        raise SpectralAnalysisError(f"unknown layout: {layout!r}, expected 'interleaved' or 'planar'")
+    return SignalFile(_memmap(path, dtype, offset, shape), fs, axis, scale, zero, path)
+
+
+def open_npy(path, fs=None):
+    """Memory-map a 1-D signal or ``(channels, n_samples)`` array saved with ``np.save``."""
+    path = os.fspath(path)
+    data = np.load(path, mmap_mode="r")
+    if data.ndim == 1:
+        data = data.reshape(1, -1)
+    if data.ndim != 2:
+        raise SpectralAnalysisError(f"expected a 1-D or 2-D array in {path}, got {data.ndim}-D")
+    return SignalFile(data, fs, axis=1, path=path)
+
+
+def _fits_value(text):
+    match = _FITS_STRING.match(text.lstrip())
+    if match:
+        return match.group(1).replace("''", "'").rstrip()
+    text = text.split("/", 1)[0].strip()
+    if text in ("T", "F"):
+        return text == "T"
+    for parse in (int, lambda s: float(s.replace("D", "E"))):
+        try:
+            return parse(text)
+        except ValueError:
+            pass
+    return text
+
+
+def _fits_headers(path):
+    """Yield ``(header, data_offset, data_bytes)`` for each HDU of a FITS file."""
+    size = os.path.getsize(path)
+    with open(path, "rb") as fh:
+        pos = 0
+        while pos < size:
+            header, done = {}, False
+            while not done:
+                block = fh.read(_FITS_BLOCK)
+                if len(block) < _FITS_BLOCK:
+                    raise SpectralAnalysisError(f"truncated FITS header in {path}")
+                pos += _FITS_BLOCK
+                for i in range(0, _FITS_BLOCK, _FITS_CARD):
+                    card = block[i:i + _FITS_CARD].decode("ascii", "replace")
+                    key = card[:8].strip()
+                    if key == "END":
+                        done = True
+                        break
+                    if card[8:10] == "= ":
+                        header[key] = _fits_value(card[10:])
+            if not header.get("SIMPLE", header.get("XTENSION")):
+                raise SpectralAnalysisError(f"not a FITS file: {path}")
+            naxis = [header.get(f"NAXIS{i}", 0) for i in range(1, header.get("NAXIS", 0) + 1)]
+            count = int(np.prod(naxis, dtype=np.int64)) if naxis else 0
+            count = header.get("GCOUNT", 1) * (header.get("PCOUNT", 0) + count)
+            n_bytes = abs(header["BITPIX"]) // 8 * count if naxis else 0
+            yield header, pos, n_bytes
+            pos += -(-n_bytes // _FITS_BLOCK) * _FITS_BLOCK
+            fh.seek(pos)
+
+
+def _fits_table(path, index, column):
+    try:
+        from astropy.io import fits
+    except ImportError:
+        raise SpectralAnalysisError("reading FITS table columns requires astropy") from None
+    # Astropy keeps the map open for as long as the column is referenced.
+    with fits.open(path, memmap=True) as hdul:
+        return np.asarray(hdul[index].data[column])
+
+
+def open_fits(path, hdu=None, column=None):
+    """Memory-map the data unit of a FITS image HDU.
+
+    ``hdu`` is an index or ``EXTNAME``; by default the first HDU holding
+    an image.  Headers are parsed natively, so images need no extra
+    dependency: each row along ``NAXIS1`` is one channel, and
+    ``BSCALE``/``BZERO`` are applied on read.  A ``column`` of a binary
+    table HDU is read through astropy (optional).
+    """
+    path = os.fspath(path)
+    for index, (header, offset, n_bytes) in enumerate(_fits_headers(path)):
+        is_image = header.get("XTENSION", "IMAGE") == "IMAGE"
+        if hdu is None:
+            selected = (column is None) == is_image and n_bytes > 0
+        else:
+            selected = hdu == index if isinstance(hdu, int) else hdu == header.get("EXTNAME")
+        if selected:
+            break
+    else:
+        raise SpectralAnalysisError(f"no matching HDU with data in {path}")
+    if not is_image:
+        if column is None:
+            raise SpectralAnalysisError(f"HDU {index} of {path} is a table; pass column=")
+        data = _fits_table(path, index, column)
+        data = data.reshape(1, -1) if data.ndim == 1 else data.reshape(data.shape[0], -1)
+        return SignalFile(data, axis=1, path=path, header=header)
+    if header["BITPIX"] not in _FITS_DTYPES:
+        raise SpectralAnalysisError(f"unsupported FITS BITPIX: {header['BITPIX']}")
+    n1 = header.get("NAXIS1", 0)
+    shape = (n_bytes // (abs(header["BITPIX"]) // 8) // max(n1, 1), n1)
+    data = _memmap(path, _FITS_DTYPES[header["BITPIX"]], offset, shape)
+    return SignalFile(data, axis=1, scale=header.get("BSCALE", 1.0), zero=header.get("BZERO", 0.0),
+                      path=path, header=header)
+
+
+def open_signal(path, **options):
+    """Open a ``.wav``, ``.npy``, FITS or raw binary file as a :class:`SignalFile`.
+
+    ``options`` go to the format's opener (:func:`open_raw` needs at
+    least the ``dtype`` it was written with).  Text files are not
+    mappable; read them with :func:`iter_csv` or :func:`iter_blocks`.
+    """
+    ext = os.path.splitext(os.fspath(path))[1].lower()
+    if ext == ".wav":
+        return open_wav(path, **options)
+    if ext == ".npy":
+        return open_npy(path, **options)
+    if ext in FITS_EXTENSIONS:
+        return open_fits(path, **options)
+    if ext in RAW_EXTENSIONS:
+        return open_raw(path, **options)
+    raise SpectralAnalysisError(f"cannot memory-map {path}; unsupported extension {ext!r}")
+
+
+def _csv_header(fh, delimiter, comments):
+    """Skip to the first data row; return the header's column names, if any."""
+    while True:
+        pos = fh.tell()
+        line = fh.readline()
+        if not line:
+            return None
+        text = line.split(comments, 1)[0].strip()
+        if text:
+            break
+    fields = [f.strip() for f in text.split(delimiter)]
+    try:
+        [float(f) for f in fields]
+    except ValueError:
+        return fields
+    fh.seek(pos)
+    return None
+
+
+def _loadtxt(fh, **kwargs):
+    # loadtxt warns when the last chunk of a file is empty.
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", UserWarning)
+        return np.loadtxt(fh, ndmin=2, **kwargs)
+
+
+def iter_csv(path, columns=None, chunk_rows=_CSV_CHUNK_ROWS, delimiter=None, comments="#"):
+    """Yield a numeric CSV/text file as float64 ``(rows, columns)`` chunks.
+
+    At most ``chunk_rows`` rows are parsed at a time by NumPy's C
+    tokenizer, so memory stays bounded whatever the file size.  A
+    leading header row is detected and skipped; ``columns`` selects
+    columns by index or header name.  ``delimiter`` defaults to ``","``
+    for ``.csv`` files and whitespace otherwise.
+    """
+    path = os.fspath(path)
+    if delimiter is None and path.lower().endswith(".csv"):
+        delimiter = ","
+    if chunk_rows < 1:
+        raise SpectralAnalysisError("chunk_rows must be positive")
+    with open(path) as fh:
+        names = _csv_header(fh, delimiter, comments)
+        usecols = None
+        if columns is not None:
+            usecols = []
+            for col in columns:
+                if isinstance(col, str):
+                    if names is None or col not in names:
+                        raise SpectralAnalysisError(f"no column {col!r} in {path}")
+                    col = names.index(col)
+                usecols.append(col)
+        while True:
+            try:
+                chunk = _loadtxt(fh, delimiter=delimiter, comments=comments, usecols=usecols, max_rows=chunk_rows)
+            except ValueError as exc:
+                raise SpectralAnalysisError(f"cannot parse {path}: {exc}") from exc
+            if chunk.shape[0]:
+                yield chunk
+            if chunk.shape[0] < chunk_rows:
+                return
+
+
+def _reblock(chunks, block_size, hop, pad):
+    """Cut a stream of ``(..., n)`` chunks into blocks as :meth:`SignalFile.blocks` does."""
+    buf, base, pos, last_end = None, 0, 0, None
+    for chunk in chunks:
+        buf = chunk if buf is None else np.concatenate((buf, chunk), axis=-1)
+        end = base + buf.shape[-1]
+        while pos + block_size <= end:
+            yield buf[..., pos - base:pos - base + block_size]
+            last_end = pos + block_size
+            pos += hop
+        # Keep only the samples later blocks still need.
+        drop = min(pos, end) - base
+        buf, base = buf[..., drop:], base + drop
+    if buf is not None and pos < base + buf.shape[-1] and last_end != base + buf.shape[-1]:
+        tail = buf[..., pos - base:]
+        yield _pad_block(tail, block_size) if pad else tail
+
+
+def iter_blocks(path, block_size, hop=None, channel=None, pad=False, precision=None, raw=False,
+                **options):
+    """Yield a signal file in fixed-size blocks of physical samples.
+
+    Blocks are ``(channels, block_size)``, or ``(block_size,)`` for one
+    ``channel``, in ``precision``; they start every ``hop`` samples and
+    only the last may be short (zero-padded with ``pad``).  Mappable
+    formats are sliced straight from their memory map (see
+    :func:`open_signal`, which receives ``options``); CSV/text files are
+    parsed in chunks by :func:`iter_csv`, whose columns are the channels.
+    With ``raw`` mapped blocks are the stored samples, without copying.
+    """
+    block_size, hop = _check_blocking(block_size, hop)
+    if os.fspath(path).lower().endswith(TEXT_EXTENSIONS):
+        dtype = resolve_precision(precision).real
+        chunks = (np.ascontiguousarray(c.T if channel is None else c[:, channel], dtype=dtype)
+                  for c in iter_csv(path, **options))
+        yield from _reblock(chunks, block_size, hop, pad)
+        return
+    with open_signal(path, **options) as source:
+        yield from source.blocks(block_size, hop, channel, pad=pad, precision=precision, raw=raw)
@@ -0,0 +1,239 @@
+"""Process-pool batch runner for directories of signal files."""
+
+import csv
+import itertools
+import json
+import logging
+import os
+import time
+from collections import deque, namedtuple
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from spectranova.core.utils import SIGNAL_EXTENSIONS
+
+logger = logging.getLogger(__name__)
+
+FileResult = namedtuple("FileResult", ["path", "ok", "seconds", "error"])
+
+
+def iter_files(root, extensions=SIGNAL_EXTENSIONS):
+    """Lazily yield files below ``root`` with one of ``extensions``, depth first.
+
+    Only one directory listing is held at a time, so discovery starts
+    returning paths immediately even for very large trees.
+    """
+    extensions = tuple(e.lower() for e in extensions)
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            entries = sorted(it, key=lambda e: e.name)
+        subdirs = []
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+            elif entry.name.lower().endswith(extensions):
+                yield entry.path
+        stack.extend(reversed(subdirs))
+
+
+def _run_chunk(func, paths, shm_name, n_cols):
+    """Worker entry point: fill one shared-memory row per path."""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        rows = np.ndarray((len(paths), n_cols), dtype=np.float32, buffer=shm.buf)
+        results = []
+        for i, path in enumerate(paths):
+            start = time.perf_counter()
+            try:
+                rows[i] = func(path)
+                results.append(FileResult(path, True, time.perf_counter() - start, None))
+            except Exception as exc:
+                rows[i] = np.nan
+                error = f"{type(exc).__name__}: {exc}"
+                results.append(FileResult(path, False, time.perf_counter() - start, error))
+        del rows
+        return results
+    finally:
+        shm.close()
+
+
+class CSVFeatureWriter:
+    """Appends ``path,<columns>`` rows to a CSV file, flushing after every chunk."""
+
+    def __init__(self, path, columns, resume_offset=None):
+        self.path = path
+        if resume_offset is not None and os.path.exists(path):
+            self._fh = open(path, "r+", newline="")
+            self._fh.truncate(resume_offset)
+            self._fh.seek(resume_offset)
+            self._writer = csv.writer(self._fh)
+        else:
+            self._fh = open(path, "w", newline="")
+            self._writer = csv.writer(self._fh)
+            self._writer.writerow(("path",) + tuple(columns))
+
+    def write(self, paths, rows):
+        for path, row in zip(paths, rows):
+            self._writer.writerow([path] + [str(v) for v in row])
+        self._fh.flush()
+
+    def tell(self):
+        return self._fh.tell()
+
+    def close(self):
+        self._fh.close()
+
+
+def _read_checkpoint(path):
+    done, offset = set(), None
+    if not os.path.exists(path):
+        return done, offset
+    with open(path) as fh:
+        for line in fh:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # torn final line from an interrupted run
+            offset = record["offset"]
+            done.update(entry[0] for entry in record["files"])
+    return done, offset
+
+
+class BatchRunner:
+    """Fan ``func(path) -> 1-D row`` out over a process pool.
+
+    Paths are submitted in chunks of ``chunksize`` with at most
+    ``max_pending`` chunks in flight.  Workers write their rows into a
+    shared-memory block allocated per chunk, so only the short per-file
+    status list is pickled back.  Rows are appended to the output as chunks
+    finish, and a JSON-lines checkpoint next to the output records every
+    finished file together with the output offset, which lets
+    :meth:`run` resume after an interruption.
+
+    A file that raises is recorded as failed and skipped.  If a worker
+    process dies, the pool is restarted and the files of the affected
+    chunks are retried one at a time, so a single crashing file cannot stop
+    the run.
+    """
+
+    def __init__(self, func, columns, workers=None, chunksize=16, max_pending=None,
+                 progress_every=1000):
+        self.func = func
+        self.columns = tuple(columns)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunksize = int(chunksize)
+        self.max_pending = max_pending or 2 * self.workers
+        self.progress_every = progress_every
+
+    def run(self, paths, output, resume=False, writer_factory=CSVFeatureWriter):
+        """Process ``paths`` into ``output``; return a summary dict."""
+        checkpoint_path = output + ".ckpt"
+        done, offset = _read_checkpoint(checkpoint_path) if resume else (set(), None)
+        writer = writer_factory(output, self.columns, offset if resume else None)
+        checkpoint = open(checkpoint_path, "a" if resume else "w")
+        todo = (p for p in paths if p not in done)
+        chunks = iter(lambda: list(itertools.islice(todo, self.chunksize)), [])
+        stats = {"processed": 0, "failed": 0, "skipped": len(done), "seconds": 0.0}
+        started = time.perf_counter()
+        n_cols = len(self.columns)
+        retries = deque()
+        pending = {}
+        executor = ProcessPoolExecutor(self.workers)
+
+        def submit(chunk, retry):
+            nonlocal executor
+            shm = shared_memory.SharedMemory(create=True, size=max(len(chunk) * n_cols * 4, 1))
+            try:
+                future = executor.submit(_run_chunk, self.func, chunk, shm.name, n_cols)
+            except BaseException as exc:
+                shm.close()
+                shm.unlink()
+                if not isinstance(exc, BrokenProcessPool):
+                    raise
+                # The pool died since the last wait; its futures still report it.
+                if retry:
+                    retries.appendleft(chunk)
+                else:
+                    retries.extend([path] for path in chunk)
+                executor = ProcessPoolExecutor(self.workers)
+                return
+            pending[future] = (chunk, shm, retry)
+
+        def finish(future):
+            chunk, shm, retry = pending.pop(future)
+            broken = False
+            try:
+                try:
+                    results = future.result()
+                except BrokenProcessPool:
+                    broken = True
+                    if not retry:
+                        retries.extend([path] for path in chunk)
+                        return broken
+                    results = [FileResult(chunk[0], False, 0.0, "worker process crashed")]
+                rows = np.ndarray((len(chunk), n_cols), dtype=np.float32, buffer=shm.buf)
+                ok = [i for i, r in enumerate(results) if r.ok]
+                writer.write([chunk[i] for i in ok], rows[ok])
+                del rows
+            finally:
+                shm.close()
+                shm.unlink()
+            checkpoint.write(json.dumps({"offset": writer.tell(), "files": [list(r) for r in results]}) + "\n")
+            checkpoint.flush()
+            self._record(results, stats, started)
+            return broken
+
+        try:
+            while True:
+                # Retries run one file at a time on their own, so a crash
+                # always identifies the file that caused it.
+                while len(pending) < self.max_pending and not any(v[2] for v in pending.values()):
+                    if retries:
+                        if not pending:
+                            submit(retries.popleft(), True)
+                        break
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    submit(chunk, False)
+                if not pending:
+                    break
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                broken = False
+                for future in finished:
+                    broken |= finish(future)
+                if broken:
+                    # Every other in-flight chunk died with the pool too.
+                    for future in list(pending):
+                        wait([future])
+                        finish(future)
+                    executor.shutdown(wait=True)
+                    executor = ProcessPoolExecutor(self.workers)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            for _, shm, _ in pending.values():
+                shm.close()
+                shm.unlink()
+            writer.close()
+            checkpoint.close()
+        stats["seconds"] = time.perf_counter() - started
+        logger.info("batch finished: %(processed)d processed, %(failed)d failed, "
+                    "%(skipped)d skipped in %(seconds).1fs", stats)
+        return stats
+
+    def _record(self, results, stats, started):
+        for result in results:
+            if result.ok:
+                stats["processed"] += 1
+                logger.debug("%s processed in %.3fs", result.path, result.seconds)
+            else:
+                stats["failed"] += 1
+                logger.warning("%s failed: %s", result.path, result.error)
+            total = stats["processed"] + stats["failed"]
+            if self.progress_every and total % self.progress_every == 0:
+                elapsed = time.perf_counter() - started
+                logger.info("%d files done (%d failed), %.1f files/s", total, stats["failed"], total / elapsed)
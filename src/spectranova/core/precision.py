@@ -0,0 +1,80 @@
+"""Numeric precision policy shared by the transforms.
+
+Transforms that accept ``precision=`` compute in the dtypes it names:
+``"double"`` (float64/complex128, the default) or ``"single"``
+(float32/complex64), which halves memory and bandwidth at about seven
+significant digits.  Inputs are converted once on entry, so integer
+sensor data goes straight to float32; intermediates and results then stay
+in that precision.  Frequency and time axes remain float64.  Passing
+``precision=None`` uses the policy of the current context::
+
+    with use_precision("single"):
+        freqs, times, sxx = compute_spectrogram(x, fs)   # float32 Sxx
+"""
+
+import contextlib
+import contextvars
+from collections import namedtuple
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+
+Precision = namedtuple("Precision", ["name", "real", "complex"])
+
+DOUBLE = Precision("double", np.dtype(np.float64), np.dtype(np.complex128))
+SINGLE = Precision("single", np.dtype(np.float32), np.dtype(np.complex64))
+
+# Accepted spellings of each policy.
+_ALIASES = {
+    "double": DOUBLE, "float64": DOUBLE, "complex128": DOUBLE,
+    "single": SINGLE, "float32": SINGLE, "complex64": SINGLE,
+}
+
+# A context variable, so threads and asyncio tasks each see their own policy.
+_CURRENT = contextvars.ContextVar("spectranova_precision", default=DOUBLE)
+
+
+def resolve_precision(precision=None):
+    """Return the :class:`Precision` named by ``precision``.
+
+    Accepts ``"single"`` / ``"double"``, a NumPy dtype or type of either
+    width, or a :class:`Precision`; ``None`` gives the current policy.
+    """
+    if precision is None:
+        return _CURRENT.get()
+    if isinstance(precision, Precision):
+        return precision
+    name = precision if isinstance(precision, str) else None
+    if name is None:
+        try:
+            name = np.dtype(precision).name
+        except TypeError:
+            name = None
+    try:
+        return _ALIASES[name]
+    except KeyError:
+        raise SpectralAnalysisError(f"unknown precision: {precision!r}, expected 'single' or 'double'") from None
+
+
+def get_precision():
+    """Return the precision policy of the current context."""
+    return _CURRENT.get()
+
+
+def set_precision(precision):
+    """Make ``precision`` the policy of the current context; returns the previous one."""
+    previous = _CURRENT.get()
+    _CURRENT.set(resolve_precision(precision))
+    return previous
+
+
+@contextlib.contextmanager
+def use_precision(precision):
+    """Apply ``precision`` to every transform called inside the ``with`` block."""
+    token = _CURRENT.set(resolve_precision(precision))
+    try:
+        yield _CURRENT.get()
+    finally:
+        _CURRENT.reset(token)
+
@@ -1,7 +1,218 @@
 """Utility functions for data loading and preprocessing."""
 
+import os
+from typing import Optional, Tuple, Union
+
+import numpy as np
+
+from spectranova.core.cache import LRUCache
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.instrument import instrumented
+from spectranova.core.loaders import FITS_EXTENSIONS, TEXT_EXTENSIONS, iter_csv, open_signal
+from spectranova.core.precision import resolve_precision
 from spectranova.core.types import SignalType
 
-def normalize_signal(signal: SignalType) -> SignalType:
-    """Normalize signal to [-1, 1]."""
-    pass
+SIGNAL_EXTENSIONS = (".npy", ".csv", ".txt", ".wav") + FITS_EXTENSIONS
+
+# Orthonormal polynomial bases for detrending, keyed by (n_samples, order, dtype).
+_TREND_CACHE = LRUCache(maxsize=32, maxbytes=64 * 2**20)
+
+# Elements of the scratch block detrend() reuses for every group of rows.
+_SCRATCH_ELEMENTS = 2**16
+
+
+def _prepare(signal: SignalType, out: Optional[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Return ``(x, out)`` for a kernel that reads ``x`` and writes ``out``.
+
+    Without ``out`` one result array is allocated: integer input is
+    converted into it once (in the current precision) and the kernel then
+    runs in place on it.
+    """
+    x = np.asarray(signal)
+    if x.ndim == 0:
+        raise SpectralAnalysisError("signal must have at least one axis")
+    if out is None:
+        if np.issubdtype(x.dtype, np.floating):
+            return x, np.empty_like(x)
+        x = x.astype(resolve_precision().real)
+        return x, x
+    if out.shape != x.shape or not np.issubdtype(out.dtype, np.floating):
+        raise SpectralAnalysisError(f"out must be a floating array of shape {x.shape}")
+    return x, out
+
+
+def _row_stat(values: np.ndarray, dtype: np.dtype) -> np.ndarray:
+    # Per-row statistics in the output precision, so float32 rows stay float32.
+    return values.astype(dtype, copy=False)
+
+
+def normalize_signal(signal: SignalType, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Normalize signal to [-1, 1].
+
+    Each row (the last axis) is divided by its peak absolute value; all-zero
+    rows are left at zero.  With ``out`` the result is written there, which
+    may be ``signal`` itself for in-place use.
+    """
+    x, out = _prepare(signal, out)
+    if not x.size:
+        return out
+    # The peak from max and -min avoids materialising abs(x).
+    peak = np.maximum(x.max(axis=-1, keepdims=True), -x.min(axis=-1, keepdims=True).astype(float))
+    return np.divide(x, _row_stat(np.where(peak > 0, peak, 1), out.dtype), out=out)
+
+
+def demean(signal: SignalType, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Subtract each row's mean; ``out`` may be ``signal`` itself."""
+    x, out = _prepare(signal, out)
+    return np.subtract(x, _row_stat(x.mean(axis=-1, keepdims=True), out.dtype), out=out)
+
+
+def zscore(signal: SignalType, ddof: int = 0, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Scale each row to zero mean and unit standard deviation.
+
+    Constant rows become zero.  The variance is summed from the centred
+    output with ``einsum``, so no centred copy is made.
+    """
+    out = demean(signal, out=out)
+    n = out.shape[-1] - ddof
+    if n <= 0:
+        raise SpectralAnalysisError(f"ddof={ddof} leaves no degrees of freedom")
+    std = np.sqrt(np.einsum("...i,...i->...", out, out)[..., None] / n)
+    return np.divide(out, _row_stat(np.where(std > 0, std, 1), out.dtype), out=out)
+
+
+def minmax_scale(signal: SignalType, feature_range: Tuple[float, float] = (0.0, 1.0),
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Map each row's minimum and maximum onto ``feature_range``.
+
+    Constant rows are set to the lower bound.
+    """
+    low, high = (float(v) for v in feature_range)
+    x, out = _prepare(signal, out)
+    if not x.size:
+        return out
+    lo = x.min(axis=-1, keepdims=True)
+    span = x.max(axis=-1, keepdims=True).astype(float) - lo
+    scale = np.divide(high - low, span, out=np.zeros(span.shape), where=span > 0)
+    np.subtract(x, _row_stat(lo, out.dtype), out=out)
+    np.multiply(out, _row_stat(scale, out.dtype), out=out)
+    out += low
+    return out
+
+
+def _trend_basis(n: int, order: int, dtype: np.dtype) -> np.ndarray:
+    """Orthonormal ``(n, order + 1)`` basis of the polynomials up to ``order``."""
+    def build():
+        t = np.linspace(-1.0, 1.0, n)
+        basis = np.linalg.qr(np.vander(t, order + 1, increasing=True))[0].astype(dtype)
+        basis.setflags(write=False)
+        return basis
+
+    return _TREND_CACHE.get_or_create((n, order, np.dtype(dtype).str), build)
+
+
+def detrend(signal: SignalType, order: int = 1, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Remove each row's least-squares polynomial trend of degree ``order``.
+
+    ``order=1`` removes a linear trend and ``order=0`` the mean.  The fit
+    is a projection onto a cached orthonormal basis, done for groups of
+    rows with two matrix products into one small reused scratch block, so
+    extra memory stays bounded whatever the batch size.  ``out`` may be
+    ``signal`` itself.
+    """
+    x, out = _prepare(signal, out)
+    n = x.shape[-1]
+    if not 0 <= order < max(n, 1):
+        raise SpectralAnalysisError(f"detrend order must be in [0, {n - 1}] for {n} samples")
+    if not x.size:
+        return out
+    basis = _trend_basis(n, order, out.dtype)
+    rows = x.reshape(-1, n)
+    try:
+        dest = np.reshape(out, (-1, n), copy=False)
+    except ValueError:
+        raise SpectralAnalysisError("detrend needs an out array that can be viewed as rows") from None
+    step = max(1, _SCRATCH_ELEMENTS // n)
+    trend = np.empty((min(step, rows.shape[0]), n), dtype=out.dtype)
+    coeffs = np.empty((trend.shape[0], order + 1), dtype=out.dtype)
+    for start in range(0, rows.shape[0], step):
+        block = rows[start:start + step]
+        k = block.shape[0]
+        np.matmul(block, basis, out=coeffs[:k])
+        np.matmul(coeffs[:k], basis.T, out=trend[:k])
+        np.subtract(block, trend[:k], out=dest[start:start + k])
+    return out
+
+
+def apply_window(signal: SignalType, window: Union[str, tuple, np.ndarray] = "hann",
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Multiply each row by ``window``: a name, ``(name, param)`` tuple or array.
+
+    Named windows come from the cache of
+    :func:`~spectranova.signal.window.get_window_info`.
+    """
+    x, out = _prepare(signal, out)
+    if isinstance(window, (str, tuple)):
+        from spectranova.signal.window import get_window_info
+
+        window = get_window_info(window, x.shape[-1]).window
+    window = np.asarray(window)
+    if window.shape != (x.shape[-1],):
+        raise SpectralAnalysisError(f"window has shape {window.shape}, expected ({x.shape[-1]},)")
+    return np.multiply(x, window.astype(out.dtype, copy=False), out=out)
+
+
+# Normalisations accepted by preprocess().
+_NORMALIZERS = {"peak": normalize_signal, "zscore": zscore, "minmax": minmax_scale}
+
+
+@instrumented("preprocess")
+def preprocess(signal: SignalType, detrend_order: Optional[int] = None, normalize: Optional[str] = None,
+               window: Union[None, str, tuple, np.ndarray] = None,
+               out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Detrend, normalise and window every row, in that order, in one buffer.
+
+    Each stage is skipped when its argument is ``None``; ``normalize`` is
+    ``"peak"`` (:func:`normalize_signal`), ``"zscore"`` or ``"minmax"``.
+    The first stage writes ``out`` (or the one array allocated) and the
+    others then run on it in place.
+    """
+    if normalize is not None and normalize not in _NORMALIZERS:
+        raise SpectralAnalysisError(f"unknown normalisation: {normalize!r}, expected one of {sorted(_NORMALIZERS)}")
+    x, out = _prepare(signal, out)
+    source = x
+    if detrend_order is not None:
+        source = detrend(source, detrend_order, out=out)
+    if normalize is not None:
+        source = _NORMALIZERS[normalize](source, out=out)
+    if window is not None:
+        source = apply_window(source, window, out=out)
+    if source is x and x is not out:
+        np.copyto(out, x)
+    return out
+
+
+@instrumented("load")
+def load_signal(path: str) -> Tuple[np.ndarray, Optional[float]]:
+    """Load a 1-D signal from a ``.npy``, ``.csv``/``.txt``, ``.wav`` or FITS file.
+
+    Returns ``(signal, fs)``; ``fs`` is ``None`` for formats that do not
+    record a sample rate.  ``.npy`` files are memory-mapped; CSV files are
+    read from their first column, WAV files from their first channel and
+    FITS images from their first row (see :mod:`spectranova.core.loaders`
+    for block-wise access to the rest).
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".npy":
+        data, fs = np.load(path, mmap_mode="r"), None
+    elif ext in TEXT_EXTENSIONS:
+        chunks = [chunk[:, 0] for chunk in iter_csv(path, columns=[0])]
+        data, fs = (np.concatenate(chunks) if chunks else np.empty(0)), None
+    elif ext == ".wav" or ext in FITS_EXTENSIONS:
+        with open_signal(path) as source:
+            data, fs = source.read(channel=0), source.fs
+    else:
+        raise SpectralAnalysisError(f"unsupported signal file: {path}")
+    if data.ndim != 1:
+        data = data.reshape(data.shape[0], -1)[:, 0]
+    return data, fs
@@ -0,0 +1,11 @@
+"""Reference spectra storage and similarity search."""
+
+from spectranova._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "SpectralStore": "store",
+    "embed_spectra": "store",
+    "IVFPQIndex": "index",
+    "exact_search": "index",
+    "kmeans": "index",
+})
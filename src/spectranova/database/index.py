@@ -0,0 +1,271 @@
+"""Inverted-file product-quantization (IVF-PQ) index for nearest-neighbour search."""
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+
+# Centroids per product-quantizer subspace; codes are stored as uint8.
+_PQ_CENTROIDS = 256
+# Upper bound on the floats of one (rows, centroids) distance block.
+_BLOCK_FLOATS = 2**24
+# Rows sampled to train each quantizer, per centroid.
+_TRAIN_PER_CENTROID = 32
+
+
+def _sq_distances(x, centroids, centroid_norms=None):
+    """Squared L2 distances of every row of ``x`` to every centroid."""
+    if centroid_norms is None:
+        centroid_norms = np.einsum("ij,ij->i", centroids, centroids)
+    d = x @ centroids.T
+    d *= -2
+    d += centroid_norms
+    d += np.einsum("ij,ij->i", x, x)[:, None]
+    return d
+
+
+def _assign(x, centroids):
+    """Index of the nearest centroid for every row, computed in bounded blocks."""
+    norms = np.einsum("ij,ij->i", centroids, centroids)
+    block = max(1, _BLOCK_FLOATS // len(centroids))
+    out = np.empty(len(x), dtype=np.int32)
+    for start in range(0, len(x), block):
+        out[start:start + block] = np.argmin(_sq_distances(x[start:start + block], centroids, norms), axis=1)
+    return out
+
+
+def kmeans(x, k, n_iter=20, seed=0):
+    """Lloyd's k-means on the rows of ``x``; returns ``(k, dim)`` ``float32`` centroids.
+
+    Clusters that empty out are reseeded with random rows.
+    """
+    x = np.asarray(x, dtype=np.float32)
+    if len(x) < k:
+        raise SpectralAnalysisError(f"need at least {k} training rows, got {len(x)}")
+    rng = np.random.default_rng(seed)
+    centroids = x[rng.choice(len(x), k, replace=False)].copy()
+    for _ in range(n_iter):
+        labels = _assign(x, centroids)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.stack([np.bincount(labels, weights=col, minlength=k) for col in x.T], axis=1)
+        empty = counts == 0
+        centroids[~empty] = sums[~empty] / counts[~empty, None]
+        centroids[empty] = x[rng.choice(len(x), int(empty.sum()), replace=False)]
+    return centroids
+
+
+def _topk(distances, ids, k):
+    """The ``k`` smallest ``distances`` (sorted) and their ``ids``."""
+    if distances.size > k:
+        part = np.argpartition(distances, k - 1)[:k]
+        distances, ids = distances[part], ids[part]
+    order = np.argsort(distances, kind="stable")
+    return distances[order], ids[order]
+
+
+def _pad(distances, ids, k):
+    out_d = np.full(k, np.inf, dtype=np.float32)
+    out_i = np.full(k, -1, dtype=np.int64)
+    out_d[:distances.size], out_i[:ids.size] = distances, ids
+    return out_d, out_i
+
+
+def exact_search(vectors, queries, k=10, ids=None, block=65536):
+    """Brute-force ``k`` nearest rows of ``vectors`` for every query.
+
+    Returns ``(distances, ids)``, both ``(n_queries, k)``, with squared L2
+    distances ascending; ``ids`` default to row numbers.  ``vectors`` may
+    be a memory map: it is scanned in blocks of ``block`` rows.
+    """
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    best_d = np.full((len(queries), k), np.inf, dtype=np.float32)
+    best_i = np.full((len(queries), k), -1, dtype=np.int64)
+    for start in range(0, len(vectors), block):
+        chunk = np.asarray(vectors[start:start + block], dtype=np.float32)
+        chunk_ids = np.arange(start, start + len(chunk)) if ids is None else np.asarray(ids[start:start + block])
+        d = np.concatenate((best_d, _sq_distances(queries, chunk)), axis=1)
+        i = np.concatenate((best_i, np.broadcast_to(chunk_ids, (len(queries), len(chunk)))), axis=1)
+        part = np.argpartition(d, k - 1, axis=1)[:, :k]
+        best_d, best_i = np.take_along_axis(d, part, axis=1), np.take_along_axis(i, part, axis=1)
+    order = np.argsort(best_d, axis=1, kind="stable")
+    best_d, best_i = np.take_along_axis(best_d, order, axis=1), np.take_along_axis(best_i, order, axis=1)
+    return best_d, best_i
+
+
+class IVFPQIndex:
+    """Approximate nearest-neighbour index over ``float32`` vectors.
+
+    A coarse k-means quantizer splits the vectors into ``n_lists`` inverted
+    lists; each vector is stored as ``n_subvectors`` one-byte product
+    quantizer codes of its residual to the list centroid.  A query scans
+    only the ``n_probe`` closest lists, scoring candidates with per-list
+    lookup tables (asymmetric distance computation), and optionally
+    re-ranks the best ``rerank * k`` with exact distances.  Memory is
+    ``n_subvectors + 8`` bytes per vector; lists are stored contiguously,
+    so :meth:`save` / :meth:`load` memory-map them.
+    """
+
+    def __init__(self, dim, n_lists=1024, n_subvectors=8):
+        if dim % n_subvectors:
+            raise SpectralAnalysisError(f"dim {dim} is not divisible by n_subvectors {n_subvectors}")
+        self.dim = int(dim)
+        self.n_lists = int(n_lists)
+        self.n_subvectors = int(n_subvectors)
+        self.centroids = None
+        self.codebooks = None
+        self.offsets = np.zeros(self.n_lists + 1, dtype=np.int64)
+        self.ids = np.empty(0, dtype=np.int64)
+        self.codes = np.empty((0, self.n_subvectors), dtype=np.uint8)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    @property
+    def min_train_rows(self):
+        """Fewest rows :meth:`train` accepts: one per coarse or product-quantizer centroid."""
+        return max(self.n_lists, _PQ_CENTROIDS)
+
+    @property
+    def train_rows(self):
+        """Recommended size of the random training sample."""
+        return _TRAIN_PER_CENTROID * self.min_train_rows
+
+    def _split(self, x):
+        return x.reshape(len(x), self.n_subvectors, self.dim // self.n_subvectors)
+
+    def train(self, vectors, n_iter=10, seed=0):
+        """Fit the coarse and product quantizers to ``vectors``; returns ``self``.
+
+        Pass a random sample of the data for large collections: a few
+        dozen rows per list are enough (see :attr:`train_rows`).
+        """
+        x = np.asarray(vectors, dtype=np.float32)
+        if len(x) < self.min_train_rows:
+            raise SpectralAnalysisError(f"training needs at least {self.min_train_rows} rows, got {len(x)}")
+        self.centroids = kmeans(x, self.n_lists, n_iter, seed)
+        residuals = self._split(x - self.centroids[_assign(x, self.centroids)])
+        self.codebooks = np.stack([kmeans(residuals[:, j], _PQ_CENTROIDS, n_iter, seed + 1 + j)
+                                   for j in range(self.n_subvectors)])
+        return self
+
+    def encode(self, vectors):
+        """Return ``(lists, codes)`` for ``vectors``."""
+        x = np.asarray(vectors, dtype=np.float32)
+        lists = _assign(x, self.centroids)
+        residuals = self._split(x - self.centroids[lists])
+        codes = np.empty((len(x), self.n_subvectors), dtype=np.uint8)
+        for j in range(self.n_subvectors):
+            codes[:, j] = _assign(np.ascontiguousarray(residuals[:, j]), self.codebooks[j])
+        return lists, codes
+
+    def add(self, vectors, ids=None):
+        """Encode and append ``vectors`` (ids default to consecutive numbers)."""
+        if ids is None:
+            ids = np.arange(len(self), len(self) + len(vectors))
+        return self.extend([(vectors, ids)])
+
+    def extend(self, batches, block=262144):
+        """Encode and append every ``(vectors, ids)`` pair of ``batches`` in one merge.
+
+        ``vectors`` may be memory maps; they are encoded ``block`` rows at a time.
+        """
+        if not self.is_trained:
+            raise SpectralAnalysisError("index has not been trained")
+        lists, codes, ids = [], [], []
+        for vectors, batch_ids in batches:
+            for start in range(0, len(vectors), block):
+                block_lists, block_codes = self.encode(vectors[start:start + block])
+                lists.append(block_lists)
+                codes.append(block_codes)
+            ids.append(np.asarray(batch_ids, dtype=np.int64))
+        if not lists:
+            return self
+        # Merge into the list-ordered arrays; the stable sort keeps earlier entries first.
+        old_lists = np.repeat(np.arange(self.n_lists, dtype=np.int32), np.diff(self.offsets))
+        all_lists = np.concatenate([old_lists] + lists)
+        order = np.argsort(all_lists, kind="stable")
+        self.ids = np.concatenate([self.ids] + ids)[order]
+        self.codes = np.concatenate([self.codes] + codes)[order]
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(all_lists, minlength=self.n_lists))))
+        return self
+
+    def search(self, queries, k=10, n_probe=16, rerank=None, vectors=None):
+        """Approximate ``k`` nearest neighbours of every query.
+
+        With ``rerank`` the ``rerank * k`` best candidates are re-scored
+        exactly; ``vectors(ids)`` must then return their full vectors.
+        Returns ``(distances, ids)``, both ``(n_queries, k)``, padded with
+        ``inf`` / ``-1`` when fewer than ``k`` vectors are reachable.
+        """
+        if not self.is_trained:
+            raise SpectralAnalysisError("index has not been trained")
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        n_probe = min(int(n_probe), self.n_lists)
+        coarse = _sq_distances(queries, self.centroids)
+        probes = np.argpartition(coarse, n_probe - 1, axis=1)[:, :n_probe]
+        codebook_norms = np.einsum("mcd,mcd->mc", self.codebooks, self.codebooks)
+        steps = np.arange(self.n_subvectors) * _PQ_CENTROIDS
+        out_d = np.empty((len(queries), k), dtype=np.float32)
+        out_i = np.empty((len(queries), k), dtype=np.int64)
+        for q, query in enumerate(queries):
+            lists = probes[q]
+            starts, stops = self.offsets[lists], self.offsets[lists + 1]
+            sizes = stops - starts
+            if not sizes.sum():
+                out_d[q], out_i[q] = _pad(np.empty(0), np.empty(0), k)
+                continue
+            # Lookup tables (n_probe, n_subvectors, 256) of squared residual distances.
+            residual = self._split(query[None, :] - self.centroids[lists])
+            tables = codebook_norms[None] - 2 * np.einsum("pmd,mcd->pmc", residual, self.codebooks)
+            tables += np.einsum("pmd,pmd->pm", residual, residual)[:, :, None]
+            rows = np.concatenate([np.arange(a, b) for a, b in zip(starts, stops)])
+            codes = self.codes[rows]
+            base = np.repeat(np.arange(n_probe) * self.n_subvectors * _PQ_CENTROIDS, sizes)
+            distances = np.take(tables, codes + (base[:, None] + steps)).sum(axis=1)
+            keep = k * rerank if rerank and vectors is not None else k
+            d, ids = _topk(distances, self.ids[rows], keep)
+            if keep > k:
+                exact = np.asarray(vectors(ids), dtype=np.float32) - query
+                d, ids = _topk(np.einsum("ij,ij->i", exact, exact), ids, k)
+            out_d[q], out_i[q] = _pad(d, ids, k)
+        return out_d, out_i
+
+    def save(self, path):
+        """Write the index to the directory ``path``, replacing it atomically."""
+        parent = os.path.dirname(os.path.abspath(path))
+        os.makedirs(parent, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=parent)
+        try:
+            for name in ("centroids", "codebooks", "offsets", "ids", "codes"):
+                np.save(os.path.join(tmp, f"{name}.npy"), getattr(self, name))
+            with open(os.path.join(tmp, "meta.json"), "w") as fh:
+                json.dump({"dim": self.dim, "n_lists": self.n_lists, "n_subvectors": self.n_subvectors}, fh)
+            if os.path.isdir(path):
+                old = tempfile.mkdtemp(prefix=".old-", dir=parent)
+                os.rename(path, os.path.join(old, "index"))
+                os.rename(tmp, path)
+                shutil.rmtree(old, ignore_errors=True)
+            else:
+                os.rename(tmp, path)
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """Open an index written by :meth:`save`, memory-mapping its lists."""
+        with open(os.path.join(path, "meta.json")) as fh:
+            meta = json.load(fh)
+        index = cls(meta["dim"], meta["n_lists"], meta["n_subvectors"])
+        for name in ("centroids", "codebooks", "offsets"):
+            setattr(index, name, np.load(os.path.join(path, f"{name}.npy")))
+        for name in ("ids", "codes"):
+            setattr(index, name, np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode))
+        return index
@@ -0,0 +1,261 @@
+"""Append-only columnar store of labelled reference spectra."""
+
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.database.index import IVFPQIndex, exact_search
+
+# Floor of the log spectrum used for embeddings, relative to each row's peak.
+_EMBED_FLOOR = 1e-12
+
+
+def embed_spectra(spectra, dim=64):
+    """Downsample spectra to ``dim``-dimensional search vectors.
+
+    Bins are averaged into ``dim`` equal bands, converted to log power
+    relative to the row's mean and scaled to unit length, so vectors
+    compare spectral shape independently of gain.  Returns ``float32``.
+    """
+    x = np.atleast_2d(np.asarray(spectra, dtype=np.float64))
+    if x.shape[1] < dim:
+        raise SpectralAnalysisError(f"spectra have {x.shape[1]} bins, fewer than dim={dim}")
+    edges = np.linspace(0, x.shape[1], dim + 1).astype(np.intp)
+    bands = np.add.reduceat(x, edges[:-1], axis=1) / np.diff(edges)
+    peak = bands.max(axis=1, keepdims=True)
+    v = np.log10(np.maximum(bands, _EMBED_FLOOR * np.where(peak > 0, peak, 1.0)))
+    v -= v.mean(axis=1, keepdims=True)
+    norm = np.linalg.norm(v, axis=1, keepdims=True)
+    return (v / np.where(norm > 0, norm, 1.0)).astype(np.float32)
+
+
+class _Segment:
+    """One immutable, memory-mapped batch of rows."""
+
+    def __init__(self, path):
+        self.path = path
+        self.spectra = np.load(os.path.join(path, "spectra.npy"), mmap_mode="r")
+        self.vectors = np.load(os.path.join(path, "vectors.npy"), mmap_mode="r")
+        self.columns = {}
+        for name in os.listdir(os.path.join(path, "meta")):
+            self.columns[name[:-4]] = np.load(os.path.join(path, "meta", name), mmap_mode="r")
+
+    def __len__(self):
+        return len(self.spectra)
+
+
+class SpectralStore:
+    """Reference spectra on disk, with metadata and a nearest-neighbour index.
+
+    A store is a directory holding the shared frequency axis, a
+    ``manifest.json`` and one directory per appended segment.  Each
+    segment keeps its columns as separate ``.npy`` files: ``float32``
+    spectra, their search vectors (:func:`embed_spectra` unless given) and
+    one array per metadata field, all memory-mapped on open.  Segments are
+    never modified; :meth:`append` publishes a new one with a rename and
+    then swaps the manifest, so readers always see whole segments.  One
+    writer at a time is supported.
+
+    :meth:`build_index` trains an :class:`~spectranova.database.index.IVFPQIndex`
+    over the vectors; :meth:`search` uses it for the indexed rows and scans
+    rows appended since exactly, until :meth:`update_index` adds them.
+
+    >>> store = SpectralStore.create("refs", freqs)
+    >>> store.append(spectra, {"label": labels, "sample": names})
+    >>> store.build_index()
+    >>> store.query(spectrum, k=10)
+    """
+
+    def __init__(self, root):
+        self.root = root
+        try:
+            self.freqs = np.load(os.path.join(root, "freqs.npy"))
+        except OSError:
+            raise SpectralAnalysisError(f"no spectral store at {root}") from None
+        self._segments = {}
+        self.index = None
+        self.refresh()
+
+    @classmethod
+    def create(cls, root, freqs, dim=64):
+        """Create an empty store for spectra sampled at ``freqs``; returns it opened."""
+        if os.path.exists(os.path.join(root, "manifest.json")):
+            raise SpectralAnalysisError(f"{root} already holds a spectral store")
+        os.makedirs(root, exist_ok=True)
+        np.save(os.path.join(root, "freqs.npy"), np.asarray(freqs, dtype=float))
+        cls._write_manifest(root, {"dim": int(dim), "segments": [], "indexed_rows": 0})
+        return cls(root)
+
+    @staticmethod
+    def _write_manifest(root, manifest):
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=root)
+        with os.fdopen(fd, "w") as fh:
+            json.dump(manifest, fh, indent=2)
+        os.replace(tmp, os.path.join(root, "manifest.json"))
+
+    def refresh(self):
+        """Re-read the manifest to pick up segments appended by another process."""
+        with open(os.path.join(self.root, "manifest.json")) as fh:
+            self.manifest = json.load(fh)
+        names = [s["name"] for s in self.manifest["segments"]]
+        self._segments = {name: self._segments.get(name) or _Segment(os.path.join(self.root, name))
+                          for name in names}
+        self.offsets = np.concatenate(([0], np.cumsum([len(s) for s in self._segments.values()])))
+        if self.manifest["indexed_rows"] and (self.index is None or len(self.index) != self.manifest["indexed_rows"]):
+            self.index = IVFPQIndex.load(os.path.join(self.root, "index"))
+        return self
+
+    @property
+    def dim(self):
+        return self.manifest["dim"]
+
+    @property
+    def segments(self):
+        return list(self._segments.values())
+
+    def __len__(self):
+        return int(self.offsets[-1])
+
+    def append(self, spectra, metadata=None, vectors=None):
+        """Add rows as a new segment and return their ids.
+
+        ``metadata`` maps field names to one value per row; ``vectors``
+        (e.g. standardized :func:`~spectranova.ml.features.extract_features`
+        rows) replace the default spectrum embedding and must have the
+        store's ``dim`` columns.
+        """
+        spectra = np.atleast_2d(np.asarray(spectra, dtype=np.float32))
+        if spectra.shape[1] != self.freqs.size:
+            raise SpectralAnalysisError(f"spectra must have {self.freqs.size} bins, got {spectra.shape[1]}")
+        vectors = embed_spectra(spectra, self.dim) if vectors is None else np.asarray(vectors, dtype=np.float32)
+        if vectors.shape != (len(spectra), self.dim):
+            raise SpectralAnalysisError(f"vectors must have shape ({len(spectra)}, {self.dim})")
+        columns = {}
+        for field, values in (metadata or {}).items():
+            values = np.asarray(values)
+            if len(values) != len(spectra) or values.dtype == object:
+                raise SpectralAnalysisError(f"metadata {field!r} needs one number or string per row")
+            columns[field] = values
+        name = f"seg-{len(self.manifest['segments']):06d}"
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.root)
+        try:
+            os.mkdir(os.path.join(tmp, "meta"))
+            np.save(os.path.join(tmp, "spectra.npy"), spectra)
+            np.save(os.path.join(tmp, "vectors.npy"), vectors)
+            for field, values in columns.items():
+                np.save(os.path.join(tmp, "meta", f"{field}.npy"), values)
+            os.rename(tmp, os.path.join(self.root, name))
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        start = len(self)
+        manifest = dict(self.manifest, segments=self.manifest["segments"] + [{"name": name, "rows": len(spectra)}])
+        self._write_manifest(self.root, manifest)
+        self.refresh()
+        return np.arange(start, start + len(spectra))
+
+    def _locate(self, ids):
+        ids = np.asarray(ids, dtype=np.int64)
+        if ids.size and (ids.min() < 0 or ids.max() >= len(self)):
+            raise SpectralAnalysisError("row id out of range")
+        return ids, np.searchsorted(self.offsets, ids, side="right") - 1
+
+    def _gather(self, column, ids):
+        ids, seg = self._locate(ids)
+        segments = self.segments
+        out = np.empty((ids.size,) + getattr(segments[0], column).shape[1:], dtype=np.float32)
+        for s in np.unique(seg):
+            mask = seg == s
+            out[mask] = getattr(segments[s], column)[ids[mask] - self.offsets[s]]
+        return out
+
+    def spectra(self, ids):
+        """Return the spectra of rows ``ids``."""
+        return self._gather("spectra", ids)
+
+    def vectors(self, ids):
+        """Return the search vectors of rows ``ids``."""
+        return self._gather("vectors", ids)
+
+    def metadata(self, ids):
+        """Return one ``{field: value}`` dict per row id."""
+        ids, seg = self._locate(ids)
+        segments = self.segments
+        return [{field: values[i - self.offsets[s]].item() for field, values in segments[s].columns.items()}
+                for i, s in zip(ids.tolist(), seg.tolist())]
+
+    def build_index(self, n_lists=None, n_subvectors=16, n_iter=10, seed=0):
+        """Train an IVF-PQ index over every row and save it with the store.
+
+        ``n_lists`` defaults to about ``2 * sqrt(rows)``; the quantizers are
+        trained on a random sample of ``32 * max(n_lists, 256)`` rows, and
+        the store needs at least ``max(n_lists, 256)`` rows (smaller stores
+        are searched exactly without an index).  Returns the index.
+        """
+        n = len(self)
+        if n_lists is None:
+            n_lists = int(min(max(16, 2 * np.sqrt(n)), 65536))
+        index = IVFPQIndex(self.dim, n_lists, n_subvectors)
+        if n < index.min_train_rows:
+            raise SpectralAnalysisError(f"an index with {n_lists} lists needs at least {index.min_train_rows} rows, "
+                                        f"the store has {n}; search() scans small stores exactly")
+        rng = np.random.default_rng(seed)
+        sample = np.sort(rng.choice(n, min(n, index.train_rows), replace=False))
+        index.train(self.vectors(sample), n_iter, seed)
+        index.extend((s.vectors, np.arange(lo, lo + len(s))) for s, lo in zip(self.segments, self.offsets))
+        index.save(os.path.join(self.root, "index"))
+        self._write_manifest(self.root, dict(self.manifest, indexed_rows=n))
+        self.index = None
+        return self.refresh().index
+
+    def update_index(self):
+        """Encode rows appended since the index was built with the existing quantizers."""
+        start = self.manifest["indexed_rows"]
+        if self.index is None:
+            raise SpectralAnalysisError("store has no index; call build_index() first")
+        if start == len(self):
+            return self.index
+        index = IVFPQIndex.load(os.path.join(self.root, "index"), mmap_mode=None)
+        index.add(self.vectors(np.arange(start, len(self))), np.arange(start, len(self)))
+        index.save(os.path.join(self.root, "index"))
+        self._write_manifest(self.root, dict(self.manifest, indexed_rows=len(self)))
+        self.index = None
+        return self.refresh().index
+
+    def search(self, vectors, k=10, n_probe=16, rerank=8):
+        """Return ``(distances, ids)`` of the ``k`` nearest rows to each query vector.
+
+        Indexed rows are searched approximately (see
+        :meth:`IVFPQIndex.search <spectranova.database.index.IVFPQIndex.search>`),
+        newer rows exactly; without an index every row is scanned.
+        """
+        queries = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        indexed = self.manifest["indexed_rows"] if self.index is not None else 0
+        if indexed:
+            best_d, best_i = self.index.search(queries, k, n_probe, rerank, self.vectors)
+        else:
+            best_d = np.full((len(queries), k), np.inf, dtype=np.float32)
+            best_i = np.full((len(queries), k), -1, dtype=np.int64)
+        for s, segment in enumerate(self.segments):
+            lo = max(indexed - self.offsets[s], 0)
+            if lo >= len(segment):
+                continue
+            d, i = exact_search(segment.vectors[lo:], queries, k)
+            d = np.concatenate((best_d, d), axis=1)
+            i = np.concatenate((best_i, np.where(i >= 0, i + self.offsets[s] + lo, -1)), axis=1)
+            order = np.argsort(d, axis=1, kind="stable")[:, :k]
+            best_d, best_i = np.take_along_axis(d, order, axis=1), np.take_along_axis(i, order, axis=1)
+        return best_d, best_i
+
+    def query(self, spectrum, k=10, n_probe=16, rerank=8):
+        """Return the ``k`` reference rows most similar to ``spectrum``, nearest first.
+
+        Each match is a dict of ``id``, ``distance`` and the row's metadata.
+        """
+        distances, ids = self.search(embed_spectra(spectrum, self.dim), k, n_probe, rerank)
+        found = ids[0] >= 0
+        return [{"id": int(i), "distance": float(d), **meta}
+                for i, d, meta in zip(ids[0][found], distances[0][found], self.metadata(ids[0][found]))]
@@ -1 +1,21 @@
 """Machine Learning module for spectral data."""
+
+from spectranova._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "FEATURE_NAMES": "features",
+    "extract_features": "features",
+    "extract_features_batch": "features",
+    "features_from_spectrum": "features",
+    "featurize_file": "features",
+    "SpectralClassifier": "classifier",
+    "FlatForest": "classifier",
+    "SpectralAnomalyDetector": "anomaly",
+    "HalfSpaceTrees": "anomaly",
+    "load_model": "registry",
+    "save_model": "registry",
+    "list_models": "registry",
+    "FeatureStore": "store",
+    "build_training_set": "training",
+    "train": "training",
+})
@@ -1,5 +1,268 @@
 """Anomaly detection on spectral features."""
 
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.instrument import instrumented
+
+# Rows scored per block; bounds the (rows, n_trees, depth + 1) path array.
+_SCORE_BLOCK = 4096
+
+
 class SpectralAnomalyDetector:
-    """Anomaly detector using Isolation Forest."""
-    pass
+    """Anomaly detector using Isolation Forest.
+
+    A thin wrapper over scikit-learn's ``IsolationForest`` (imported on
+    first :meth:`fit`) that accepts the ``(n_signals, n_features)`` matrices
+    produced by :func:`~spectranova.ml.features.extract_features_batch`.
+    Scores follow scikit-learn: lower :meth:`score_samples` values are more
+    anomalous, and :meth:`predict` returns ``-1`` for outliers.  Refitting
+    means retraining on the whole baseline; for drifting streams use
+    :class:`HalfSpaceTrees`, which shares this scoring interface.
+    """
+
+    def __init__(self, n_estimators=100, contamination="auto", random_state=None, **params):
+        self.params = dict(n_estimators=n_estimators, contamination=contamination,
+                           random_state=random_state, **params)
+        self.model = None
+
+    def fit(self, features):
+        """Fit the forest to ``features`` and return ``self``."""
+        from sklearn.ensemble import IsolationForest
+
+        self.model = IsolationForest(**self.params).fit(np.asarray(features, dtype=float))
+        return self
+
+    def _fitted(self):
+        if self.model is None:
+            raise SpectralAnalysisError("detector has not been fitted")
+        return self.model
+
+    @instrumented("isolation_forest.score_samples")
+    def score_samples(self, features):
+        """Return one anomaly score per row; lower is more anomalous."""
+        return self._fitted().score_samples(np.asarray(features, dtype=float))
+
+    @instrumented("isolation_forest.predict")
+    def predict(self, features):
+        """Return ``-1`` for anomalous rows and ``1`` for normal ones."""
+        return self._fitted().predict(np.asarray(features, dtype=float))
+
+
+class HalfSpaceTrees:
+    """Streaming anomaly detector using Half-Space Trees (Tan et al., 2011).
+
+    ``n_trees`` random binary trees of fixed ``depth`` halve a random
+    feature's range at every node; each node counts the samples of the
+    latest window (``window`` samples) and keeps the counts of the
+    previous one as reference mass.  A sample scores the reference mass of
+    the deepest well-populated node on its path (scaled by ``2 ** depth``),
+    so sparse regions score low.  Updates cost O(n_trees * depth) per
+    sample, memory is fixed by the tree shape, and batches are scored and
+    counted with vectorized gathers.
+
+    Features are scaled to [0, 1] with per-feature ``limits`` (``(mins,
+    maxs)``) or, by default, the range of the data given to :meth:`fit`.
+    With ``snapshot_path`` the full state is written there every
+    ``snapshot_every`` samples, and :meth:`load` resumes from it.
+
+    Lower :meth:`score_samples` values are more anomalous; :meth:`predict`
+    flags samples below the ``contamination`` quantile of the previous
+    window's scores.
+    """
+
+    # State written by save(): scalars go to JSON, arrays to the archive.
+    _PARAMS = ("n_trees", "depth", "window", "size_limit", "contamination", "n_seen", "threshold", "_filled")
+    _ARRAYS = ("split_dim", "split_value", "_lower", "_span", "_reference", "_latest", "_scores")
+
+    def __init__(self, n_trees=25, depth=10, window=250, size_limit=None, limits=None,
+                 contamination=0.01, random_state=None, snapshot_path=None, snapshot_every=None):
+        if n_trees < 1 or depth < 1 or window < 1:
+            raise SpectralAnalysisError("n_trees, depth and window must be positive")
+        self.n_trees = int(n_trees)
+        self.depth = int(depth)
+        self.window = int(window)
+        self.size_limit = 0.1 * self.window if size_limit is None else float(size_limit)
+        self.contamination = float(contamination)
+        self.random_state = random_state
+        self.snapshot_path = snapshot_path
+        self.snapshot_every = snapshot_every
+        self.split_dim = None
+        self.split_value = None
+        self._lower = self._span = None
+        self.n_seen = 0
+        self.threshold = None
+        self._since_snapshot = 0
+        if limits is not None:
+            self._init_trees(*limits)
+
+    @property
+    def n_nodes(self):
+        return 2 ** (self.depth + 1) - 1
+
+    def _init_trees(self, mins, maxs):
+        mins, maxs = np.asarray(mins, dtype=float), np.asarray(maxs, dtype=float)
+        self._lower = mins
+        self._span = np.where(maxs > mins, maxs - mins, 1.0)
+        n_features = mins.size
+        rng = np.random.default_rng(self.random_state)
+        n_internal = 2 ** self.depth - 1
+        self.split_dim = np.empty((self.n_trees, n_internal), dtype=np.int32)
+        self.split_value = np.empty((self.n_trees, n_internal))
+        for t in range(self.n_trees):
+            # Random work space around a random point of the unit cube.
+            centre = rng.uniform(size=n_features)
+            half = 2 * np.maximum(centre, 1 - centre)
+            lo, hi = (centre - half)[None, :], (centre + half)[None, :]
+            for d in range(self.depth):
+                first = 2 ** d - 1
+                dims = rng.integers(n_features, size=2 ** d)
+                rows = np.arange(2 ** d)
+                mid = (lo[rows, dims] + hi[rows, dims]) / 2
+                self.split_dim[t, first:first + 2 ** d] = dims
+                self.split_value[t, first:first + 2 ** d] = mid
+                lo, hi = np.repeat(lo, 2, axis=0), np.repeat(hi, 2, axis=0)
+                lo[1::2][rows, dims] = mid
+                hi[0::2][rows, dims] = mid
+        self._reference = np.zeros((self.n_trees, self.n_nodes))
+        self._latest = np.zeros((self.n_trees, self.n_nodes))
+        self._scores = np.empty(self.window)
+        self._filled = 0
+
+    def _paths(self, x):
+        # Node index at every level of every tree: (n, n_trees, depth + 1).
+        x = np.atleast_2d(np.asarray(x, dtype=float))
+        if x.ndim != 2 or x.shape[1] != self._lower.size:
+            raise SpectralAnalysisError(f"features must have shape (n_rows, {self._lower.size})")
+        x = (x - self._lower) / self._span
+        trees = np.arange(self.n_trees)[None, :]
+        rows = np.arange(x.shape[0])[:, None]
+        paths = np.zeros((x.shape[0], self.n_trees, self.depth + 1), dtype=np.intp)
+        node = paths[:, :, 0]
+        for d in range(self.depth):
+            right = x[rows, self.split_dim[trees, node]] > self.split_value[trees, node]
+            node = 2 * node + 1 + right
+            paths[:, :, d + 1] = node
+        return paths
+
+    def _score(self, paths):
+        mass = self._reference[np.arange(self.n_trees)[None, :, None], paths]
+        stop = mass <= self.size_limit
+        stop[:, :, -1] = True
+        level = np.argmax(stop, axis=2)
+        reached = np.take_along_axis(mass, level[:, :, None], axis=2)[:, :, 0]
+        return (reached * 2.0 ** level).sum(axis=1) / (self.n_trees * self.window)
+
+    def _check(self):
+        if self.split_dim is None:
+            raise SpectralAnalysisError("detector has no feature limits; call fit() or pass limits")
+
+    def fit(self, features):
+        """Set the feature limits from ``features`` (unless given) and stream them in.
+
+        Needs at least ``window`` rows to establish the first reference mass.
+        """
+        x = np.asarray(features, dtype=float)
+        if self.split_dim is None:
+            self._init_trees(x.min(axis=0), x.max(axis=0))
+        self.update(x)
+        return self
+
+    @instrumented("half_space_trees.score_samples")
+    def score_samples(self, features):
+        """Score rows against the reference window without learning from them."""
+        self._check()
+        x = np.atleast_2d(np.asarray(features, dtype=float))
+        out = np.empty(x.shape[0])
+        for start in range(0, x.shape[0], _SCORE_BLOCK):
+            out[start:start + _SCORE_BLOCK] = self._score(self._paths(x[start:start + _SCORE_BLOCK]))
+        return out
+
+    @instrumented("half_space_trees.predict")
+    def predict(self, features):
+        """Return ``-1`` for anomalous rows and ``1`` for normal ones."""
+        if self.threshold is None:
+            raise SpectralAnalysisError("no complete window has been seen yet")
+        return np.where(self.score_samples(features) < self.threshold, -1, 1)
+
+    @instrumented("half_space_trees.score_update")
+    def score_update(self, features):
+        """Score each row, then learn from it (prequential evaluation).
+
+        Rows are processed in order; when a window completes mid-batch the
+        reference mass switches before the following rows are scored.
+        """
+        self._check()
+        x = np.atleast_2d(np.asarray(features, dtype=float))
+        out = np.empty(x.shape[0])
+        start = 0
+        while start < x.shape[0]:
+            stop = min(x.shape[0], start + self.window - self._filled)
+            paths = self._paths(x[start:stop])
+            scores = self._score(paths)
+            out[start:stop] = scores
+            flat = (np.arange(self.n_trees)[None, :, None] * self.n_nodes + paths).ravel()
+            if flat.size * 8 < self._latest.size:
+                # Few rows: touch only their paths, keeping updates O(n_trees * depth).
+                np.add.at(self._latest.reshape(-1), flat, 1)
+            else:
+                self._latest += np.bincount(flat, minlength=self._latest.size).reshape(self._latest.shape)
+            self._scores[self._filled:self._filled + scores.size] = scores
+            self._filled += scores.size
+            if self._filled == self.window:
+                self._roll()
+            start = stop
+        self.n_seen += x.shape[0]
+        self._since_snapshot += x.shape[0]
+        if self.snapshot_path and self.snapshot_every and self._since_snapshot >= self.snapshot_every:
+            self.save(self.snapshot_path)
+        return out
+
+    def update(self, features):
+        """Learn from rows; returns ``self``."""
+        self.score_update(features)
+        return self
+
+    def _roll(self):
+        # Only scores taken against an established reference calibrate predict().
+        if self._reference.any():
+            self.threshold = float(np.quantile(self._scores, self.contamination))
+        self._reference, self._latest = self._latest, self._reference
+        self._latest[:] = 0
+        self._filled = 0
+
+    def save(self, path):
+        """Write the complete detector state to ``path`` (``.npz``) atomically."""
+        self._check()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        params = {name: getattr(self, name) for name in self._PARAMS}
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".npz", dir=directory)
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(fh, params=json.dumps(params), **{name.lstrip("_"): getattr(self, name)
+                                                          for name in self._ARRAYS})
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self._since_snapshot = 0
+
+    @classmethod
+    def load(cls, path, snapshot_path=None, snapshot_every=None):
+        """Restore a detector written by :meth:`save`."""
+        with np.load(path) as data:
+            params = json.loads(str(data["params"]))
+            detector = cls(params["n_trees"], params["depth"], params["window"], params["size_limit"],
+                           contamination=params["contamination"], snapshot_path=snapshot_path,
+                           snapshot_every=snapshot_every)
+            for name in cls._ARRAYS:
+                setattr(detector, name, data[name.lstrip("_")].copy())
+        detector.n_seen = params["n_seen"]
+        detector.threshold = params["threshold"]
+        detector._filled = params["_filled"]
+        return detector
@@ -1,5 +1,370 @@
 """Spectral classifiers."""
 
+import collections
+import concurrent.futures
+import os
+import threading
+import time
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.instrument import instrumented
+
+MODELS = ("rf", "svm")
+
+# Rows traversed per block; bounds the (rows * n_trees) node-index temporaries.
+_PREDICT_BLOCK = 8192
+# Forest descent steps between compactions of the still-moving (row, tree) pairs.
+_COMPACT_EVERY = 4
+
+
+class FlatForest:
+    """Every tree of a fitted forest flattened into shared node arrays.
+
+    ``children[node]`` holds the (right, left) successors and leaves point
+    to themselves, so a batch descends all trees at once with vectorized
+    gathers; finished (row, tree) pairs are compacted away as they land.
+    :meth:`save` writes one ``.npy`` file per array in :attr:`FIELDS` and
+    :meth:`load` memory-maps them back.
+    """
+
+    FIELDS = ("feature", "threshold", "children", "value", "roots")
+
+    def __init__(self, feature, threshold, children, value, roots, depth):
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.value = value
+        self.roots = roots
+        self.depth = int(depth)
+
+    @classmethod
+    def from_sklearn(cls, forest):
+        parts = collections.defaultdict(list)
+        offset, depth = 0, 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n = tree.node_count
+            leaf = tree.children_left < 0
+            index = np.arange(offset, offset + n)
+            parts["feature"].append(np.where(leaf, 0, tree.feature))
+            parts["threshold"].append(np.where(leaf, 0.0, tree.threshold))
+            parts["children"].append(np.column_stack((
+                np.where(leaf, index, tree.children_right + offset),
+                np.where(leaf, index, tree.children_left + offset),
+            )))
+            value = tree.value[:, 0, :]
+            parts["value"].append(value / np.maximum(value.sum(axis=1, keepdims=True), 1e-300))
+            parts["roots"].append(offset)
+            offset += n
+            depth = max(depth, tree.max_depth)
+        return cls(
+            np.concatenate(parts["feature"]).astype(np.int32),
+            np.concatenate(parts["threshold"]),
+            np.concatenate(parts["children"]).astype(np.int32),
+            np.concatenate(parts["value"]),
+            np.array(parts["roots"], dtype=np.int32),
+            depth,
+        )
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in self.FIELDS)
+
+    def save(self, path):
+        """Write the node arrays into the existing directory ``path``."""
+        for name in self.FIELDS:
+            np.save(os.path.join(path, f"{name}.npy"), getattr(self, name))
+
+    @classmethod
+    def load(cls, path, depth, mmap_mode="r"):
+        """Return the forest saved in ``path`` by :meth:`save`, memory-mapped by default."""
+        arrays = [np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode) for name in cls.FIELDS]
+        return cls(*arrays, depth)
+
+    def astype(self, dtype):
+        """Return a copy with thresholds and leaf values stored as ``dtype``.
+
+        Thresholds are rounded down, so ``x <= threshold`` splits every
+        ``float32`` input exactly as the ``float64`` forest did.
+        """
+        threshold = self.threshold.astype(dtype)
+        over = threshold > self.threshold
+        threshold[over] = np.nextafter(threshold[over], dtype(-np.inf))
+        return FlatForest(self.feature, threshold, self.children, self.value.astype(dtype),
+                       self.roots, self.depth)
+
+    def _leaves(self, x):
+        """Leaf reached in every tree by every row of ``x``, shape ``(rows * trees,)``."""
+        n_trees, n_features = self.roots.size, x.shape[1]
+        flat = x.ravel()
+        children = self.children.reshape(-1)
+        node = np.tile(self.roots, x.shape[0])
+        base = np.repeat(np.arange(x.shape[0], dtype=np.intp) * n_features, n_trees)
+        leaves, alive = node, None
+        for step in range(1, self.depth + 2):
+            go_left = np.take(flat, base + np.take(self.feature, node)) <= np.take(self.threshold, node)
+            succ = np.take(children, 2 * node + go_left)
+            if step % _COMPACT_EVERY and step <= self.depth:
+                node = succ
+                continue
+            # Drop pairs that have stopped moving, i.e. reached a leaf.
+            if alive is None:
+                leaves = succ.copy()
+                keep = np.flatnonzero(succ != node)
+                alive = keep
+            else:
+                leaves[alive] = succ
+                keep = np.flatnonzero(succ != node)
+                alive = alive[keep]
+            if not alive.size:
+                break
+            node, base = succ[keep], base[keep]
+        return leaves
+
+    def predict_proba(self, x):
+        # Trees split float32 features, as scikit-learn does.
+        x = np.ascontiguousarray(x, dtype=np.float32)
+        n_trees, n_classes = self.roots.size, self.value.shape[1]
+        out = np.empty((x.shape[0], n_classes))
+        for start in range(0, x.shape[0], _PREDICT_BLOCK):
+            block = x[start:start + _PREDICT_BLOCK]
+            probs = np.take(self.value, self._leaves(block), axis=0)
+            out[start:start + block.shape[0]] = probs.reshape(block.shape[0], n_trees, n_classes).mean(axis=1)
+        return out
+
+
+class MicroBatcher:
+    """Coalesce concurrent prediction requests into batched calls.
+
+    :meth:`submit` queues a feature row (or block) and returns a
+    :class:`concurrent.futures.Future`.  A worker thread runs ``predict``
+    on everything pending once ``max_batch`` rows have accumulated or the
+    oldest request has waited ``max_delay`` seconds, whichever is first.
+    """
+
+    def __init__(self, predict, max_batch=1024, max_delay=0.002):
+        self.predict = predict
+        self.max_batch = int(max_batch)
+        self.max_delay = float(max_delay)
+        self._pending = collections.deque()
+        self._rows = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, features):
+        """Queue ``features`` and return a future of their predictions."""
+        x = np.asarray(features)
+        future = concurrent.futures.Future()
+        with self._cond:
+            if self._closed:
+                raise SpectralAnalysisError("batcher is closed")
+            self._pending.append((time.perf_counter(), x, future))
+            self._rows += 1 if x.ndim == 1 else x.shape[0]
+            self._cond.notify()
+        return future
+
+    def _take(self):
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return None
+            deadline = self._pending[0][0] + self.max_delay
+            while self._rows < self.max_batch and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch, rows = [], 0
+            while self._pending and (not batch or rows < self.max_batch):
+                _, x, future = self._pending.popleft()
+                n = 1 if x.ndim == 1 else x.shape[0]
+                batch.append((x, future))
+                rows += n
+            self._rows -= rows
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take()
+            if batch is None:
+                return
+            try:
+                result = self.predict(np.vstack([x for x, _ in batch]))
+            except Exception as exc:
+                for _, future in batch:
+                    future.set_exception(exc)
+                continue
+            start = 0
+            for x, future in batch:
+                if x.ndim == 1:
+                    future.set_result(result[start])
+                    start += 1
+                else:
+                    future.set_result(result[start:start + x.shape[0]])
+                    start += x.shape[0]
+
+    def close(self):
+        """Flush pending requests and stop the worker."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
 class SpectralClassifier:
-    """Classifier for spectral features."""
-    pass
+    """Classifier for spectral features.
+
+    ``model`` is ``"rf"`` (scikit-learn ``RandomForestClassifier``) or
+    ``"svm"`` (a standardised ``SVC``); ``params`` go to the estimator.
+    scikit-learn is imported on :meth:`fit` only.  A fitted random forest
+    is flattened into NumPy node arrays and predicted with vectorized
+    traversal, so saved forests (see :mod:`spectranova.ml.registry`) load
+    by memory-mapping and predict without scikit-learn.  :meth:`metrics`
+    reports load time, rows served and per-row latency.
+    """
+
+    def __init__(self, model="rf", **params):
+        if model not in MODELS:
+            raise SpectralAnalysisError(f"unknown model: {model!r}")
+        self.model = model
+        self.params = params
+        self.estimator = None
+        self.classes_ = None
+        self.n_features = None
+        self.forest = None
+        self.meta = None
+        self.load_seconds = 0.0
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._rows = 0
+        self._seconds = 0.0
+
+    def fit(self, features, labels):
+        """Fit the estimator and return ``self``.
+
+        ``float32`` features (e.g. a memory-mapped training set) are passed
+        on without a ``float64`` copy; forests split ``float32`` anyway.
+        """
+        x = np.asarray(features)
+        if x.dtype not in (np.float32, np.float64):
+            x = x.astype(float)
+        if self.model == "rf":
+            from sklearn.ensemble import RandomForestClassifier
+
+            self.estimator = RandomForestClassifier(**self.params).fit(x, labels)
+            self.forest = FlatForest.from_sklearn(self.estimator)
+        else:
+            from sklearn.pipeline import make_pipeline
+            from sklearn.preprocessing import StandardScaler
+            from sklearn.svm import SVC
+
+            self.estimator = make_pipeline(StandardScaler(), SVC(**self.params)).fit(x, labels)
+        self.classes_ = np.asarray(self.estimator.classes_)
+        self.n_features = x.shape[1]
+        return self
+
+    def compact(self, dtype=np.float32):
+        """Store forest thresholds and leaf values as ``dtype``; returns ``self``.
+
+        Halves the model size with ``float32``; split decisions are
+        unchanged and class probabilities agree to ``float32`` precision.
+        Models without a flattened forest are left as they are.
+        """
+        if self.forest is not None:
+            self.forest = self.forest.astype(np.dtype(dtype).type)
+        return self
+
+    def _check(self, features):
+        if self.classes_ is None:
+            raise SpectralAnalysisError("classifier has not been fitted")
+        x = np.asarray(features)
+        if x.ndim != 2 or x.shape[1] != self.n_features:
+            raise SpectralAnalysisError(f"features must have shape (n_rows, {self.n_features})")
+        return x
+
+    def _timed(self, func, x):
+        start = time.perf_counter()
+        result = func(x)
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._calls += 1
+            self._rows += x.shape[0]
+            self._seconds += elapsed
+        return result
+
+    @instrumented("classifier.predict_proba")
+    def predict_proba(self, features):
+        """Return ``(n_rows, n_classes)`` class probabilities."""
+        x = self._check(features)
+        if self.forest is not None:
+            return self._timed(self.forest.predict_proba, x)
+        return self._timed(self.estimator.predict_proba, x)
+
+    @instrumented("classifier.predict")
+    def predict(self, features):
+        """Return one class label per row."""
+        x = self._check(features)
+        if self.forest is not None:
+            return self.classes_[np.argmax(self._timed(self.forest.predict_proba, x), axis=1)]
+        return self._timed(self.estimator.predict, x)
+
+    def predict_many(self, requests, max_batch=1024, max_delay=None):
+        """Predict a stream of requests, coalescing them into batched calls.
+
+        ``requests`` is an iterable of feature rows or ``(n, n_features)``
+        blocks.  Pending requests are predicted together once ``max_batch``
+        rows have accumulated or, with ``max_delay``, once the oldest has
+        waited that many seconds (checked as requests arrive).  Yields one
+        result per request, in order: a label for a row, labels for a block.
+        """
+        pending, rows, since = [], 0, None
+        for request in requests:
+            x = np.asarray(request)
+            pending.append(x)
+            rows += 1 if x.ndim == 1 else x.shape[0]
+            since = time.perf_counter() if since is None else since
+            if rows >= max_batch or (max_delay is not None and time.perf_counter() - since >= max_delay):
+                yield from self._split(pending)
+                pending, rows, since = [], 0, None
+        if pending:
+            yield from self._split(pending)
+
+    def _split(self, pending):
+        labels = self.predict(np.vstack(pending))
+        start = 0
+        for x in pending:
+            if x.ndim == 1:
+                yield labels[start]
+                start += 1
+            else:
+                yield labels[start:start + x.shape[0]]
+                start += x.shape[0]
+
+    def batcher(self, max_batch=1024, max_delay=0.002):
+        """Return a :class:`MicroBatcher` serving :meth:`predict` to many threads."""
+        return MicroBatcher(self.predict, max_batch, max_delay)
+
+    def metrics(self):
+        """Return load time, calls, rows, rows per second and mean microseconds per row."""
+        with self._lock:
+            calls, rows, seconds = self._calls, self._rows, self._seconds
+        return {
+            "load_seconds": self.load_seconds,
+            "calls": calls,
+            "rows": rows,
+            "predict_seconds": seconds,
+            "rows_per_s": rows / seconds if seconds else 0.0,
+            "us_per_row": 1e6 * seconds / rows if rows else 0.0,
+            "model_bytes": self.forest.nbytes if self.forest is not None else None,
+        }
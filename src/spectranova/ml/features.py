@@ -1,5 +1,200 @@
 """Spectral feature extraction."""
 
-def extract_features(signal, fs):
-    """Extract spectral features."""
-    pass
+import itertools
+
+import numpy as np
+
+from spectranova.core.cache import LRUCache, disk_cached
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.instrument import instrumented
+from spectranova.core.precision import resolve_precision
+from spectranova.core.utils import load_signal
+from spectranova.signal.fourier import compute_fft
+from spectranova.signal.window import get_window_info
+
+N_PEAKS = 3
+N_MFCC = 13
+N_MELS = 40
+ROLLOFF = 0.85
+
+FEATURE_NAMES = (
+    "spectral_centroid",
+    "spectral_bandwidth",
+    "spectral_rolloff",
+    "spectral_flatness",
+    "spectral_skewness",
+    "spectral_kurtosis",
+    "spectral_entropy",
+    "spectral_crest",
+    "spectral_slope",
+    "total_power",
+    *itertools.chain.from_iterable((f"peak_freq_{i}", f"peak_amp_{i}") for i in range(1, N_PEAKS + 1)),
+    *(f"mfcc_{i}" for i in range(1, N_MFCC + 1)),
+)
+
+_EPS = 1e-20
+_MEL_CACHE = LRUCache(maxsize=16)
+
+
+def _hz_to_mel(f):
+    return 2595.0 * np.log10(1.0 + f / 700.0)
+
+
+def _mel_to_hz(m):
+    return 700.0 * (10.0 ** (m / 2595.0) - 1.0)
+
+
+def _build_mfcc_basis(freqs, fs):
+    # Triangular mel filters (n_freqs, n_mels) and the orthonormal DCT-II (n_mels, n_mfcc).
+    edges = _mel_to_hz(np.linspace(0.0, _hz_to_mel(fs / 2.0), N_MELS + 2))
+    lower, centre, upper = edges[:-2, None], edges[1:-1, None], edges[2:, None]
+    rising = (freqs - lower) / (centre - lower)
+    falling = (upper - freqs) / (upper - centre)
+    mel = np.maximum(0.0, np.minimum(rising, falling)).T
+    k = np.arange(N_MELS)[:, None]
+    dct = np.cos(np.pi * (k + 0.5) * np.arange(N_MFCC) / N_MELS) * np.sqrt(2.0 / N_MELS)
+    dct[:, 0] /= np.sqrt(2.0)
+    return np.ascontiguousarray(mel), dct
+
+
+def _mfcc_basis(freqs, fs, dtype=np.float64):
+    dtype = np.dtype(dtype)
+    key = (freqs.size, float(freqs[-1]), float(fs), dtype.str)
+    return _MEL_CACHE.get_or_create(
+        key, lambda: tuple(b.astype(dtype, copy=False) for b in _build_mfcc_basis(freqs, fs)))
+
+
+def features_from_spectrum(freqs, amp, fs):
+    """Derive every feature from an ``(n_signals, n_freqs)`` amplitude spectrum.
+
+    ``amp`` is the single-sided amplitude on the bins ``freqs``, scaled as
+    in :func:`extract_features_batch`.  Returns an array with one column
+    per :data:`FEATURE_NAMES` entry, computed in float32 when ``amp`` is
+    float32 and in float64 otherwise.
+    """
+    dtype = np.dtype(np.float32) if amp.dtype == np.float32 else np.dtype(np.float64)
+    amp = np.asarray(amp, dtype=dtype)
+    freqs = np.asarray(freqs, dtype=float)
+    # Moments use frequencies scaled to [0, 1] and are rescaled at the end,
+    # which keeps fourth powers well inside float32 range.
+    f_max = float(freqs[-1]) if freqs[-1] > 0 else 1.0
+    u = (freqs / f_max).astype(dtype)
+
+    power = amp * amp
+    total = power.sum(axis=1)
+    p = power / (total[:, None] + _EPS)
+
+    centroid = p @ u
+    dev = u[None, :] - centroid[:, None]
+    var = np.einsum("ij,ij->i", p, dev * dev)
+    bandwidth = np.sqrt(var)
+    dev3 = dev * dev * dev
+    skewness = np.einsum("ij,ij->i", p, dev3) / (bandwidth ** 3 + _EPS)
+    kurtosis = np.einsum("ij,ij->i", p, dev3 * dev) / (var * var + _EPS)
+
+    cumulative = np.cumsum(p, axis=1)
+    rolloff = freqs[np.minimum((cumulative < ROLLOFF).sum(axis=1), freqs.size - 1)].astype(dtype)
+
+    log_power = np.log(power + _EPS)
+    mean_power = total / power.shape[1]
+    flatness = np.exp(log_power.mean(axis=1)) / (mean_power + _EPS)
+    entropy = -np.einsum("ij,ij->i", p, np.log(p + _EPS)) / float(np.log(power.shape[1]))
+    crest = power.max(axis=1) / (mean_power + _EPS)
+
+    u_dev = u - u.mean()
+    slope = (power @ u_dev) / (u_dev @ u_dev) / f_max
+
+    # Strongest local maxima, ordered by amplitude; missing peaks are zero.
+    inner = amp[:, 1:-1]
+    is_peak = (inner > amp[:, :-2]) & (inner >= amp[:, 2:])
+    ranked = np.where(is_peak, inner, -np.inf)
+    k = min(N_PEAKS, ranked.shape[1])
+    top = np.argpartition(-ranked, k - 1, axis=1)[:, :k] if k else np.empty((amp.shape[0], 0), int)
+    top_amp = np.take_along_axis(ranked, top, axis=1)
+    order = np.argsort(-top_amp, axis=1)
+    top, top_amp = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_amp, order, axis=1)
+    found = np.isfinite(top_amp)
+    peaks = np.zeros((amp.shape[0], 2 * N_PEAKS), dtype=dtype)
+    peaks[:, 0:2 * k:2] = np.where(found, freqs[1:-1][top], 0.0)
+    peaks[:, 1:2 * k:2] = np.where(found, top_amp, 0.0)
+
+    mel, dct = _mfcc_basis(freqs, fs, dtype)
+    mfcc = np.log(power @ mel + _EPS) @ dct
+
+    return np.column_stack((
+        f_max * centroid, f_max * bandwidth, rolloff, flatness, skewness, kurtosis,
+        entropy, crest, slope, total, peaks, mfcc,
+    ))
+
+
+def _batches(signals, batch_size):
+    if isinstance(signals, np.ndarray):
+        if signals.ndim == 1:
+            signals = signals[None, :]
+        for start in range(0, signals.shape[0], batch_size):
+            yield signals[start:start + batch_size]
+        return
+    iterator = iter(signals)
+    while True:
+        block = list(itertools.islice(iterator, batch_size))
+        if not block:
+            return
+        if all(np.ndim(b) == 2 for b in block):
+            yield from (np.asarray(b) for b in block)
+        else:
+            yield np.stack(block)
+
+
+@instrumented("features_batch")
+def extract_features_batch(signals, fs, window="hann", batch_size=1024, precision=None):
+    """Extract the :data:`FEATURE_NAMES` features for many signals at once.
+
+    ``signals`` is an ``(n_signals, n_samples)`` array, an iterable of
+    equal-length 1-D signals, or an iterable of 2-D batches.  Each signal
+    is windowed and transformed once; all features are vectorized
+    reductions over that shared spectrum, computed in ``precision``.
+
+    Returns ``(features, FEATURE_NAMES)`` where ``features`` is a
+    C-contiguous ``float32`` array of shape ``(n_signals, len(FEATURE_NAMES))``.
+    """
+    precision = resolve_precision(precision)
+    blocks = []
+    for batch in _batches(signals, batch_size):
+        batch = np.asarray(batch, dtype=precision.real)
+        if batch.ndim != 2 or batch.shape[1] < 2:
+            raise SpectralAnalysisError("each signal must have at least two samples")
+        info = get_window_info(window, batch.shape[1])
+        win = info.window.astype(precision.real, copy=False)
+        freqs, spectrum = compute_fft(batch * win, fs, precision=precision, cache=False)
+        # Single-sided amplitude: a sine of amplitude A peaks at ~A.
+        amp = np.abs(spectrum) * float(2.0 / info.sum)
+        blocks.append(features_from_spectrum(freqs, amp, fs).astype(np.float32))
+    if not blocks:
+        return np.empty((0, len(FEATURE_NAMES)), dtype=np.float32), FEATURE_NAMES
+    return np.ascontiguousarray(np.concatenate(blocks)), FEATURE_NAMES
+
+
+@instrumented("features")
+@disk_cached
+def extract_features(signal, fs, window="hann", precision=None):
+    """Extract spectral features.
+
+    Returns a ``{name: value}`` dict ordered as :data:`FEATURE_NAMES`,
+    computed in ``precision``.
+    """
+    x = np.asarray(signal)
+    if x.ndim != 1:
+        raise SpectralAnalysisError("signal must be 1-D; use extract_features_batch for batches")
+    features, names = extract_features_batch(x[None, :], fs, window, precision=precision)
+    return dict(zip(names, features[0].tolist()))
+
+
+def featurize_file(path, fs=1.0, window="hann", cache=False):
+    """Load one signal file and return its ``float32`` feature row.
+
+    ``fs`` applies to files that do not record a sample rate.  Used as the
+    per-file task of :class:`~spectranova.core.parallel.BatchRunner`.
+    """
+    signal, file_fs = load_signal(path)
+    features = extract_features(signal, file_fs or fs, window, cache=cache)
+    return np.fromiter(features.values(), dtype=np.float32, count=len(FEATURE_NAMES))
@@ -0,0 +1,108 @@
+"""On-disk registry of trained classifiers under ``data/models``."""
+
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from spectranova.core.cache import LRUCache
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.ml.classifier import FlatForest, SpectralClassifier
+
+DEFAULT_MODEL_DIR = os.path.join("data", "models")
+
+# Loaded models keyed by (path, meta.json mtime): each model is mapped once
+# per process and reloaded only when it is saved again.
+_MODEL_CACHE = LRUCache(maxsize=16)
+
+
+def save_model(classifier, name, root=DEFAULT_MODEL_DIR, compact=False, extra=None):
+    """Write ``classifier`` to ``root/name`` and return that path.
+
+    Flattened forests are stored as one ``.npy`` file per node array
+    (``float32`` with ``compact=True``) and other estimators with joblib.
+    ``extra`` is merged into ``meta.json`` (e.g. a training report).  The
+    directory is published with a rename, so readers never see a partial
+    model.
+    """
+    if classifier.classes_ is None:
+        raise SpectralAnalysisError("cannot save an unfitted classifier")
+    if compact:
+        classifier.compact()
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, name)
+    meta = {
+        "model": classifier.model,
+        "params": classifier.params,
+        "classes": classifier.classes_.tolist(),
+        "n_features": classifier.n_features,
+        "saved": time.time(),
+        **(extra or {}),
+    }
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=root)
+    try:
+        forest = classifier.forest
+        if forest is not None:
+            meta.update(format="forest", depth=forest.depth, dtype=forest.threshold.dtype.name)
+            forest.save(tmp)
+        else:
+            import joblib
+
+            meta["format"] = "joblib"
+            joblib.dump(classifier.estimator, os.path.join(tmp, "model.joblib"))
+        with open(os.path.join(tmp, "meta.json"), "w") as fh:
+            json.dump(meta, fh, indent=2, default=str)
+        if os.path.isdir(path):
+            old = tempfile.mkdtemp(prefix=".old-", dir=root)
+            os.rename(path, os.path.join(old, name))
+            os.rename(tmp, path)
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            os.rename(tmp, path)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return path
+
+
+def _load(path):
+    start = time.perf_counter()
+    with open(os.path.join(path, "meta.json")) as fh:
+        meta = json.load(fh)
+    clf = SpectralClassifier(meta["model"], **meta["params"])
+    if meta["format"] == "forest":
+        clf.forest = FlatForest.load(path, meta["depth"])
+    else:
+        import joblib
+
+        clf.estimator = joblib.load(os.path.join(path, "model.joblib"), mmap_mode="r")
+    clf.classes_ = np.asarray(meta["classes"])
+    clf.n_features = meta["n_features"]
+    clf.meta = meta
+    clf.load_seconds = time.perf_counter() - start
+    return clf
+
+
+def load_model(name, root=DEFAULT_MODEL_DIR):
+    """Return the classifier saved as ``root/name``, mapped once per process."""
+    path = os.path.realpath(os.path.join(root, name))
+    try:
+        stamp = os.stat(os.path.join(path, "meta.json")).st_mtime_ns
+    except OSError:
+        raise SpectralAnalysisError(f"no model named {name!r} in {root}") from None
+    return _MODEL_CACHE.get_or_create((path, stamp), lambda: _load(path))
+
+
+def list_models(root=DEFAULT_MODEL_DIR):
+    """Return the names of the models saved under ``root``."""
+    if not os.path.isdir(root):
+        return []
+    return sorted(entry.name for entry in os.scandir(root)
+                  if entry.is_dir() and os.path.exists(os.path.join(entry.path, "meta.json")))
+
+
+def clear_model_cache():
+    """Forget every loaded model."""
+    _MODEL_CACHE.clear()
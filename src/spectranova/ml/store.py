@@ -0,0 +1,309 @@
+"""Append-friendly columnar store for extracted feature rows."""
+
+import csv
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+
+# Identifies a store's schema.json; bumped on incompatible layout changes.
+_FORMAT = "spectranova-features"
+_VERSION = 1
+
+# Rows per chunk when iterating or exporting a store.
+_CHUNK_ROWS = 65536
+
+
+def is_feature_store(path):
+    """Return whether ``path`` is a directory holding a :class:`FeatureStore`."""
+    return os.path.isfile(os.path.join(path, "schema.json"))
+
+
+class FeatureStore:
+    """Feature rows kept as one little-endian ``float32`` file per column.
+
+    A store is a directory holding ``schema.json`` (column names, the
+    committed row count and free-form ``metadata``), ``col-NNNN.f32`` per
+    column and, optionally, a row key per row (the source file path) in
+    ``keys.txt`` with its end offsets in ``keys.off``.  :meth:`append`
+    adds rows to the end of every file and then swaps in the schema with
+    the new row count, so readers only ever see whole appends and a
+    writer interrupted mid-append loses nothing committed.  Columns are
+    memory-mapped on first use: :meth:`column` is a zero-copy view, and
+    :meth:`read` assembles a projection of a row range.  One writer at a
+    time is supported.
+
+    >>> store = FeatureStore.create("features.store", FEATURE_NAMES)
+    >>> store.append(rows, keys=paths)
+    >>> x = FeatureStore("features.store").read(["spectral_centroid", "total_power"], 0, 1000)
+    """
+
+    def __init__(self, root):
+        self.root = os.fspath(root)
+        if not is_feature_store(self.root):
+            raise SpectralAnalysisError(f"no feature store at {self.root}")
+        self._files = None
+        self.refresh()
+
+    @classmethod
+    def create(cls, root, columns, metadata=None, keys=True, overwrite=False):
+        """Create an empty store with ``columns``; returns it opened.
+
+        With ``keys`` every appended row must carry a string key.  An
+        existing store at ``root`` is replaced only with ``overwrite``.
+        """
+        root = os.fspath(root)
+        columns = [str(c) for c in columns]
+        if len(set(columns)) != len(columns) or not columns:
+            raise SpectralAnalysisError("feature store columns must be unique and non-empty")
+        if is_feature_store(root):
+            if not overwrite:
+                raise SpectralAnalysisError(f"{root} already holds a feature store")
+            shutil.rmtree(root)
+        os.makedirs(root, exist_ok=True)
+        schema = {"format": _FORMAT, "version": _VERSION, "columns": columns, "dtype": "<f4",
+                  "keys": bool(keys), "n_rows": 0, "metadata": metadata or {}}
+        for j in range(len(columns)):
+            open(os.path.join(root, cls._column_file(j)), "wb").close()
+        if keys:
+            open(os.path.join(root, "keys.txt"), "wb").close()
+            open(os.path.join(root, "keys.off"), "wb").close()
+        cls._write_schema(root, schema)
+        return cls(root)
+
+    @staticmethod
+    def _column_file(j):
+        return f"col-{j:04d}.f32"
+
+    @staticmethod
+    def _write_schema(root, schema):
+        fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".json", dir=root)
+        with os.fdopen(fd, "w") as fh:
+            json.dump(schema, fh, indent=2)
+        os.replace(tmp, os.path.join(root, "schema.json"))
+
+    def refresh(self):
+        """Re-read the schema to pick up rows appended by another process."""
+        with open(os.path.join(self.root, "schema.json")) as fh:
+            schema = json.load(fh)
+        if schema.get("format") != _FORMAT or schema.get("version") != _VERSION:
+            raise SpectralAnalysisError(f"unsupported feature store format in {self.root}")
+        self.schema = schema
+        self._maps = {}
+        return self
+
+    @property
+    def columns(self):
+        return list(self.schema["columns"])
+
+    @property
+    def metadata(self):
+        return self.schema["metadata"]
+
+    @property
+    def has_keys(self):
+        return self.schema["keys"]
+
+    def __len__(self):
+        return self.schema["n_rows"]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _index(self, column):
+        if isinstance(column, str):
+            try:
+                return self.schema["columns"].index(column)
+            except ValueError:
+                raise SpectralAnalysisError(f"no column {column!r} in {self.root}") from None
+        if not -len(self.schema["columns"]) <= column < len(self.schema["columns"]):
+            raise SpectralAnalysisError(f"column index {column} out of range")
+        return column % len(self.schema["columns"])
+
+    def _map(self, name, dtype):
+        if name not in self._maps:
+            n = len(self)
+            path = os.path.join(self.root, name)
+            self._maps[name] = (np.memmap(path, dtype=dtype, mode="r", shape=(n,)) if n
+                                else np.empty(0, dtype=dtype))
+        return self._maps[name]
+
+    def _range(self, start, stop):
+        start, stop, _ = slice(start, stop).indices(len(self))
+        return start, max(start, stop)
+
+    def column(self, column):
+        """Return one column (by name or index) as a read-only memory map."""
+        return self._map(self._column_file(self._index(column)), "<f4")
+
+    def read(self, columns=None, start=0, stop=None):
+        """Return rows ``start:stop`` of ``columns`` (default all) as a ``(rows, k)`` ``float32`` array."""
+        start, stop = self._range(start, stop)
+        indices = range(len(self.schema["columns"])) if columns is None else [self._index(c) for c in columns]
+        out = np.empty((stop - start, len(indices)), dtype=np.float32)
+        for k, j in enumerate(indices):
+            out[:, k] = self._map(self._column_file(j), "<f4")[start:stop]
+        return out
+
+    def keys(self, start=0, stop=None):
+        """Return the row keys of rows ``start:stop``."""
+        if not self.has_keys:
+            raise SpectralAnalysisError(f"feature store {self.root} has no row keys")
+        start, stop = self._range(start, stop)
+        if start == stop:
+            return []
+        ends = self._map("keys.off", "<u8")
+        lo = int(ends[start - 1]) if start else 0
+        with open(os.path.join(self.root, "keys.txt"), "rb") as fh:
+            fh.seek(lo)
+            data = fh.read(int(ends[stop - 1]) - lo)
+        return data.decode("utf-8").split("\n")[:-1]
+
+    def iter_chunks(self, columns=None, chunk_rows=_CHUNK_ROWS, start=0, stop=None):
+        """Yield ``(keys, rows)`` for consecutive row ranges of at most ``chunk_rows`` rows.
+
+        ``keys`` is ``None`` for stores without row keys.
+        """
+        start, stop = self._range(start, stop)
+        for lo in range(start, stop, chunk_rows):
+            hi = min(lo + chunk_rows, stop)
+            yield (self.keys(lo, hi) if self.has_keys else None), self.read(columns, lo, hi)
+
+    def _open_files(self):
+        # Cut anything past the committed rows, left by an interrupted append.
+        if self._files is None:
+            n = len(self)
+            names = [self._column_file(j) for j in range(len(self.schema["columns"]))]
+            sizes = [4 * n] * len(names)
+            if self.has_keys:
+                ends = self._map("keys.off", "<u8")
+                names += ["keys.txt", "keys.off"]
+                sizes += [int(ends[-1]) if n else 0, 8 * n]
+            self._files = []
+            for name, size in zip(names, sizes):
+                fh = open(os.path.join(self.root, name), "r+b")
+                fh.truncate(size)
+                fh.seek(size)
+                self._files.append(fh)
+        return self._files
+
+    def append(self, rows, keys=None):
+        """Append a ``(rows, columns)`` block and commit it; returns the new row count."""
+        rows = np.asarray(rows, dtype="<f4")
+        if rows.ndim != 2 or rows.shape[1] != len(self.schema["columns"]):
+            raise SpectralAnalysisError(f"expected rows of {len(self.schema['columns'])} columns, "
+                                        f"got shape {rows.shape}")
+        if self.has_keys:
+            if keys is None or len(keys) != rows.shape[0]:
+                raise SpectralAnalysisError("every appended row needs a key")
+            encoded = [(str(k) + "\n").encode("utf-8") for k in keys]
+            if any(e.count(b"\n") != 1 for e in encoded):
+                raise SpectralAnalysisError("row keys must not contain newlines")
+        files = self._open_files()
+        n_cols = len(self.schema["columns"])
+        for j in range(n_cols):
+            np.ascontiguousarray(rows[:, j]).tofile(files[j])
+        if self.has_keys:
+            ends = files[n_cols].tell() + np.cumsum([len(e) for e in encoded], dtype=np.uint64)
+            files[n_cols].write(b"".join(encoded))
+            ends.astype("<u8").tofile(files[n_cols + 1])
+        for fh in files:
+            fh.flush()
+        self._commit(len(self) + rows.shape[0])
+        return len(self)
+
+    def truncate(self, n_rows):
+        """Drop every row from ``n_rows`` on."""
+        if not 0 <= n_rows <= len(self):
+            raise SpectralAnalysisError(f"cannot truncate {len(self)} rows to {n_rows}")
+        if n_rows != len(self):
+            self.close()
+            self._commit(n_rows)
+
+    def update_metadata(self, **metadata):
+        """Merge ``metadata`` into the schema's free-form metadata."""
+        self.schema["metadata"].update(metadata)
+        self._write_schema(self.root, self.schema)
+
+    def _commit(self, n_rows):
+        self.schema["n_rows"] = int(n_rows)
+        self._write_schema(self.root, self.schema)
+        self._maps = {}
+
+    def close(self):
+        """Close the files held open for appending."""
+        for fh in self._files or ():
+            fh.close()
+        self._files = None
+
+    def export(self, path, columns=None, chunk_rows=_CHUNK_ROWS):
+        """Write the store to a ``.csv`` or ``.parquet`` file, chunk by chunk.
+
+        CSV files get the ``path,<columns>`` layout of
+        :class:`~spectranova.core.parallel.CSVFeatureWriter` (a leading
+        ``path`` column only when the store has keys).  Parquet needs
+        ``pyarrow`` (optional) and keeps ``float32`` columns, one row group
+        per chunk.  Returns ``path``.
+        """
+        names = self.columns if columns is None else [self.columns[self._index(c)] for c in columns]
+        ext = os.path.splitext(os.fspath(path))[1].lower()
+        if ext == ".csv":
+            with open(path, "w", newline="") as fh:
+                writer = csv.writer(fh)
+                writer.writerow((["path"] if self.has_keys else []) + names)
+                for keys, rows in self.iter_chunks(names, chunk_rows):
+                    # Nine significant digits round-trip float32 exactly.
+                    values = [[f"{v:.9g}" for v in row] for row in rows.tolist()]
+                    writer.writerows([[k] + v for k, v in zip(keys, values)] if self.has_keys else values)
+        elif ext == ".parquet":
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise SpectralAnalysisError("Parquet export requires pyarrow") from None
+            fields = ([pa.field("path", pa.string())] if self.has_keys else []) + [
+                pa.field(name, pa.float32()) for name in names]
+            schema = pa.schema(fields, metadata={"spectranova": json.dumps(self.metadata)})
+            with pq.ParquetWriter(path, schema) as writer:
+                for keys, rows in self.iter_chunks(names, chunk_rows):
+                    arrays = ([pa.array(keys, pa.string())] if self.has_keys else []) + [
+                        pa.array(rows[:, k]) for k in range(rows.shape[1])]
+                    writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        else:
+            raise SpectralAnalysisError(f"cannot export to {path}; use a .csv or .parquet file")
+        return path
+
+
+class FeatureStoreWriter:
+    """:class:`~spectranova.core.parallel.BatchRunner` writer that appends to a :class:`FeatureStore`.
+
+    Its offsets are row counts, so a resumed run truncates the store to
+    the rows recorded in the checkpoint before appending.
+    """
+
+    def __init__(self, path, columns, resume_offset=None):
+        if resume_offset is not None and is_feature_store(path):
+            self.store = FeatureStore(path)
+            if self.store.columns != list(columns):
+                raise SpectralAnalysisError(f"feature store {path} has different columns")
+            self.store.truncate(resume_offset)
+        else:
+            self.store = FeatureStore.create(path, columns, overwrite=True)
+        self.path = path
+
+    def write(self, paths, rows):
+        if len(paths):
+            self.store.append(rows, keys=paths)
+
+    def tell(self):
+        return len(self.store)
+
+    def close(self):
+        self.store.close()
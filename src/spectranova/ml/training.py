@@ -0,0 +1,362 @@
+"""Out-of-core training set construction and parallel hyperparameter search."""
+
+import csv
+import hashlib
+import itertools
+import json
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from spectranova.core.cache import LRUCache
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.ml.classifier import MODELS, SpectralClassifier
+from spectranova.ml.registry import DEFAULT_MODEL_DIR, save_model
+from spectranova.ml.store import FeatureStore, is_feature_store
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRAINING_DIR = os.path.join("data", "processed", "training")
+
+# Searched when no grid is given; forests train single-threaded because the
+# search already runs one trial per worker process.
+DEFAULT_GRIDS = {
+    "rf": {"n_estimators": [100, 300], "max_depth": [None, 16], "min_samples_leaf": [1, 4]},
+    "svm": {"C": [0.1, 1.0, 10.0], "gamma": ["scale", 0.01]},
+}
+_FIXED_PARAMS = {"rf": {"n_jobs": 1}, "svm": {}}
+
+# Training sets memory-mapped by each search worker, keyed by directory.
+_DATASETS = LRUCache(maxsize=4)
+
+
+def iter_feature_csv(path, chunk_rows=65536):
+    """Yield ``(paths, features)`` chunks of a ``path,<columns>`` feature CSV.
+
+    ``features`` is a ``(rows, n_columns)`` ``float32`` array of at most
+    ``chunk_rows`` rows, so files far larger than memory can be streamed.
+    """
+    with open(path, newline="") as fh:
+        reader = csv.reader(fh)
+        header = next(reader, None)
+        if not header or header[0] != "path":
+            raise SpectralAnalysisError(f"{path} is not a feature CSV")
+        while True:
+            rows = list(itertools.islice(reader, chunk_rows))
+            if not rows:
+                return
+            yield [row[0] for row in rows], np.array([row[1:] for row in rows], dtype=np.float32)
+
+
+def label_from_path(path, root=None):
+    """Class label of a signal file: its top-level directory below ``root``.
+
+    Without ``root`` the name of the file's own directory is used.
+    """
+    if root is None:
+        return os.path.basename(os.path.dirname(path))
+    parts = os.path.relpath(path, root).split(os.sep)
+    if len(parts) < 2 or parts[0] == os.pardir:
+        raise SpectralAnalysisError(f"{path} is not inside a class directory of {root}")
+    return parts[0]
+
+
+def iter_feature_rows(path, chunk_rows=65536):
+    """Yield ``(paths, features)`` chunks of a feature store or feature CSV.
+
+    Stores (see :class:`~spectranova.ml.store.FeatureStore`) are read by
+    row range straight from their column maps; CSVs go through
+    :func:`iter_feature_csv`.
+    """
+    if not is_feature_store(path):
+        yield from iter_feature_csv(path, chunk_rows)
+        return
+    store = FeatureStore(path)
+    if not store.has_keys:
+        raise SpectralAnalysisError(f"feature store {path} has no row keys to label rows with")
+    yield from store.iter_chunks(chunk_rows=chunk_rows)
+
+
+def _feature_columns(path):
+    if is_feature_store(path):
+        return FeatureStore(path).columns
+    with open(path, newline="") as fh:
+        return next(csv.reader(fh))[1:]
+
+
+def _source_stamp(path):
+    # A store changes by committing a new schema; a CSV by being rewritten.
+    stat = os.stat(os.path.join(path, "schema.json") if is_feature_store(path) else path)
+    return [os.path.abspath(path), stat.st_size, stat.st_mtime_ns]
+
+
+def build_training_set(source, cache_dir=DEFAULT_TRAINING_DIR, root=None, chunk_rows=65536):
+    """Convert feature rows into a memory-mappable training set; return its directory.
+
+    ``source`` is a feature store or a feature CSV, streamed in chunks of
+    ``chunk_rows`` into a raw ``float32`` matrix (``features.f32``) plus
+    ``int32`` class codes (``labels.npy``), both written chunk by chunk,
+    with shape, columns and class names in ``meta.json``.  Rows with non-finite features are dropped.
+    The set is cached under ``cache_dir`` by the source's path, size and
+    mtime, so later runs and every search worker reuse it without
+    reading the source again.
+    """
+    source = os.fspath(source)
+    key = hashlib.sha256(json.dumps(_source_stamp(source) + [root and os.path.abspath(root)]).encode()).hexdigest()[:16]
+    path = os.path.join(cache_dir, key)
+    if os.path.exists(os.path.join(path, "meta.json")):
+        return path
+    os.makedirs(cache_dir, exist_ok=True)
+    columns = _feature_columns(source)
+    tmp = tempfile.mkdtemp(prefix=".tmp-", dir=cache_dir)
+    try:
+        start = time.perf_counter()
+        names, n_rows, dropped = {}, 0, 0
+        codes_path = os.path.join(tmp, "labels.i32")
+        with open(os.path.join(tmp, "features.f32"), "wb") as out, open(codes_path, "wb") as codes_out:
+            for paths, features in iter_feature_rows(source, chunk_rows):
+                ok = np.isfinite(features).all(axis=1)
+                kept = int(ok.sum())
+                dropped += ok.size - kept
+                features.astype("<f4", copy=False)[ok].tofile(out)
+                np.fromiter((names.setdefault(label_from_path(p, root), len(names))
+                             for p, keep in zip(paths, ok) if keep), dtype="<i4", count=kept).tofile(codes_out)
+                n_rows += kept
+        if not n_rows:
+            raise SpectralAnalysisError(f"{source} has no usable rows")
+        classes = sorted(names, key=names.get)
+        # Copy the raw codes behind an .npy header, a chunk at a time.
+        codes = np.memmap(codes_path, dtype="<i4", mode="r", shape=(n_rows,))
+        labels = np.lib.format.open_memmap(os.path.join(tmp, "labels.npy"), mode="w+", dtype="<i4",
+                                           shape=(n_rows,))
+        for start in range(0, n_rows, chunk_rows):
+            labels[start:start + chunk_rows] = codes[start:start + chunk_rows]
+        labels.flush()
+        del codes, labels
+        os.remove(codes_path)
+        meta = {
+            "source": os.path.abspath(source),
+            "n_rows": n_rows,
+            "columns": columns,
+            "classes": classes,
+            "dropped": dropped,
+            "build_seconds": time.perf_counter() - start,
+        }
+        with open(os.path.join(tmp, "meta.json"), "w") as fh:
+            json.dump(meta, fh, indent=2)
+        try:
+            os.rename(tmp, path)
+        except OSError:
+            if not os.path.exists(os.path.join(path, "meta.json")):
+                raise
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return path
+
+
+def open_training_set(path):
+    """Return ``(features, labels, meta)`` of a set built by :func:`build_training_set`.
+
+    ``features`` and ``labels`` are read-only memory maps; sets are mapped
+    once per process.
+    """
+    def load():
+        with open(os.path.join(path, "meta.json")) as fh:
+            meta = json.load(fh)
+        features = np.memmap(os.path.join(path, "features.f32"), dtype="<f4", mode="r",
+                             shape=(meta["n_rows"], len(meta["columns"])))
+        return features, np.load(os.path.join(path, "labels.npy"), mmap_mode="r"), meta
+
+    return _DATASETS.get_or_create(os.path.realpath(path), load)
+
+
+def make_folds(labels, n_splits=5, seed=0):
+    """Assign every row to one of ``n_splits`` stratified folds.
+
+    Rows of each class are shuffled and dealt round-robin, so every fold
+    holds about the same share of each class.  Fold ids are ``int16``.
+    """
+    if not 2 <= n_splits <= np.iinfo(np.int16).max:
+        raise SpectralAnalysisError(f"n_splits must be between 2 and {np.iinfo(np.int16).max}")
+    labels = np.asarray(labels)
+    rng = np.random.default_rng(seed)
+    folds = np.empty(labels.size, dtype=np.int16)
+    for code in np.unique(labels):
+        rows = np.flatnonzero(labels == code)
+        folds[rng.permutation(rows)] = (np.arange(rows.size) + rng.integers(n_splits)) % n_splits
+    return folds
+
+
+def load_folds(path, n_splits=5, seed=0):
+    """Return the fold of every row of the set at ``path``, cached beside it."""
+    fold_path = os.path.join(path, f"folds-{n_splits}-{seed}.npy")
+    try:
+        return np.load(fold_path)
+    except OSError:
+        pass
+    folds = make_folds(open_training_set(path)[1], n_splits, seed)
+    fd, tmp = tempfile.mkstemp(prefix=".tmp-", suffix=".npy", dir=path)
+    with os.fdopen(fd, "wb") as fh:
+        np.save(fh, folds)
+    os.replace(tmp, fold_path)
+    return folds
+
+
+def stratified_subsample(labels, max_rows, seed=0):
+    """Return the sorted indices of at most ``max_rows`` rows, keeping each class's share.
+
+    Every class contributes ``max_rows`` times its share of the rows,
+    rounded so the quotas sum to ``max_rows``, drawn at random.  All rows
+    are returned when there are no more than ``max_rows``.
+    """
+    labels = np.asarray(labels)
+    if not max_rows or labels.size <= max_rows:
+        return np.arange(labels.size)
+    codes, counts = np.unique(labels, return_counts=True)
+    share = counts * (max_rows / labels.size)
+    quota = np.floor(share).astype(np.intp)
+    quota[np.argsort(quota - share)[:max_rows - quota.sum()]] += 1
+    rng = np.random.default_rng(seed)
+    picked = [rng.choice(np.flatnonzero(labels == code), k, replace=False) for code, k in zip(codes, quota)]
+    return np.sort(np.concatenate(picked))
+
+
+def expand_grid(grid):
+    """Return every combination of a ``{param: [values]}`` grid as a list of dicts."""
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[n] for n in names))]
+
+
+def _evaluate(path, model, params, fold, n_splits, seed, max_rows):
+    """Search worker: fit on all folds but ``fold`` and score on ``fold``.
+
+    Module-level so that process pools can pickle it.
+    """
+    features, labels, meta = open_training_set(path)
+    folds = load_folds(path, n_splits, seed)
+    train, test = np.flatnonzero(folds != fold), np.flatnonzero(folds == fold)
+    train = train[stratified_subsample(labels[train], max_rows, [seed, fold])]
+    classes = np.asarray(meta["classes"])
+    start = time.perf_counter()
+    clf = SpectralClassifier(model, **params).fit(features[train], classes[labels[train]])
+    fit_seconds = time.perf_counter() - start
+    accuracy = float(np.mean(clf.predict(features[test]) == classes[labels[test]]))
+    return {"accuracy": accuracy, "fit_seconds": fit_seconds, "n_train": int(train.size),
+            "score_seconds": time.perf_counter() - start - fit_seconds}
+
+
+def search(path, model="rf", grid=None, n_splits=5, seed=0, workers=None, max_rows=None):
+    """Cross-validate every combination of ``grid`` on the training set at ``path``.
+
+    Each (parameters, fold) trial runs as one task on a process pool of
+    ``workers`` processes; workers memory-map the training set and the
+    cached fold assignment once and reuse them across trials.  With
+    ``max_rows`` each trial trains on a stratified random subset of that
+    many rows (see :func:`stratified_subsample`).
+    Returns one dict per parameter set (mean and standard deviation of the
+    fold accuracies, summed fit time), best first.
+    """
+    if model not in MODELS:
+        raise SpectralAnalysisError(f"unknown model: {model!r}")
+    candidates = expand_grid(DEFAULT_GRIDS[model] if grid is None else grid)
+    fixed = _FIXED_PARAMS[model]
+    load_folds(path, n_splits, seed)  # built once here rather than racing in every worker
+    scores = [[None] * n_splits for _ in candidates]
+    with ProcessPoolExecutor(workers or os.cpu_count() or 1) as pool:
+        futures = {pool.submit(_evaluate, path, model, {**fixed, **params}, fold, n_splits, seed, max_rows):
+                   (i, fold) for i, params in enumerate(candidates) for fold in range(n_splits)}
+        for done, future in enumerate(as_completed(futures), 1):
+            i, fold = futures[future]
+            scores[i][fold] = future.result()
+            logger.debug("trial %d/%d: %s fold %d accuracy %.4f", done, len(futures),
+                         candidates[i], fold, scores[i][fold]["accuracy"])
+    results = []
+    for params, trials in zip(candidates, scores):
+        accuracy = np.array([t["accuracy"] for t in trials])
+        results.append({
+            "params": params,
+            "mean_accuracy": float(accuracy.mean()),
+            "std_accuracy": float(accuracy.std()),
+            "fold_accuracy": accuracy.tolist(),
+            "fit_seconds": float(sum(t["fit_seconds"] for t in trials)),
+        })
+    results.sort(key=lambda r: -r["mean_accuracy"])
+    return results
+
+
+def train(source, name, model="rf", grid=None, n_splits=5, seed=0, workers=None,
+          root=None, cache_dir=DEFAULT_TRAINING_DIR, models_dir=DEFAULT_MODEL_DIR,
+          chunk_rows=65536, max_rows=None, compact=False, extra=None):
+    """Build the training set from ``source``, search ``grid``, refit the best model and save it.
+
+    ``source`` is a feature store or feature CSV (see :func:`build_training_set`).
+    The model is saved as ``models_dir/name`` (see
+    :func:`~spectranova.ml.registry.save_model`) with a ``training``
+    report in its ``meta.json``: the search table, the chosen parameters,
+    and the time and rows-per-second throughput of every phase, updated
+    with ``extra`` (e.g. featurization statistics).  ``max_rows`` bounds
+    the rows of every search trial and of the final refit alike, so a set
+    larger than memory is only ever read a bounded subsample at a time.
+    Returns ``(model_path, report)``.
+    """
+    started = time.perf_counter()
+    path = build_training_set(source, cache_dir, root, chunk_rows)
+    features, labels, meta = open_training_set(path)
+    build_seconds = time.perf_counter() - started
+    n_rows = meta["n_rows"]
+    logger.info("training set: %d rows, %d features, %d classes (%.1fs)",
+                n_rows, features.shape[1], len(meta["classes"]), build_seconds)
+
+    start = time.perf_counter()
+    results = search(path, model, grid, n_splits, seed, workers, max_rows)
+    search_seconds = time.perf_counter() - start
+    best = results[0]
+    logger.info("best %s: %s (accuracy %.4f +/- %.4f, %.1fs search)", model, best["params"],
+                best["mean_accuracy"], best["std_accuracy"], search_seconds)
+
+    start = time.perf_counter()
+    params = {**_FIXED_PARAMS[model], **best["params"]}
+    if model == "rf":
+        params["n_jobs"] = workers or -1
+    rows = stratified_subsample(labels, max_rows, seed)
+    if rows.size == n_rows:
+        x, y = features, labels
+    else:
+        x, y = features[rows], labels[rows]
+    clf = SpectralClassifier(model, **params).fit(x, np.asarray(meta["classes"])[y])
+    refit_seconds = time.perf_counter() - start
+
+    n_trials = len(results) * n_splits
+    report = {
+        "source": meta["source"],
+        "n_rows": n_rows,
+        "columns": meta["columns"],
+        "dropped_rows": meta["dropped"],
+        "n_splits": n_splits,
+        "seed": seed,
+        "best_params": best["params"],
+        "cv_accuracy": best["mean_accuracy"],
+        "cv_std": best["std_accuracy"],
+        "search": results,
+        "timings": {
+            "build_seconds": build_seconds,
+            "build_rows_per_s": n_rows / build_seconds if build_seconds else 0.0,
+            "search_seconds": search_seconds,
+            "trials": n_trials,
+            "trials_per_s": n_trials / search_seconds if search_seconds else 0.0,
+            "refit_rows": int(rows.size),
+            "refit_seconds": refit_seconds,
+            "refit_rows_per_s": rows.size / refit_seconds if refit_seconds else 0.0,
+            "total_seconds": time.perf_counter() - started,
+        },
+        **(extra or {}),
+    }
+    # The refit's parallelism is not part of the model.
+    clf.params = {**_FIXED_PARAMS[model], **best["params"]}
+    model_path = save_model(clf, name, models_dir, compact=compact, extra={"training": report})
+    return model_path, report
@@ -0,0 +1,14 @@
+"""Network ingestion service for multi-sensor monitoring."""
+
+from spectranova._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "IngestServer": "server",
+    "IngestClient": "client",
+    "analyse_batch": "server",
+    "encode_request": "protocol",
+    "decode_request": "protocol",
+    "request_header": "protocol",
+    "encode_response": "protocol",
+    "decode_response": "protocol",
+})
@@ -0,0 +1,79 @@
+"""Asyncio client for the ingestion server."""
+
+import asyncio
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.service.protocol import decode_response, encode_request, read_message
+
+
+class IngestClient:
+    """One connection to an :class:`~spectranova.service.server.IngestServer`.
+
+    Many :meth:`request` calls may be outstanding at once; a reader task
+    matches responses to them by ``(sensor, seq)``.
+
+    >>> client = await IngestClient.connect(port=9000)
+    >>> psd = await client.request(sensor=3, samples=frame, fs=20000.0)
+    """
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._pending = {}
+        self._seq = 0
+        self._reader_task = asyncio.ensure_future(self._read_loop())
+
+    @classmethod
+    async def connect(cls, host="127.0.0.1", port=None, path=None):
+        """Open a TCP connection, or a Unix socket one when ``path`` is given."""
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, sensor, samples, fs, op="welch"):
+        """Send one frame and return its ``float32`` result row.
+
+        Raises :class:`SpectralAnalysisError` if the server reports an error.
+        """
+        seq = self._seq
+        self._seq = (seq + 1) % 2**32
+        future = asyncio.get_running_loop().create_future()
+        self._pending[sensor, seq] = future
+        self._writer.write(encode_request(sensor, seq, fs, samples, op))
+        await self._writer.drain()
+        return await future
+
+    async def _read_loop(self):
+        error = SpectralAnalysisError("connection closed")
+        try:
+            while True:
+                body = await read_message(self._reader)
+                if body is None:
+                    break
+                response = decode_response(body)
+                future = self._pending.pop((response.sensor, response.seq), None)
+                if future is None or future.done():
+                    continue
+                if response.error is None:
+                    future.set_result(response.values)
+                else:
+                    future.set_exception(SpectralAnalysisError(response.error))
+        except (SpectralAnalysisError, ConnectionError) as exc:
+            error = exc
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def close(self):
+        """Close the connection; requests still outstanding fail."""
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        self._reader_task.cancel()
+        await asyncio.gather(self._reader_task, return_exceptions=True)
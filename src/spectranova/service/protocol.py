@@ -0,0 +1,115 @@
+"""Length-prefixed binary wire format of the ingestion service.
+
+Every message is a little-endian ``uint32`` byte count followed by that
+many bytes of body.  A request body is::
+
+    uint16 sensor   uint8 op   uint8 dtype   uint32 seq   float64 fs
+    samples (dtype, native count = remaining bytes / itemsize)
+
+and a response body is::
+
+    uint16 sensor   uint8 op   uint8 status  uint32 seq
+    float32 values (status OK) or UTF-8 error text (status ERROR)
+
+``op`` selects the analysis (see :data:`OPS`) and ``seq`` is echoed back
+so clients can match responses, which are not guaranteed to arrive in
+request order.
+"""
+
+import asyncio
+import collections
+import struct
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+
+OPS = ("welch", "features")
+DTYPES = (np.dtype("<f4"), np.dtype("<f8"), np.dtype("<i2"))
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+MAX_MESSAGE = 64 * 2**20
+
+_LENGTH = struct.Struct("<I")
+_REQUEST = struct.Struct("<HBBId")
+_RESPONSE = struct.Struct("<HBBI")
+
+Request = collections.namedtuple("Request", "sensor op seq fs samples")
+Response = collections.namedtuple("Response", "sensor op seq status values error")
+
+
+def encode_request(sensor, seq, fs, samples, op="welch"):
+    """Return the framed bytes of one request."""
+    samples = np.asarray(samples)
+    if samples.dtype not in DTYPES:
+        samples = samples.astype("<f4")
+    header = _REQUEST.pack(sensor, OPS.index(op), DTYPES.index(samples.dtype), seq, fs)
+    payload = np.ascontiguousarray(samples).tobytes()
+    return _LENGTH.pack(len(header) + len(payload)) + header + payload
+
+
+def request_header(body):
+    """Return the ``(sensor, op, seq)`` of a request body, or ``None`` if it is too short.
+
+    Used to address an error response to a request that fails
+    :func:`decode_request`; an unknown ``op`` is reported as ``"welch"``.
+    """
+    if len(body) < _REQUEST.size:
+        return None
+    sensor, op, _, seq, _ = _REQUEST.unpack_from(body)
+    return sensor, OPS[op] if op < len(OPS) else OPS[0], seq
+
+
+def decode_request(body):
+    """Parse a request body; ``samples`` is a zero-copy view of ``body``."""
+    if len(body) < _REQUEST.size:
+        raise SpectralAnalysisError("request shorter than its header")
+    sensor, op, dtype, seq, fs = _REQUEST.unpack_from(body)
+    if op >= len(OPS) or dtype >= len(DTYPES):
+        raise SpectralAnalysisError(f"unknown op {op} or dtype {dtype}")
+    dtype = DTYPES[dtype]
+    n_bytes = len(body) - _REQUEST.size
+    if n_bytes % dtype.itemsize or not fs > 0:
+        raise SpectralAnalysisError("malformed request payload")
+    samples = np.frombuffer(body, dtype=dtype, offset=_REQUEST.size)
+    return Request(sensor, OPS[op], seq, fs, samples)
+
+
+def encode_response(sensor, op, seq, values=None, error=None):
+    """Return the framed bytes of a result (``values``) or an ``error`` message."""
+    if error is None:
+        status, payload = STATUS_OK, np.ascontiguousarray(values, dtype="<f4").tobytes()
+    else:
+        status, payload = STATUS_ERROR, str(error).encode("utf-8")
+    header = _RESPONSE.pack(sensor, OPS.index(op), status, seq)
+    return _LENGTH.pack(len(header) + len(payload)) + header + payload
+
+
+def decode_response(body):
+    """Parse a response body; ``values`` is a zero-copy ``float32`` view."""
+    if len(body) < _RESPONSE.size:
+        raise SpectralAnalysisError("response shorter than its header")
+    sensor, op, status, seq = _RESPONSE.unpack_from(body)
+    if status == STATUS_OK:
+        values = np.frombuffer(body, dtype="<f4", offset=_RESPONSE.size)
+        return Response(sensor, OPS[op], seq, status, values, None)
+    error = bytes(body[_RESPONSE.size:]).decode("utf-8", "replace")
+    return Response(sensor, OPS[op], seq, status, None, error)
+
+
+async def read_message(reader):
+    """Read one framed body from an ``asyncio.StreamReader``; ``None`` at EOF."""
+    try:
+        prefix = await reader.readexactly(_LENGTH.size)
+    except asyncio.IncompleteReadError as exc:
+        if exc.partial:
+            raise SpectralAnalysisError("connection closed inside a length prefix") from None
+        return None
+    (length,) = _LENGTH.unpack(prefix)
+    if length > MAX_MESSAGE:
+        raise SpectralAnalysisError(f"message of {length} bytes exceeds the {MAX_MESSAGE} byte limit")
+    try:
+        return await reader.readexactly(length)
+    except asyncio.IncompleteReadError:
+        raise SpectralAnalysisError("connection closed inside a message") from None
@@ -0,0 +1,203 @@
+"""Asyncio ingestion server that batches sensor frames into vectorized calls."""
+
+import asyncio
+import collections
+import concurrent.futures
+import logging
+import os
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.ml.features import extract_features_batch
+from spectranova.service.protocol import decode_request, encode_response, read_message, request_header
+from spectranova.signal.welch import compute_welch
+
+logger = logging.getLogger(__name__)
+
+
+def analyse_batch(op, fs, frames, nperseg=256):
+    """Run ``op`` on equal-length ``frames`` as one batch; one result row per frame.
+
+    Module-level so that process pools can pickle it.
+    """
+    batch = np.stack(frames).astype(float, copy=False)
+    if op == "welch":
+        return compute_welch(batch, fs, nperseg=nperseg, cache=False)[1]
+    if op == "features":
+        return extract_features_batch(batch, fs)[0]
+    raise SpectralAnalysisError(f"unknown op: {op!r}")
+
+
+class _Connection:
+    """Writer of one client plus the count of its unanswered requests."""
+
+    def __init__(self, writer):
+        self.writer = writer
+        self.pending = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+    def add(self):
+        self.pending += 1
+        self.idle.clear()
+
+    def send(self, data):
+        if not self.writer.is_closing():
+            self.writer.write(data)
+        self.pending -= 1
+        if not self.pending:
+            self.idle.set()
+
+
+class IngestServer:
+    """Accept frames from sensors over TCP or Unix sockets and answer with spectra.
+
+    Connections only parse frames (see :mod:`spectranova.service.protocol`)
+    and queue them; a batcher collects whatever arrives within
+    ``batch_window`` seconds (up to ``max_batch`` frames), groups frames
+    with the same op, sample rate and length, and runs each group as a
+    single vectorized :func:`analyse_batch` call on a thread or process
+    pool, so the event loop never runs NumPy work itself.  At most
+    ``max_pending`` frames wait in the queue; beyond that connections stop
+    being read, pushing back on senders through TCP flow control.
+
+    >>> server = IngestServer(workers=4)
+    >>> await server.start(port=9000)
+    >>> await server.serve_forever()
+    """
+
+    def __init__(self, executor="thread", workers=None, batch_window=0.002, max_batch=256,
+                 max_pending=4096, nperseg=256):
+        if executor not in ("thread", "process"):
+            raise SpectralAnalysisError(f"unknown executor: {executor!r}")
+        self.executor_kind = executor
+        self.workers = int(workers or os.cpu_count() or 1)
+        self.batch_window = float(batch_window)
+        self.max_batch = int(max_batch)
+        self.max_pending = int(max_pending)
+        self.nperseg = int(nperseg)
+        self.stats = collections.Counter()
+        self._servers = []
+        self._tasks = set()
+        self._queue = None
+        self._executor = None
+        self._batcher = None
+        self._slots = None
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """Listen on TCP ``host:port`` or, with ``path``, a Unix socket.
+
+        May be called more than once to listen on several endpoints.
+        Returns the bound address (``(host, port)`` or ``path``).
+        """
+        if self._queue is None:
+            self._queue = asyncio.Queue(self.max_pending)
+            pool = (concurrent.futures.ThreadPoolExecutor if self.executor_kind == "thread"
+                    else concurrent.futures.ProcessPoolExecutor)
+            self._executor = pool(self.workers)
+            # Batches in flight beyond the pool size would only queue inside
+            # the executor; holding them back lets later frames join a batch.
+            self._slots = asyncio.Semaphore(2 * self.workers)
+            self._batcher = asyncio.ensure_future(self._batch_loop())
+        if path is not None:
+            server = await asyncio.start_unix_server(self._handle, path=path)
+            address = path
+        else:
+            server = await asyncio.start_server(self._handle, host, port)
+            address = server.sockets[0].getsockname()[:2]
+        self._servers.append(server)
+        logger.info("listening on %s", address)
+        return address
+
+    async def serve_forever(self):
+        """Serve until cancelled."""
+        await asyncio.gather(*(server.serve_forever() for server in self._servers))
+
+    async def close(self):
+        """Stop listening, finish queued frames and shut the pool down."""
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+        if self._queue is not None:
+            await self._queue.join()
+            self._batcher.cancel()
+            if self._tasks:
+                await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._executor.shutdown()
+            self._queue = None
+
+    async def _handle(self, reader, writer):
+        conn = _Connection(writer)
+        self.stats["connections"] += 1
+        try:
+            while True:
+                body = await read_message(reader)
+                if body is None:
+                    break
+                try:
+                    request = decode_request(body)
+                except SpectralAnalysisError as exc:
+                    self.stats["rejected"] += 1
+                    header = request_header(body)
+                    if header is None:
+                        # Without a header the reply cannot be addressed; stop reading.
+                        logger.warning("closing connection: %s", exc)
+                        break
+                    conn.add()
+                    conn.send(encode_response(*header, error=exc))
+                    continue
+                conn.add()
+                await self._queue.put((request, conn))
+            # Answer everything the client sent before it stopped sending.
+            await conn.idle.wait()
+            await writer.drain()
+        except (SpectralAnalysisError, ConnectionError) as exc:
+            logger.warning("dropping connection: %s", exc)
+        finally:
+            writer.close()
+
+    async def _batch_loop(self):
+        queue = self._queue
+        while True:
+            items = [await queue.get()]
+            if queue.qsize() < self.max_batch - 1 and self.batch_window > 0:
+                await asyncio.sleep(self.batch_window)
+            while len(items) < self.max_batch and not queue.empty():
+                items.append(queue.get_nowait())
+            groups = collections.defaultdict(list)
+            for request, conn in items:
+                groups[request.op, request.fs, request.samples.size].append((request, conn))
+            for key, group in groups.items():
+                await self._slots.acquire()
+                task = asyncio.ensure_future(self._run_group(key, group))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            self.stats["batches"] += len(groups)
+
+    async def _run_group(self, key, group):
+        op, fs, _ = key
+        loop = asyncio.get_running_loop()
+        try:
+            frames = [request.samples for request, _ in group]
+            try:
+                rows = await loop.run_in_executor(self._executor, analyse_batch, op, fs, frames, self.nperseg)
+            except Exception as exc:
+                self.stats["errors"] += len(group)
+                for request, conn in group:
+                    conn.send(encode_response(request.sensor, op, request.seq, error=exc))
+            else:
+                self.stats["frames"] += len(group)
+                for (request, conn), row in zip(group, rows):
+                    conn.send(encode_response(request.sensor, op, request.seq, row))
+            for conn in {conn for _, conn in group}:
+                if not conn.writer.is_closing():
+                    try:
+                        await conn.writer.drain()
+                    except ConnectionError:
+                        pass
+        finally:
+            self._slots.release()
+            for _ in group:
+                self._queue.task_done()
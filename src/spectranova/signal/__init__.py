@@ -1 +1,28 @@
 """Classical Signal Processing module."""
+
+from spectranova._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "compute_fft": "fourier",
+    "get_fft_plan": "fourier",
+    "next_fast_len": "fourier",
+    "lombscargle": "lombscargle",
+    "lombscargle_batch": "lombscargle",
+    "LineCatalog": "lines",
+    "doppler_factor": "lines",
+    "compute_multitaper": "multitaper",
+    "get_dpss": "multitaper",
+    "find_peaks_batch": "peaks",
+    "check_segments": "framing",
+    "frame_psd": "framing",
+    "psd_scale": "framing",
+    "sliding_frames": "framing",
+    "compute_spectrogram": "spectrogram",
+    "StreamingSTFT": "spectrogram",
+    "compute_welch": "welch",
+    "OnlineWelch": "welch",
+    "get_window": "window",
+    "get_window_info": "window",
+    "compare_windows": "window",
+    "WINDOWS": "window",
+})
@@ -1,5 +1,115 @@
 """Fourier Transform implementations."""
 
-def compute_fft(signal, fs):
-    """Compute Fast Fourier Transform."""
-    pass
+import numpy as np
+
+from spectranova.core.cache import LRUCache, disk_cached
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.instrument import instrumented
+from spectranova.core.precision import resolve_precision
+
+# Plans are keyed by (n_samples, n_fft, fs, real) and hold the frequency-bin
+# vector, so equal-length captures never rebuild it.  Twiddle factors live in
+# NumPy's pocketfft plan cache, which is keyed by the same transform length.
+_PLAN_CACHE = LRUCache(maxsize=64)
+
+
+def next_fast_len(n):
+    """Return the smallest 5-smooth integer (2^a 3^b 5^c) that is >= ``n``."""
+    if n <= 6:
+        return max(int(n), 1)
+    best = 1 << (int(n) - 1).bit_length()
+    p5 = 1
+    while p5 < best:
+        p35 = p5
+        while p35 < best:
+            # Smallest power of two lifting p35 to at least n.
+            quotient = -(-n // p35)
+            p2 = 1 << (quotient - 1).bit_length()
+            candidate = p2 * p35
+            if candidate == n:
+                return candidate
+            if candidate < best:
+                best = candidate
+            p35 *= 3
+            if p35 == n:
+                return p35
+        p5 *= 5
+        if p5 == n:
+            return p5
+    return best
+
+
+class FFTPlan:
+    """Cached description of a transform of one signal length."""
+
+    __slots__ = ("n", "n_fft", "fs", "real", "freqs")
+
+    def __init__(self, n, n_fft, fs, real):
+        self.n = n
+        self.n_fft = n_fft
+        self.fs = fs
+        self.real = real
+        if real:
+            freqs = np.fft.rfftfreq(n_fft, d=1.0 / fs)
+        else:
+            freqs = np.fft.fftfreq(n_fft, d=1.0 / fs)
+        freqs.setflags(write=False)
+        self.freqs = freqs
+
+    @property
+    def nbytes(self):
+        return self.freqs.nbytes
+
+    def execute(self, x):
+        """Transform ``x`` along its last axis."""
+        if self.real:
+            return np.fft.rfft(x, n=self.n_fft, axis=-1)
+        return np.fft.fft(x, n=self.n_fft, axis=-1)
+
+
+def get_fft_plan(n, fs, real=True, pad=True):
+    """Return the cached :class:`FFTPlan` for ``n`` samples at rate ``fs``."""
+    n_fft = next_fast_len(n) if pad else n
+    key = (n, n_fft, float(fs), bool(real))
+    return _PLAN_CACHE.get_or_create(key, lambda: FFTPlan(n, n_fft, float(fs), bool(real)))
+
+
+def clear_fft_cache():
+    """Drop every cached FFT plan."""
+    _PLAN_CACHE.clear()
+
+
+def _as_batch(signal):
+    if isinstance(signal, (list, tuple)) and signal and np.ndim(signal[0]) == 1:
+        lengths = {len(s) for s in signal}
+        if len(lengths) != 1:
+            raise SpectralAnalysisError("all signals in a batch must have the same length")
+        return np.stack(signal)
+    return np.asarray(signal)
+
+
+@instrumented("fft")
+@disk_cached
+def compute_fft(signal, fs, pad=True, precision=None):
+    """Compute Fast Fourier Transform.
+
+    ``signal`` is a 1-D array, an ``(n_signals, n_samples)`` array, or a
+    sequence of equal-length 1-D arrays; the transform runs along the last
+    axis in a single call.  Real input uses ``rfft`` (one-sided spectrum),
+    complex input the full ``fft``.  With ``pad=True`` the signal is
+    zero-padded to the next 5-smooth length.  The input is converted to
+    the real or complex dtype of ``precision`` (see
+    :mod:`spectranova.core.precision`), which the spectrum keeps.
+
+    Returns ``(freqs, spectrum)``.
+    """
+    precision = resolve_precision(precision)
+    x = _as_batch(signal)
+    if x.ndim not in (1, 2) or x.shape[-1] == 0:
+        raise SpectralAnalysisError("signal must be a non-empty 1-D or 2-D array")
+    if fs <= 0:
+        raise SpectralAnalysisError("fs must be positive")
+    real = not np.iscomplexobj(x)
+    x = np.asarray(x, dtype=precision.real if real else precision.complex)
+    plan = get_fft_plan(x.shape[-1], fs, real=real, pad=pad)
+    return plan.freqs, plan.execute(x)
@@ -0,0 +1,50 @@
+"""Segment framing and one-sided PSD helpers shared by the STFT and Welch paths."""
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+
+# Frames transformed per rfft call; bounds the temporary (frames x nperseg) block.
+BLOCK_FRAMES = 64
+
+
+def check_segments(nperseg, noverlap):
+    """Validate a segment length and overlap; ``noverlap=None`` means half a segment."""
+    nperseg = int(nperseg)
+    if nperseg <= 0:
+        raise SpectralAnalysisError("nperseg must be positive")
+    if noverlap is None:
+        noverlap = nperseg // 2
+    noverlap = int(noverlap)
+    if not 0 <= noverlap < nperseg:
+        raise SpectralAnalysisError("noverlap must satisfy 0 <= noverlap < nperseg")
+    return nperseg, noverlap
+
+
+def psd_scale(info, fs, scaling):
+    """Factor turning ``|rfft|**2`` of windowed frames into ``density`` or ``spectrum`` units."""
+    # Python floats, so that single-precision frames are not upcast.
+    if scaling == "density":
+        return float(1.0 / (fs * info.sum_sq))
+    if scaling == "spectrum":
+        return float(1.0 / info.sum ** 2)
+    raise SpectralAnalysisError(f"unknown scaling: {scaling!r}")
+
+
+def frame_psd(frames, win, scale, nperseg):
+    """One-sided power spectra of the rows of ``frames``."""
+    spec = np.fft.rfft(frames * win, n=nperseg, axis=-1)
+    psd = (spec.real * spec.real + spec.imag * spec.imag) * scale
+    if nperseg % 2:
+        psd[..., 1:] *= 2
+    else:
+        psd[..., 1:-1] *= 2
+    return psd
+
+
+def sliding_frames(x, nperseg, hop, first=0):
+    """Strided (n_frames, nperseg) view of ``x`` starting at sample ``first``."""
+    if x.shape[-1] - first < nperseg:
+        return np.empty(x.shape[:-1] + (0, nperseg), dtype=x.dtype)
+    view = np.lib.stride_tricks.sliding_window_view(x[..., first:], nperseg, axis=-1)
+    return view[..., ::hop, :]
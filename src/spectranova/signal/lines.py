@@ -0,0 +1,132 @@
+"""Spectral-line identification against a reference line catalog."""
+
+from collections import namedtuple
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+
+# Speed of light in m/s; velocities are given in m/s, positive when receding.
+SPEED_OF_LIGHT = 299_792_458.0
+
+Matches = namedtuple("Matches", ["spectrum", "peak", "line", "rest_freq", "velocity", "error"])
+Matches.__doc__ = """Candidate identifications, one entry per (peak, catalog line) pair.
+
+``spectrum`` and ``peak`` index the :class:`~spectranova.signal.peaks.Peaks`
+that were matched, ``line`` the catalog row, ``rest_freq`` its catalog
+frequency, ``velocity`` the radial velocity that maps the line exactly
+onto the peak and ``error`` the rest-frame mismatch in Hz at the closest
+admissible velocity.
+"""
+
+
+def doppler_factor(velocity):
+    """Observed-to-rest frequency ratio for a radial ``velocity`` (relativistic)."""
+    beta = np.asarray(velocity, dtype=float) / SPEED_OF_LIGHT
+    return np.sqrt((1 - beta) / (1 + beta))
+
+
+def doppler_velocity(observed, rest):
+    """Radial velocity that shifts ``rest`` frequencies to ``observed`` ones."""
+    ratio2 = (np.asarray(observed, dtype=float) / np.asarray(rest, dtype=float)) ** 2
+    return SPEED_OF_LIGHT * (1 - ratio2) / (1 + ratio2)
+
+
+class LineCatalog:
+    """Reference lines sorted by rest frequency for interval lookups.
+
+    ``freqs`` are rest frequencies in Hz; optional ``widths`` give each
+    line's own half-width (its catalog uncertainty), which widens the
+    match window for that line only.  Extra keyword ``columns`` (names,
+    species, intensities...) are kept aligned with the sorted lines.
+    Lookups are binary searches on the sorted frequencies: a query window
+    costs ``O(log n_lines)`` plus the lines it contains.
+    """
+
+    def __init__(self, freqs, widths=None, **columns):
+        freqs = np.asarray(freqs, dtype=float)
+        if freqs.ndim != 1 or not np.all(np.isfinite(freqs)):
+            raise SpectralAnalysisError("catalog frequencies must be a finite 1-D array")
+        order = np.argsort(freqs, kind="stable")
+        self.freqs = freqs[order]
+        self.widths = None if widths is None else np.asarray(widths, dtype=float)[order]
+        # Lines may extend this far beyond their frequency; windows are widened by it.
+        self.max_width = 0.0 if self.widths is None else float(self.widths.max(initial=0.0))
+        self.columns = {}
+        for name, values in columns.items():
+            values = np.asarray(values)
+            if len(values) != freqs.size:
+                raise SpectralAnalysisError(f"catalog column {name!r} has {len(values)} rows, expected {freqs.size}")
+            self.columns[name] = values[order]
+
+    def __len__(self):
+        return self.freqs.size
+
+    def save(self, path):
+        """Write the catalog to ``path`` (``.npz``)."""
+        arrays = {f"column_{name}": values for name, values in self.columns.items()}
+        if self.widths is not None:
+            arrays["widths"] = self.widths
+        np.savez(path, freqs=self.freqs, **arrays)
+
+    @classmethod
+    def load(cls, path):
+        """Read a catalog written by :meth:`save`."""
+        with np.load(path) as data:
+            columns = {name[len("column_"):]: data[name] for name in data.files if name.startswith("column_")}
+            return cls(data["freqs"], data["widths"] if "widths" in data.files else None, **columns)
+
+    def window(self, lo, hi):
+        """Return ``(start, stop)`` catalog positions of lines with ``lo <= freq <= hi``."""
+        return np.searchsorted(self.freqs, lo, side="left"), np.searchsorted(self.freqs, hi, side="right")
+
+    def match(self, peaks, tolerance=0.0, rel_tolerance=0.0, velocity=0.0, velocity_range=None,
+              best=False):
+        """Identify detected peaks with catalog lines.
+
+        ``peaks`` is a :class:`~spectranova.signal.peaks.Peaks` (or a 1-D
+        array of frequencies, treated as one spectrum).  Peaks are shifted
+        to the rest frame with ``velocity`` (m/s; a scalar or one value per
+        spectrum) and matched to lines within ``tolerance`` Hz plus
+        ``rel_tolerance`` times the frequency, plus each line's width.
+        ``velocity_range`` (``(low, high)`` around ``velocity``) also
+        accepts any radial velocity in that range.  With ``best`` only the
+        line with the smallest ``error`` is kept per peak.  Returns
+        :class:`Matches` ordered by spectrum and peak.
+        """
+        if isinstance(peaks, tuple) and hasattr(peaks, "offsets"):
+            offsets, observed = peaks.offsets, np.asarray(peaks.freqs, dtype=float)
+        else:
+            observed = np.asarray(peaks, dtype=float).ravel()
+            offsets = np.array([0, observed.size])
+        spectrum = np.repeat(np.arange(offsets.size - 1), np.diff(offsets))
+        velocity = np.broadcast_to(np.asarray(velocity, dtype=float), (offsets.size - 1,))[spectrum]
+        low, high = (0.0, 0.0) if velocity_range is None else velocity_range
+        if low > high:
+            raise SpectralAnalysisError("velocity_range must be (low, high) with low <= high")
+        # A receding source is observed below its rest frequency.
+        rest_lo = observed / doppler_factor(velocity + low)
+        rest_hi = observed / doppler_factor(velocity + high)
+        slack = tolerance + rel_tolerance * observed + self.max_width
+        start, stop = self.window(rest_lo - slack, rest_hi + slack)
+
+        counts = stop - start
+        peak = np.repeat(np.arange(observed.size), counts)
+        line = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts - start, counts)
+        rest = self.freqs[line]
+        # Rest-frame mismatch at the closest admissible velocity.
+        error = np.abs(np.maximum(rest - rest_hi[peak], 0.0) + np.minimum(rest - rest_lo[peak], 0.0))
+        allowed = tolerance + rel_tolerance * observed[peak]
+        if self.widths is not None:
+            allowed = allowed + self.widths[line]
+        keep = error <= allowed
+        peak, line, rest, error = peak[keep], line[keep], rest[keep], error[keep]
+        if best and peak.size:
+            # Entries are grouped by peak: keep the first minimum of each group.
+            starts = np.flatnonzero(np.r_[True, peak[1:] != peak[:-1]])
+            group = np.cumsum(np.r_[False, peak[1:] != peak[:-1]])
+            is_min = error == np.minimum.reduceat(error, starts)[group]
+            first = np.flatnonzero(is_min)
+            first = first[np.r_[True, group[first][1:] != group[first][:-1]]]
+            peak, line, rest, error = peak[first], line[first], rest[first], error[first]
+        return Matches(spectrum[peak], peak, line, rest, doppler_velocity(observed[peak], rest), error)
@@ -0,0 +1,125 @@
+"""Multitaper Power Spectral Density estimation (Thomson, 1982)."""
+
+import numpy as np
+
+from spectranova.core.cache import LRUCache, disk_cached
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.signal.fourier import next_fast_len
+
+# DPSS sets keyed by (N, NW, K).  Solving for the tapers costs far more than
+# the FFTs that use them, so misses also consult the process ResultCache
+# (see core.cache.set_result_cache), which persists them across processes.
+_DPSS_CACHE = LRUCache(maxsize=32, maxbytes=256 * 2**20)
+
+
+def _tridiagonal_eigenvectors(diag, off, k):
+    """Eigenvectors of the ``k`` largest eigenvalues of a symmetric tridiagonal matrix."""
+    n = diag.size
+    try:
+        from scipy.linalg import eigh_tridiagonal
+    except ImportError:
+        # Dense fallback, O(N^3); install SciPy for long tapers.
+        matrix = np.diag(diag) + np.diag(off, 1) + np.diag(off, -1)
+        _, vectors = np.linalg.eigh(matrix)
+        return vectors[:, n - k:][:, ::-1].T
+    _, vectors = eigh_tridiagonal(diag, off, select="i", select_range=(n - k, n - 1))
+    return vectors[:, ::-1].T
+
+
+@disk_cached
+def _solve_dpss(n, nw, k):
+    w = nw / n
+    idx = np.arange(n)
+    diag = ((n - 1 - 2 * idx) / 2.0) ** 2 * np.cos(2 * np.pi * w)
+    off = idx[1:] * (n - idx[1:]) / 2.0
+    tapers = _tridiagonal_eigenvectors(diag, off, k)
+    tapers /= np.linalg.norm(tapers, axis=1, keepdims=True)
+
+    # Sign convention: symmetric tapers sum positive, antisymmetric tapers
+    # start with a positive lobe.
+    flip = tapers[::2].sum(axis=1) < 0
+    tapers[::2][flip] *= -1
+    thresh = max(1e-7, 1.0 / n)
+    for row in tapers[1::2]:
+        if row[np.argmax(np.abs(row) > thresh)] < 0:
+            row *= -1
+
+    # Concentration ratios from each taper's autocorrelation.
+    n_fft = next_fast_len(2 * n - 1)
+    rxx = np.fft.irfft(np.abs(np.fft.rfft(tapers, n_fft, axis=1)) ** 2, n_fft, axis=1)[:, :n]
+    kernel = 4 * w * np.sinc(2 * w * idx)
+    kernel[0] = 2 * w
+    eigenvalues = np.clip(rxx @ kernel, 0.0, 1.0)
+    return tapers, eigenvalues
+
+
+def get_dpss(n, nw=4.0, k=None):
+    """Return cached ``(tapers, eigenvalues)`` for ``n`` samples.
+
+    ``tapers`` is a read-only ``(k, n)`` array of unit-energy Slepian
+    sequences with time-bandwidth product ``nw``; ``eigenvalues`` are their
+    spectral concentration ratios.  ``k`` defaults to ``2 * nw - 1``.
+    """
+    n = int(n)
+    k = int(2 * nw - 1) if k is None else int(k)
+    if n < 2 or not 0 < nw < n / 2 or not 1 <= k <= n:
+        raise SpectralAnalysisError("need n >= 2, 0 < nw < n / 2 and 1 <= k <= n")
+
+    def build():
+        tapers, eigenvalues = (np.array(a) for a in _solve_dpss(n, float(nw), k))
+        tapers.setflags(write=False)
+        eigenvalues.setflags(write=False)
+        return tapers, eigenvalues
+
+    return _DPSS_CACHE.get_or_create((n, float(nw), k), build)
+
+
+def _adaptive_weights(sk, eigenvalues, variance, max_iter=100, tol=1e-10):
+    # Thomson's adaptive weighting, iterated for every signal and frequency at once.
+    lam = eigenvalues[None, :, None]
+    noise = (1.0 - lam) * variance[:, None, None]
+    psd = sk[:, :2].mean(axis=1, keepdims=True)
+    for _ in range(max_iter):
+        b = psd / (lam * psd + noise)
+        weights = b * b * lam
+        new = (weights * sk).sum(axis=1, keepdims=True) / weights.sum(axis=1, keepdims=True)
+        if np.max(np.abs(new - psd) / (psd + np.finfo(float).tiny)) < tol:
+            psd = new
+            break
+        psd = new
+    return psd[:, 0]
+
+
+@disk_cached
+def compute_multitaper(signal, fs, nw=4.0, k=None, adaptive=False, n_fft=None):
+    """Compute PSD with the multitaper method.
+
+    ``signal`` is 1-D or an ``(n_signals, n_samples)`` batch; one cached
+    taper set serves every row, and all ``n_signals * k`` tapered FFTs run
+    as a single batched transform.  With ``adaptive=True`` Thomson's
+    adaptive weights replace the eigenvalue weighting.
+
+    Returns ``(freqs, psd)`` with a one-sided density matching
+    :func:`~spectranova.signal.welch.compute_welch`.
+    """
+    x = np.asarray(signal, dtype=float)
+    if x.ndim not in (1, 2):
+        raise SpectralAnalysisError("signal must be 1-D or 2-D")
+    batch = np.atleast_2d(x)
+    n = batch.shape[1]
+    n_fft = n if n_fft is None else int(n_fft)
+    tapers, eigenvalues = get_dpss(n, nw, k)
+
+    spectra = np.fft.rfft(batch[:, None, :] * tapers[None, :, :], n=n_fft, axis=-1)
+    sk = spectra.real ** 2 + spectra.imag ** 2
+    if adaptive:
+        psd = _adaptive_weights(sk, eigenvalues, batch.var(axis=1))
+    else:
+        psd = np.tensordot(eigenvalues, sk, axes=(0, 1)) / eigenvalues.sum()
+    psd /= fs
+    if n_fft % 2:
+        psd[:, 1:] *= 2
+    else:
+        psd[:, 1:-1] *= 2
+    freqs = np.fft.rfftfreq(n_fft, d=1.0 / fs)
+    return freqs, psd[0] if x.ndim == 1 else psd
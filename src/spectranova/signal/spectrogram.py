@@ -1,5 +1,126 @@
 """Short-Time Fourier Transform (STFT) Spectrogram computation."""
 
-def compute_spectrogram(signal, fs):
-    """Compute spectrogram using STFT."""
-    pass
+import numpy as np
+
+from spectranova.core.cache import disk_cached
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.instrument import instrumented
+from spectranova.core.precision import resolve_precision
+from spectranova.signal.framing import BLOCK_FRAMES, check_segments, frame_psd, psd_scale, sliding_frames
+from spectranova.signal.window import get_window_info
+
+@instrumented("spectrogram")
+@disk_cached
+def compute_spectrogram(signal, fs, window="hann", nperseg=256, noverlap=None, scaling="density",
+                        precision=None):
+    """Compute spectrogram using STFT.
+
+    Returns ``(freqs, times, Sxx)`` where ``Sxx`` has shape
+    ``(n_freqs, n_frames)`` and ``times`` are segment centres in seconds.
+    Trailing samples that do not fill a whole segment are dropped.
+    Frames are transformed and ``Sxx`` is stored in ``precision``.
+    """
+    precision = resolve_precision(precision)
+    x = np.asarray(signal, dtype=precision.real)
+    if x.ndim != 1:
+        raise SpectralAnalysisError("signal must be 1-D")
+    nperseg, noverlap = check_segments(nperseg, noverlap)
+    hop = nperseg - noverlap
+    info = get_window_info(window, nperseg)
+    win = info.window.astype(precision.real, copy=False)
+    scale = psd_scale(info, fs, scaling)
+    frames = sliding_frames(x, nperseg, hop)
+    n_frames = frames.shape[0]
+    out = np.empty((n_frames, nperseg // 2 + 1), dtype=precision.real)
+    for start in range(0, n_frames, BLOCK_FRAMES):
+        block = frames[start:start + BLOCK_FRAMES]
+        out[start:start + len(block)] = frame_psd(block, win, scale, nperseg)
+    freqs = np.fft.rfftfreq(nperseg, d=1.0 / fs)
+    times = (np.arange(n_frames) * hop + nperseg / 2) / fs
+    return freqs, times, out.T
+
+
+class StreamingSTFT:
+    """Chunked STFT that yields the same frames as :func:`compute_spectrogram`.
+
+    Feed arbitrary-size chunks to :meth:`push`; fewer than ``nperseg``
+    samples are carried between calls, so memory stays bounded by the
+    window and the frame block regardless of recording length.
+
+    >>> stft = StreamingSTFT(fs=48000, nperseg=1024)
+    >>> for chunk in chunks:
+    ...     for t, frame in stft.push(chunk):
+    ...         handle(t, frame)
+    """
+
+    def __init__(self, fs, window="hann", nperseg=256, noverlap=None, scaling="density"):
+        self.fs = fs
+        self.nperseg, self.noverlap = check_segments(nperseg, noverlap)
+        self.hop = self.nperseg - self.noverlap
+        info = get_window_info(window, self.nperseg)
+        self.window = info.window
+        self._scale = psd_scale(info, fs, scaling)
+        self.freqs = np.fft.rfftfreq(self.nperseg, d=1.0 / fs)
+        self.reset()
+
+    def reset(self):
+        """Forget the carried tail and restart the frame clock."""
+        self._tail = np.empty(0)
+        self.n_frames = 0
+
+    def push(self, chunk):
+        """Consume ``chunk`` and return a generator of ``(time, frame)`` pairs.
+
+        The stream state advances immediately, so the next chunk may be
+        pushed before the returned generator has been exhausted.
+        """
+        return self._rows(self.push_blocks(chunk))
+
+    def push_blocks(self, chunk):
+        """Like :meth:`push` but yield ``(times, frames)`` blocks of up to 64 frames."""
+        chunk = np.asarray(chunk, dtype=float)
+        if chunk.ndim != 1:
+            raise SpectralAnalysisError("chunk must be 1-D")
+        nperseg, hop = self.nperseg, self.hop
+        tail = self._tail
+        n_tail = tail.size
+        total = n_tail + chunk.size
+        n_new = 0 if total < nperseg else (total - nperseg) // hop + 1
+
+        # Frames starting inside the carried tail need at most nperseg - 1
+        # samples of the new chunk; frames starting later are views of it.
+        n_head = min(n_new, -(-n_tail // hop))
+        head = np.concatenate((tail, chunk[:nperseg - 1])) if n_head else None
+        first = n_head * hop - n_tail
+        next_start = n_new * hop
+        if next_start >= n_tail:
+            self._tail = chunk[next_start - n_tail:].copy()
+        else:
+            self._tail = np.concatenate((tail[next_start:], chunk))
+        index0 = self.n_frames
+        self.n_frames += n_new
+        return self._blocks(head, n_head, chunk, first, n_new - n_head, index0)
+
+    def _blocks(self, head, n_head, chunk, first, n_body, index):
+        nperseg, hop = self.nperseg, self.hop
+        sources = []
+        if n_head:
+            sources.append(sliding_frames(head, nperseg, hop)[:n_head])
+        if n_body:
+            sources.append(sliding_frames(chunk, nperseg, hop, first)[:n_body])
+        for frames in sources:
+            for start in range(0, frames.shape[0], BLOCK_FRAMES):
+                block = frames[start:start + BLOCK_FRAMES]
+                times = ((index + np.arange(len(block))) * hop + nperseg / 2) / self.fs
+                yield times, frame_psd(block, self.window, self._scale, nperseg)
+                index += len(block)
+
+    @staticmethod
+    def _rows(blocks):
+        for times, psd in blocks:
+            yield from zip(times, psd)
+
+    def stream(self, chunks):
+        """Yield ``(time, frame)`` pairs for every chunk of an iterable."""
+        for chunk in chunks:
+            yield from self.push(chunk)
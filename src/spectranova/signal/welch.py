@@ -1,5 +1,116 @@
 """Welch's method for Power Spectral Density estimation."""
 
-def compute_welch(signal, fs, window="hann"):
-    """Compute PSD using Welch's method."""
-    pass
+import numpy as np
+
+from spectranova.core.cache import disk_cached
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.instrument import instrumented
+from spectranova.core.precision import resolve_precision
+from spectranova.signal.framing import BLOCK_FRAMES, check_segments, frame_psd, psd_scale, sliding_frames
+from spectranova.signal.spectrogram import StreamingSTFT, compute_spectrogram
+from spectranova.signal.window import get_window_info
+
+
+def _welch_batch(x, fs, window, nperseg, noverlap, scaling):
+    # Average every row's frames, transforming up to BLOCK_FRAMES frames of
+    # all rows per call.
+    nperseg, noverlap = check_segments(nperseg, noverlap)
+    info = get_window_info(window, nperseg)
+    scale = psd_scale(info, fs, scaling)
+    win = info.window.astype(x.dtype, copy=False)
+    frames = sliding_frames(x, nperseg, nperseg - noverlap)
+    n_frames = frames.shape[1]
+    psd = np.zeros((x.shape[0], nperseg // 2 + 1), dtype=x.dtype)
+    for start in range(0, n_frames, BLOCK_FRAMES):
+        psd += frame_psd(frames[:, start:start + BLOCK_FRAMES], win, scale, nperseg).sum(axis=1)
+    return np.fft.rfftfreq(nperseg, d=1.0 / fs), psd / n_frames
+
+
+@instrumented("welch")
+@disk_cached
+def compute_welch(signal, fs, window="hann", nperseg=256, noverlap=None, scaling="density",
+                  precision=None):
+    """Compute PSD using Welch's method.
+
+    ``signal`` is 1-D or an ``(n_signals, n_samples)`` batch, whose rows
+    are segmented and transformed together.  Segments are shortened to
+    the signal length when the signal is shorter than ``nperseg``.
+    Returns ``(freqs, psd)``, with one PSD row per signal for a batch,
+    computed in ``precision``.
+    """
+    precision = resolve_precision(precision)
+    x = np.asarray(signal, dtype=precision.real)
+    if x.ndim not in (1, 2) or x.shape[-1] == 0:
+        raise SpectralAnalysisError("signal must be a non-empty 1-D or 2-D array")
+    if nperseg > x.shape[-1]:
+        nperseg, noverlap = x.shape[-1], None
+    if x.ndim == 2:
+        return _welch_batch(x, fs, window, nperseg, noverlap, scaling)
+    freqs, _, sxx = compute_spectrogram(x, fs, window, nperseg, noverlap, scaling, precision, cache=False)
+    return freqs, sxx.mean(axis=1)
+
+
+class OnlineWelch:
+    """Incremental Welch estimator for live channels.
+
+    Each :meth:`update` transforms only the segments completed by the new
+    samples and folds them into a running sum, so :meth:`psd` costs
+    O(n_fft).  With ``forgetting`` in (0, 1) older segments are weighted
+    down geometrically, giving an exponentially-weighted PSD.  Accumulators
+    with the same configuration can be combined with :meth:`merge`.
+    """
+
+    def __init__(self, fs, window="hann", nperseg=256, noverlap=None, scaling="density",
+                 forgetting=None):
+        if forgetting is not None and not 0.0 < forgetting <= 1.0:
+            raise SpectralAnalysisError("forgetting must be in (0, 1]")
+        self._stft = StreamingSTFT(fs, window, nperseg, noverlap, scaling)
+        self._config = (fs, window, self._stft.nperseg, self._stft.noverlap, scaling, forgetting)
+        self.forgetting = forgetting
+        self.freqs = self._stft.freqs
+        self._sum = np.zeros_like(self.freqs)
+        self._weight = 0.0
+        self.n_segments = 0
+
+    def update(self, samples):
+        """Add new samples; return the number of segments completed."""
+        before = self.n_segments
+        lam = self.forgetting
+        for _, block in self._stft.push_blocks(samples):
+            k = block.shape[0]
+            if lam is None or lam == 1.0:
+                self._sum += block.sum(axis=0)
+                self._weight += k
+            else:
+                decay = lam ** np.arange(k - 1, -1, -1)
+                self._sum *= lam ** k
+                self._sum += decay @ block
+                self._weight = self._weight * lam ** k + decay.sum()
+            self.n_segments += k
+        return self.n_segments - before
+
+    def psd(self):
+        """Return the current PSD estimate."""
+        if self._weight == 0:
+            raise SpectralAnalysisError("no complete segment has been accumulated yet")
+        return self._sum / self._weight
+
+    def merge(self, other):
+        """Fold another accumulator's segments into this one and return ``self``.
+
+        Samples still pending in ``other``'s segment buffer are not carried
+        over, since they do not continue this accumulator's stream.
+        """
+        if not isinstance(other, OnlineWelch) or other._config != self._config:
+            raise SpectralAnalysisError("can only merge accumulators with identical settings")
+        self._sum += other._sum
+        self._weight += other._weight
+        self.n_segments += other.n_segments
+        return self
+
+    def reset(self):
+        """Clear the accumulated segments and the pending samples."""
+        self._stft.reset()
+        self._sum[:] = 0.0
+        self._weight = 0.0
+        self.n_segments = 0
@@ -1,5 +1,108 @@
 """Window function generators."""
 
+from collections import namedtuple
+
+import numpy as np
+
+from spectranova.core.cache import LRUCache
+from spectranova.core.exceptions import SpectralAnalysisError
+
+_COSINE_COEFFS = {
+    "hann": (0.5, 0.5),
+    "hamming": (0.54, 0.46),
+    "blackman": (0.42, 0.5, 0.08),
+    "flattop": (0.21557895, 0.41663158, 0.277263158, 0.083578947, 0.006947368),
+}
+
+WINDOWS = ("boxcar", "hann", "hamming", "blackman", "flattop", "kaiser")
+
+# Process-wide cache of windows and their constants, evicted by total array size.
+_WINDOW_CACHE = LRUCache(maxsize=None, maxbytes=64 * 2**20)
+
+WindowInfo = namedtuple(
+    "WindowInfo",
+    ["window", "sum", "sum_sq", "coherent_gain", "enbw", "scalloping_loss"],
+)
+WindowInfo.__doc__ = """Read-only window array with its precomputed spectral constants.
+
+``coherent_gain`` is ``sum / N``, ``enbw`` the equivalent noise bandwidth
+in bins and ``scalloping_loss`` the amplitude loss in dB for a tone half
+a bin off-centre.
+"""
+
+
+def _general_cosine(coeffs, length):
+    # Periodic (DFT-even) form, as used for spectral analysis.
+    phase = 2.0 * np.pi * np.arange(length) / length
+    win = np.zeros(length)
+    for k, a in enumerate(coeffs):
+        win += (-1) ** k * a * np.cos(k * phase)
+    return win
+
+
+def _make_window(name, length):
+    if isinstance(name, tuple):
+        name, *params = name
+    else:
+        params = []
+    length = int(length)
+    if length <= 0:
+        raise SpectralAnalysisError("window length must be positive")
+    if name in ("boxcar", "rect", "rectangular"):
+        return np.ones(length)
+    if length == 1:
+        return np.ones(1)
+    if name in _COSINE_COEFFS:
+        return _general_cosine(_COSINE_COEFFS[name], length)
+    if name == "kaiser":
+        beta = params[0] if params else 8.6
+        return np.kaiser(length + 1, beta)[:-1]
+    raise SpectralAnalysisError(f"unknown window: {name!r}")
+
+
+def _make_info(name, length):
+    win = _make_window(name, length)
+    win.setflags(write=False)
+    total = float(win.sum())
+    sum_sq = float(np.dot(win, win))
+    half_bin = abs(np.dot(win, np.exp(-1j * np.pi * np.arange(length) / length)))
+    return WindowInfo(
+        window=win,
+        sum=total,
+        sum_sq=sum_sq,
+        coherent_gain=total / length,
+        enbw=length * sum_sq / total ** 2,
+        scalloping_loss=-20.0 * np.log10(half_bin / total),
+    )
+
+
+def _key(name, length):
+    if isinstance(name, list):
+        name = tuple(name)
+    return name, int(length)
+
+
+def get_window_info(name, length):
+    """Return the cached :class:`WindowInfo` for ``name`` and ``length``."""
+    key = _key(name, length)
+    return _WINDOW_CACHE.get_or_create(key, lambda: _make_info(*key))
+
+
 def get_window(name, length):
-    """Get window function array."""
-    pass
+    """Get window function array.
+
+    ``name`` is one of :data:`WINDOWS` or a ``(name, param)`` tuple such as
+    ``("kaiser", 8.6)``.  Windows are periodic, matching the FFT bins.  The
+    returned array is cached process-wide and read-only.
+    """
+    return get_window_info(name, length).window
+
+
+def compare_windows(length=1024, names=WINDOWS):
+    """Return ``{name: WindowInfo}`` for the window comparison view."""
+    return {name if isinstance(name, str) else name[0]: get_window_info(name, length) for name in names}
+
+
+def clear_window_cache():
+    """Drop every cached window."""
+    _WINDOW_CACHE.clear()
@@ -0,0 +1,21 @@
+"""Real-time streaming analysis over preallocated buffers."""
+
+from spectranova._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "RingBuffer": "buffer",
+    "SlotRing": "buffer",
+    "BoundedQueue": "pipeline",
+    "LatencyHistogram": "pipeline",
+    "Pipeline": "pipeline",
+    "Stage": "stages",
+    "NormalizeStage": "stages",
+    "SpectrumStage": "stages",
+    "FeatureStage": "stages",
+    "AnomalyStage": "stages",
+    "Source": "sources",
+    "ArraySource": "sources",
+    "FileReplaySource": "sources",
+    "SocketSource": "sources",
+    "replay_to_socket": "sources",
+})
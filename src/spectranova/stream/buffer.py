@@ -0,0 +1,115 @@
+"""Preallocated ring buffers for streaming stages."""
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+
+
+class RingBuffer:
+    """Fixed-capacity multi-channel sample history.
+
+    Every sample is stored twice, ``capacity`` columns apart, so the most
+    recent ``n <= capacity`` samples are always a ``(channels, n)`` view
+    with contiguous rows: :meth:`latest` never copies, and a window can be
+    handed straight to a batched FFT.
+    """
+
+    def __init__(self, channels, capacity, dtype=np.float64):
+        if channels < 1 or capacity < 1:
+            raise SpectralAnalysisError("channels and capacity must be positive")
+        self.channels = int(channels)
+        self.capacity = int(capacity)
+        self._data = np.zeros((self.channels, 2 * self.capacity), dtype=dtype)
+        self._head = 0
+        self.count = 0
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    def write(self, block):
+        """Append a ``(channels, n)`` block; older samples are overwritten."""
+        block = np.asarray(block)
+        if block.ndim != 2 or block.shape[0] != self.channels:
+            raise SpectralAnalysisError(f"block must have shape ({self.channels}, n)")
+        cap, data = self.capacity, self._data
+        n = block.shape[1]
+        self.count += n
+        if n > cap:
+            block = block[:, n - cap:]
+            self._head = (self._head + n - cap) % cap
+            n = cap
+        head = self._head
+        first = min(n, cap - head)
+        data[:, head:head + first] = block[:, :first]
+        data[:, head + cap:head + cap + first] = block[:, :first]
+        rest = n - first
+        if rest:
+            data[:, :rest] = block[:, first:]
+            data[:, cap:cap + rest] = block[:, first:]
+        self._head = (head + n) % cap
+
+    def latest(self, n):
+        """Return a read-only view of the newest ``n`` samples."""
+        if not 0 < n <= min(self.capacity, self.count):
+            raise SpectralAnalysisError("not enough samples buffered")
+        end = self._head + self.capacity
+        view = self._data[:, end - n:end]
+        view.flags.writeable = False
+        return view
+
+    def reset(self):
+        """Forget every buffered sample."""
+        self._data[:] = 0
+        self._head = 0
+        self.count = 0
+
+
+class SlotRing:
+    """Pool of preallocated output arrays handed out by lease.
+
+    A producer :meth:`acquire` s a free slot, fills ``ring[index]`` in
+    place and passes the index downstream; the consumer :meth:`release` s
+    it when done.  No slot is reused while leased, so views stay valid for
+    as long as a frame is in flight.
+    """
+
+    def __init__(self, n_slots, shape, dtype=np.float64):
+        if n_slots < 1:
+            raise SpectralAnalysisError("n_slots must be positive")
+        self._slots = np.zeros((int(n_slots),) + tuple(shape), dtype=dtype)
+        self._busy = [False] * int(n_slots)
+        self._cursor = 0
+
+    @property
+    def shape(self):
+        return self._slots.shape[1:]
+
+    @property
+    def dtype(self):
+        return self._slots.dtype
+
+    def __len__(self):
+        return self._slots.shape[0]
+
+    def __getitem__(self, index):
+        return self._slots[index]
+
+    @property
+    def n_free(self):
+        return self._busy.count(False)
+
+    def acquire(self):
+        """Lease the next free slot and return its index."""
+        n = len(self._busy)
+        for step in range(n):
+            index = (self._cursor + step) % n
+            if not self._busy[index]:
+                self._busy[index] = True
+                self._cursor = (index + 1) % n
+                return index
+        raise SpectralAnalysisError("every slot is leased; the ring is too small for its consumers")
+
+    def release(self, index):
+        """Return slot ``index`` to the pool."""
+        self._busy[index] = False
@@ -0,0 +1,315 @@
+"""Threaded streaming pipeline with bounded queues and latency accounting."""
+
+import bisect
+import collections
+import threading
+import time
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.stream.buffer import SlotRing
+
+POLICIES = ("block", "drop_oldest", "drop_newest")
+
+# Histogram bucket edges in nanoseconds: 1 us to 10 s, ten per decade.
+_EDGES_NS = tuple(int(round(10 ** (3 + i / 10))) for i in range(71))
+
+
+class Frame:
+    """One block in flight: sequence number, ingest time and a leased slot."""
+
+    __slots__ = ("seq", "t_ingest", "ring", "index")
+
+    def __init__(self, seq, t_ingest, ring, index):
+        self.seq = seq
+        self.t_ingest = t_ingest
+        self.ring = ring
+        self.index = index
+
+    @property
+    def data(self):
+        """View of the slot holding this frame's payload."""
+        return self.ring[self.index]
+
+    def release(self):
+        self.ring.release(self.index)
+
+
+class LatencyHistogram:
+    """Log-bucketed latency histogram with O(log buckets) recording.
+
+    Percentiles are reported as the upper edge of the bucket holding them,
+    so they overstate the true value by at most ~26%.
+    """
+
+    def __init__(self):
+        self.counts = [0] * (len(_EDGES_NS) + 1)
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+
+    def record(self, ns):
+        self.counts[bisect.bisect_left(_EDGES_NS, ns)] += 1
+        self.count += 1
+        self.total_ns += ns
+        if ns > self.max_ns:
+            self.max_ns = ns
+
+    def percentile(self, q):
+        """Return the ``q``-th percentile (0-100) in seconds."""
+        if not self.count:
+            return 0.0
+        target = q / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= target:
+                edge = _EDGES_NS[i] if i < len(_EDGES_NS) else self.max_ns
+                return min(edge, self.max_ns) / 1e9
+        return self.max_ns / 1e9
+
+    def summary(self):
+        """Return count, mean, p50/p90/p99 and max, times in milliseconds."""
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ns / self.count / 1e6 if self.count else 0.0,
+            "p50_ms": self.percentile(50) * 1e3,
+            "p90_ms": self.percentile(90) * 1e3,
+            "p99_ms": self.percentile(99) * 1e3,
+            "max_ms": self.max_ns / 1e6,
+        }
+
+
+class BoundedQueue:
+    """Thread-safe FIFO of at most ``maxsize`` items.
+
+    When full, ``policy`` decides what :meth:`put` does: ``"block"`` waits
+    for room (backpressure on the producer), ``"drop_oldest"`` discards the
+    head to admit the new item, and ``"drop_newest"`` discards the new item.
+    Dropped items are counted in :attr:`dropped` and passed to ``on_drop``.
+    """
+
+    def __init__(self, maxsize, policy="block", on_drop=None):
+        if maxsize < 1:
+            raise SpectralAnalysisError("maxsize must be positive")
+        if policy not in POLICIES:
+            raise SpectralAnalysisError(f"unknown queue policy: {policy!r}")
+        self.maxsize = int(maxsize)
+        self.policy = policy
+        self.on_drop = on_drop
+        self.dropped = 0
+        self.high_water = 0
+        self.closed = False
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return len(self._items)
+
+    def put(self, item):
+        """Enqueue ``item``; return ``False`` if it was dropped instead."""
+        evicted = None
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                if self.policy == "drop_newest":
+                    evicted = item
+                elif self.policy == "drop_oldest":
+                    evicted = self._items.popleft()
+                else:
+                    while len(self._items) >= self.maxsize and not self.closed:
+                        self._cond.wait()
+            if self.closed:
+                evicted = item
+            elif evicted is not item:
+                self._items.append(item)
+                self.high_water = max(self.high_water, len(self._items))
+                self._cond.notify_all()
+            if evicted is not None:
+                self.dropped += 1
+        if evicted is not None and self.on_drop is not None:
+            self.on_drop(evicted)
+        return evicted is not item
+
+    def get(self):
+        """Dequeue the next item, or return ``None`` once closed and drained."""
+        with self._cond:
+            while not self._items and not self.closed:
+                self._cond.wait()
+            if not self._items:
+                return None
+            item = self._items.popleft()
+            self._cond.notify_all()
+            return item
+
+    def close(self):
+        """Stop accepting items and wake every waiter; queued items still drain."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+
+class Pipeline:
+    """Run a source through a chain of stages, one thread per stage.
+
+    ``source`` is a :class:`~spectranova.stream.sources.Source` and
+    ``stages`` are :class:`~spectranova.stream.stages.Stage` objects.
+    Consecutive threads are joined by :class:`BoundedQueue` s of
+    ``queue_size`` frames under ``policy``.  Each producer owns a
+    :class:`~spectranova.stream.buffer.SlotRing` of ``queue_size + 2``
+    preallocated outputs (a full queue, the frame being consumed and the
+    one being produced); frames carry leases on those slots, so payloads
+    are written once and never copied between stages.
+
+    With ``max_latency`` (seconds), a stage discards frames that have
+    already been in the pipeline longer than that instead of processing
+    them.  ``sink(frame)`` is called for each final frame; ``frame.data``
+    is released afterwards, so copy anything kept.
+    """
+
+    def __init__(self, source, stages, sink=None, queue_size=4, policy="block", max_latency=None):
+        if policy not in POLICIES:
+            raise SpectralAnalysisError(f"unknown queue policy: {policy!r}")
+        if queue_size < 1:
+            raise SpectralAnalysisError("queue_size must be positive")
+        self.source = source
+        self.stages = list(stages)
+        self.sink = sink
+        self.queue_size = int(queue_size)
+        self.policy = policy
+        self.max_latency = max_latency
+        self._stop = threading.Event()
+        self._errors = []
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.frames_in = 0
+        self.frames_out = 0
+        self.expired = [0] * (len(self.stages) + 1)
+        self.histograms = [LatencyHistogram() for _ in self.stages]
+        self.end_to_end = LatencyHistogram()
+        self.queues = [BoundedQueue(self.queue_size, self.policy, Frame.release)
+                       for _ in range(len(self.stages) + 1)]
+
+    def _make_rings(self):
+        n_slots = self.queue_size + 2
+        shape = (self.source.channels, self.source.block_size)
+        dtype, upstream = np.dtype(self.source.dtype), None
+        rings = [SlotRing(n_slots, shape, dtype)]
+        for stage in self.stages:
+            shape, dtype = stage.setup(shape, dtype, upstream)
+            rings.append(SlotRing(n_slots, shape, dtype))
+            upstream = stage
+        return rings
+
+    def stop(self):
+        """Ask the source to stop; frames already queued still drain."""
+        self._stop.set()
+
+    def run(self, max_frames=None):
+        """Process the source to exhaustion (or ``max_frames``) and return :meth:`stats`."""
+        self._reset_stats()
+        self._stop.clear()
+        self._errors = []
+        rings = self._make_rings()
+        threads = [threading.Thread(target=self._guard, args=(self._stage_loop, i, rings[i + 1]),
+                                    name=f"stream-{stage.name}", daemon=True)
+                   for i, stage in enumerate(self.stages)]
+        threads.append(threading.Thread(target=self._guard, args=(self._sink_loop,),
+                                        name="stream-sink", daemon=True))
+        for thread in threads:
+            thread.start()
+        self._guard(self._source_loop, rings[0], max_frames)
+        for thread in threads:
+            thread.join()
+        if self._errors:
+            raise self._errors[0]
+        return self.stats()
+
+    def _guard(self, loop, *args):
+        try:
+            loop(*args)
+        except BaseException as exc:
+            self._errors.append(exc)
+            self._stop.set()
+            for queue in self.queues:
+                queue.close()
+
+    def _source_loop(self, ring, max_frames):
+        outbox = self.queues[0]
+        try:
+            seq = 0
+            while not self._stop.is_set() and (max_frames is None or seq < max_frames):
+                index = ring.acquire()
+                if not self.source.read_into(ring[index]):
+                    ring.release(index)
+                    break
+                outbox.put(Frame(seq, time.perf_counter_ns(), ring, index))
+                seq += 1
+                self.frames_in = seq
+        finally:
+            outbox.close()
+
+    def _expired(self, frame, now, index):
+        if self.max_latency is not None and now - frame.t_ingest > self.max_latency * 1e9:
+            self.expired[index] += 1
+            frame.release()
+            return True
+        return False
+
+    def _stage_loop(self, index, ring):
+        stage, hist = self.stages[index], self.histograms[index]
+        inbox, outbox = self.queues[index], self.queues[index + 1]
+        try:
+            while True:
+                frame = inbox.get()
+                if frame is None:
+                    break
+                start = time.perf_counter_ns()
+                if self._expired(frame, start, index):
+                    continue
+                slot = ring.acquire()
+                produced = stage.process(frame.data, ring[slot])
+                frame.release()
+                hist.record(time.perf_counter_ns() - start)
+                if produced:
+                    outbox.put(Frame(frame.seq, frame.t_ingest, ring, slot))
+                else:
+                    ring.release(slot)
+        finally:
+            outbox.close()
+
+    def _sink_loop(self):
+        inbox = self.queues[-1]
+        while True:
+            frame = inbox.get()
+            if frame is None:
+                break
+            if self._expired(frame, time.perf_counter_ns(), len(self.stages)):
+                continue
+            try:
+                if self.sink is not None:
+                    self.sink(frame)
+            finally:
+                frame.release()
+            self.end_to_end.record(time.perf_counter_ns() - frame.t_ingest)
+            self.frames_out += 1
+
+    def stats(self):
+        """Return frame counts, drops and latency summaries per stage."""
+        stages = {}
+        for i, stage in enumerate(self.stages):
+            stages[stage.name] = {
+                "processed": self.histograms[i].count,
+                "dropped": self.queues[i].dropped,
+                "expired": self.expired[i],
+                "queue_high_water": self.queues[i].high_water,
+                "latency": self.histograms[i].summary(),
+            }
+        return {
+            "frames_in": self.frames_in,
+            "frames_out": self.frames_out,
+            "dropped": sum(q.dropped for q in self.queues) + sum(self.expired),
+            "stages": stages,
+            "end_to_end": self.end_to_end.summary(),
+        }
@@ -0,0 +1,135 @@
+"""Replayable block sources for the streaming pipeline."""
+
+import os
+import time
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.utils import load_signal
+
+
+class Source:
+    """Producer of fixed-shape ``(channels, block_size)`` blocks.
+
+    Subclasses set :attr:`channels`, :attr:`block_size` and :attr:`dtype`
+    and implement :meth:`read_into`, which fills a preallocated block in
+    place and returns ``False`` once the source is exhausted.
+    """
+
+    channels = 1
+    block_size = 1
+    dtype = np.dtype(np.float64)
+
+    def read_into(self, out):
+        raise NotImplementedError
+
+
+class ArraySource(Source):
+    """Replay a ``(channels, n_samples)`` array (or 1-D signal) block by block.
+
+    With ``realtime=True`` blocks are released no faster than the sample
+    rate ``fs`` would deliver them.  Trailing samples short of a whole
+    block are not replayed.
+    """
+
+    def __init__(self, data, block_size, fs=None, realtime=False):
+        data = np.asarray(data)
+        if data.ndim == 1:
+            data = data[None, :]
+        if data.ndim != 2:
+            raise SpectralAnalysisError("data must be 1-D or (channels, n_samples)")
+        if block_size < 1:
+            raise SpectralAnalysisError("block_size must be positive")
+        if realtime and not fs:
+            raise SpectralAnalysisError("realtime replay needs a sample rate")
+        self.data = data
+        self.channels = data.shape[0]
+        self.block_size = int(block_size)
+        self.dtype = data.dtype if np.issubdtype(data.dtype, np.floating) else np.dtype(np.float64)
+        self.fs = fs
+        self.realtime = realtime
+        self.reset()
+
+    def reset(self):
+        """Rewind to the first block."""
+        self._pos = 0
+        self._start = None
+
+    def read_into(self, out):
+        stop = self._pos + self.block_size
+        if stop > self.data.shape[1]:
+            return False
+        if self.realtime:
+            now = time.perf_counter()
+            if self._start is None:
+                self._start = now
+            due = self._start + self._pos / self.fs
+            if due > now:
+                time.sleep(due - now)
+        out[...] = self.data[:, self._pos:stop]
+        self._pos = stop
+        return True
+
+
+class FileReplaySource(ArraySource):
+    """Replay a recorded signal file.
+
+    ``.npy`` files are memory-mapped and may hold a 1-D signal or a
+    ``(channels, n_samples)`` array; other formats go through
+    :func:`~spectranova.core.utils.load_signal`, whose sample rate (if
+    recorded) overrides ``fs``.
+    """
+
+    def __init__(self, path, block_size, fs=None, realtime=False):
+        path = os.fspath(path)
+        if path.lower().endswith(".npy"):
+            data = np.load(path, mmap_mode="r")
+        else:
+            data, file_fs = load_signal(path)
+            fs = file_fs or fs
+        super().__init__(data, block_size, fs, realtime)
+        self.path = path
+
+
+class SocketSource(Source):
+    """Read blocks from a connected stream socket.
+
+    Each block arrives as ``channels * block_size`` values of ``dtype`` in
+    C order (see :func:`replay_to_socket`) and is received straight into
+    the pipeline's slot without an intermediate buffer.  The source ends
+    when the peer closes the connection on a block boundary.
+    """
+
+    def __init__(self, sock, channels, block_size, dtype="<f4"):
+        if channels < 1 or block_size < 1:
+            raise SpectralAnalysisError("channels and block_size must be positive")
+        self.sock = sock
+        self.channels = int(channels)
+        self.block_size = int(block_size)
+        self.dtype = np.dtype(dtype)
+
+    def read_into(self, out):
+        view = memoryview(out).cast("B")
+        got = 0
+        while got < view.nbytes:
+            n = self.sock.recv_into(view[got:])
+            if n == 0:
+                if got:
+                    raise SpectralAnalysisError("connection closed mid-block")
+                return False
+            got += n
+        return True
+
+
+def replay_to_socket(sock, data, block_size, dtype="<f4"):
+    """Send ``data`` over ``sock`` in the :class:`SocketSource` wire format.
+
+    Returns the number of whole blocks sent.
+    """
+    data = np.atleast_2d(np.asarray(data))
+    n_blocks = data.shape[1] // block_size
+    for i in range(n_blocks):
+        block = data[:, i * block_size:(i + 1) * block_size]
+        sock.sendall(np.ascontiguousarray(block, dtype=dtype).tobytes())
+    return n_blocks
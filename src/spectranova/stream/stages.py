@@ -0,0 +1,164 @@
+"""Processing stages for the streaming pipeline."""
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.utils import normalize_signal
+from spectranova.ml.features import FEATURE_NAMES, features_from_spectrum
+from spectranova.signal.fourier import get_fft_plan
+from spectranova.signal.window import get_window_info
+from spectranova.stream.buffer import RingBuffer
+
+
+class Stage:
+    """One step of a :class:`~spectranova.stream.pipeline.Pipeline`.
+
+    :meth:`setup` receives the upstream block shape and dtype (and the
+    upstream stage, or ``None`` after the source) and returns the shape
+    and dtype of this stage's output.  :meth:`process` then writes each
+    result into a preallocated ``out`` and returns ``False`` when an input
+    produced no output yet.
+    """
+
+    name = "stage"
+
+    def setup(self, in_shape, in_dtype, upstream=None):
+        return in_shape, in_dtype
+
+    def process(self, data, out):
+        raise NotImplementedError
+
+
+class NormalizeStage(Stage):
+    """Scale every channel to [-1, 1].
+
+    By default each block is normalized on its own, as by
+    :func:`~spectranova.core.utils.normalize_signal`.  With ``decay`` in
+    (0, 1] a per-channel running peak is used instead, decayed by that
+    factor per block, so gain does not jump between consecutive blocks.
+    """
+
+    name = "normalize"
+
+    def __init__(self, decay=None):
+        if decay is not None and not 0.0 < decay <= 1.0:
+            raise SpectralAnalysisError("decay must be in (0, 1]")
+        self.decay = decay
+        self._peak = None
+
+    def setup(self, in_shape, in_dtype, upstream=None):
+        self._peak = np.zeros((in_shape[0], 1))
+        dtype = in_dtype if np.issubdtype(in_dtype, np.floating) else np.dtype(np.float64)
+        return in_shape, dtype
+
+    def process(self, data, out):
+        if self.decay is None:
+            normalize_signal(data, out=out)
+            return True
+        peak = self._peak
+        peak *= self.decay
+        np.maximum(peak, np.max(np.abs(data), axis=1, keepdims=True), out=peak)
+        np.divide(data, np.where(peak > 0, peak, 1.0), out=out)
+        return True
+
+
+class SpectrumStage(Stage):
+    """Windowed amplitude spectrum of the newest ``nperseg`` samples per channel.
+
+    Input blocks are appended to a :class:`~spectranova.stream.buffer.RingBuffer`
+    and every block yields one spectrum, so the block size is the STFT hop.
+    Spectra use the padded transform and amplitude scaling of
+    :func:`~spectranova.ml.features.extract_features_batch`.  With
+    ``average`` in (0, 1] the power is exponentially averaged over frames
+    (a running Welch estimate) before the square root.
+    """
+
+    name = "spectrum"
+
+    def __init__(self, fs, window="hann", nperseg=256, average=None):
+        if nperseg < 2:
+            raise SpectralAnalysisError("nperseg must be at least 2")
+        if average is not None and not 0.0 < average <= 1.0:
+            raise SpectralAnalysisError("average must be in (0, 1]")
+        self.fs = fs
+        self.nperseg = int(nperseg)
+        self.average = average
+        self._plan = get_fft_plan(self.nperseg, fs)
+        info = get_window_info(window, self.nperseg)
+        self.window = info.window
+        self._gain = 2.0 / info.sum
+        self.freqs = self._plan.freqs
+        self._ring = None
+        self._power = None
+
+    def setup(self, in_shape, in_dtype, upstream=None):
+        channels = in_shape[0]
+        self._ring = RingBuffer(channels, self.nperseg)
+        self._power = None
+        return (channels, self.freqs.size), np.dtype(np.float64)
+
+    def process(self, data, out):
+        ring = self._ring
+        ring.write(data)
+        if ring.count < self.nperseg:
+            return False
+        spec = self._plan.execute(ring.latest(self.nperseg) * self.window)
+        if self.average is None:
+            np.abs(spec, out=out)
+        else:
+            power = spec.real * spec.real + spec.imag * spec.imag
+            if self._power is None:
+                self._power = power
+            else:
+                self._power += self.average * (power - self._power)
+            np.sqrt(self._power, out=out)
+        out *= self._gain
+        return True
+
+
+class FeatureStage(Stage):
+    """Per-channel :data:`~spectranova.ml.features.FEATURE_NAMES` from spectra.
+
+    Must follow a :class:`SpectrumStage`, whose bins it reuses.
+    """
+
+    name = "features"
+
+    def __init__(self, fs=None):
+        self.fs = fs
+        self.freqs = None
+
+    def setup(self, in_shape, in_dtype, upstream=None):
+        if not isinstance(upstream, SpectrumStage):
+            raise SpectralAnalysisError("FeatureStage must follow a SpectrumStage")
+        self.freqs = upstream.freqs
+        self.fs = upstream.fs if self.fs is None else self.fs
+        return (in_shape[0], len(FEATURE_NAMES)), np.dtype(np.float32)
+
+    def process(self, data, out):
+        out[...] = features_from_spectrum(self.freqs, data, self.fs)
+        return True
+
+
+class AnomalyStage(Stage):
+    """Score each channel's feature row with a fitted detector.
+
+    ``detector`` is a :class:`~spectranova.ml.anomaly.SpectralAnomalyDetector`
+    or anything with a ``score_samples(features)`` method; lower scores
+    are more anomalous.  With ``learn=True`` an online detector such as
+    :class:`~spectranova.ml.anomaly.HalfSpaceTrees` also learns from every
+    frame through its ``score_update``.
+    """
+
+    name = "anomaly"
+
+    def __init__(self, detector, learn=False):
+        self.detector = detector
+        self._score = detector.score_update if learn else detector.score_samples
+
+    def setup(self, in_shape, in_dtype, upstream=None):
+        return (in_shape[0],), np.dtype(np.float64)
+
+    def process(self, data, out):
+        out[...] = self._score(data)
+        return True
@@ -1 +1,12 @@
 """Continuous Wavelet Transform (CWT) module."""
+
+from spectranova._lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, {
+    "compute_cwt": "cwt",
+    "compute_cwt_blocked": "cwt",
+    "make_scales": "cwt",
+    "WAVELETS": "families",
+    "compute_scalogram": "scalogram",
+    "plot_scalogram": "scalogram",
+})
@@ -1,5 +1,215 @@
 """CWT implementation."""
 
-def compute_cwt(signal, wavelet="morlet"):
-    """Compute Continuous Wavelet Transform."""
-    pass
+import numpy as np
+
+from spectranova.core.cache import LRUCache, disk_cached
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.instrument import instrumented
+from spectranova.core.precision import resolve_precision
+from spectranova.signal.fourier import next_fast_len
+from spectranova.wavelet.families import FOURIER_FACTORS, SUPPORT, check_wavelet, wavelet_kernel
+
+# Filter banks keyed by (wavelet, scales, n_fft, fs, signal length, dtype); bounded by total size.
+_BANK_CACHE = LRUCache(maxsize=32, maxbytes=512 * 2**20)
+
+# compute_cwt_blocked: FFT length aimed for per block, and filter coefficients
+# (scales x FFT length) per run of scales; together they bound its working memory.
+_BLOCK_FFT = 2**18
+_CHUNK_ELEMENTS = 2**22
+
+
+def make_scales(n, fs=1.0, wavelet="morlet", num=32):
+    """Log-spaced scales whose Fourier periods span 2/fs to n/(2 fs)."""
+    check_wavelet(wavelet)
+    periods = np.geomspace(2.0 / fs, max(n / (2.0 * fs), 2.0 / fs), int(num))
+    return periods / FOURIER_FACTORS[wavelet]
+
+
+def _build_bank(wavelet, scales, n_fft, fs, n, dtype):
+    # Sampled wavelets cut to their support (and to n samples, all a signal of
+    # length n can reach), so the filters do not depend on the FFT length.
+    margins = _margins(wavelet, scales, fs, n)
+    width = int(margins.max()) - 1
+    if n_fft < 2 * width + 1:
+        raise SpectralAnalysisError(f"n_fft={n_fft} is too short for wavelets spanning {2 * width + 1} samples")
+    lags = np.arange(-width, width + 1)
+    taps = np.conj(wavelet_kernel(wavelet, -lags[None, :] / (scales[:, None] * fs)))
+    taps *= np.sqrt(1.0 / (scales * fs))[:, None]
+    taps[np.abs(lags)[None, :] >= margins[:, None]] = 0.0
+    kernels = np.zeros((scales.size, n_fft), dtype=complex)
+    kernels[:, lags % n_fft] = taps
+    bank = np.fft.fft(kernels, axis=-1).astype(dtype, copy=False)
+    bank.setflags(write=False)
+    return bank
+
+
+def get_filter_bank(wavelet, scales, n_fft, fs=1.0, dtype=np.float64, n=None):
+    """Return the cached ``(n_scales, n_fft)`` Fourier-domain filter bank.
+
+    Each filter is the transform of the sampled wavelet, truncated to its
+    :data:`~spectranova.wavelet.families.SUPPORT` and to ``n`` samples of
+    lag (the signal length, default half of ``n_fft``).  The bank is built
+    in double precision and stored as the complex dtype of ``dtype``'s
+    precision.
+    """
+    scales = np.ascontiguousarray(scales, dtype=float)
+    n = (int(n_fft) + 1) // 2 if n is None else int(n)
+    dtype = resolve_precision(dtype).complex
+    key = (wavelet, scales.tobytes(), int(n_fft), float(fs), n, dtype.str)
+    return _BANK_CACHE.get_or_create(key, lambda: _build_bank(wavelet, scales, int(n_fft), float(fs), n, dtype))
+
+
+def clear_cwt_cache():
+    """Drop every cached filter bank."""
+    _BANK_CACHE.clear()
+
+
+def _resolve_scales(scales, n, fs, wavelet):
+    if scales is None or np.isscalar(scales):
+        return make_scales(n, fs, wavelet, 32 if scales is None else scales)
+    scales = np.asarray(scales, dtype=float)
+    if scales.ndim != 1 or scales.size == 0 or np.any(scales <= 0):
+        raise SpectralAnalysisError("scales must be a non-empty 1-D array of positive values")
+    return scales
+
+
+def _margins(wavelet, scales, fs, n):
+    """Samples of wavelet support per scale, clamped to ``n`` (beyond it all is zero)."""
+    return np.minimum(np.ceil(SUPPORT[wavelet] * np.asarray(scales) * fs), n).astype(np.int64)
+
+
+@instrumented("cwt")
+# Version 1: zero-padded, truncated-kernel coefficients; older entries wrapped around.
+@disk_cached(version=1)
+def compute_cwt(signal, wavelet="morlet", scales=None, fs=1.0, precision=None):
+    """Compute Continuous Wavelet Transform.
+
+    All scales are evaluated in one frequency-domain pass: a single forward
+    FFT of the signal, zero-padded by the support of the widest wavelet
+    (at most ``n`` samples, the longest lag within the signal) so the
+    convolution does not wrap around, a product with the cached filter
+    bank and one batched inverse FFT.  The signal is thus zero-extended at
+    its ends, and the coefficients match :func:`compute_cwt_blocked`.
+    ``scales`` is an array of scales in seconds or a number of log-spaced
+    scales (default 32).  The signal, filter bank and coefficients use
+    ``precision`` (complex64 coefficients for ``"single"``).
+
+    Returns ``(freqs, coeffs)`` with ``coeffs`` of shape ``(n_scales, n)``.
+    """
+    check_wavelet(wavelet)
+    precision = resolve_precision(precision)
+    x = np.asarray(signal)
+    x = x.astype(precision.complex if np.iscomplexobj(x) else precision.real, copy=False)
+    if x.ndim != 1 or x.size == 0:
+        raise SpectralAnalysisError("signal must be a non-empty 1-D array")
+    n = x.size
+    scales = _resolve_scales(scales, n, fs, wavelet)
+    n_fft = next_fast_len(n + int(_margins(wavelet, scales, fs, n).max()))
+    bank = get_filter_bank(wavelet, scales, n_fft, fs, precision.real, n=n)
+    coeffs = np.fft.ifft(np.fft.fft(x, n=n_fft) * bank, axis=-1)[:, :n]
+    freqs = 1.0 / (FOURIER_FACTORS[wavelet] * scales)
+    return freqs, coeffs
+
+
+def _open_output(out, shape, dtype):
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if isinstance(out, (str, bytes)) or hasattr(out, "__fspath__"):
+        return np.lib.format.open_memmap(out, mode="w+", dtype=dtype, shape=shape)
+    if tuple(out.shape) != shape:
+        raise SpectralAnalysisError(f"out has shape {tuple(out.shape)}, expected {shape}")
+    return out
+
+
+def _block_layout(margin, n, block_size, decimate):
+    """Return ``(block, n_fft)`` for scales whose support spans ``margin`` samples."""
+    if block_size is None:
+        block_size = max(_BLOCK_FFT - 2 * margin, 2 * margin)
+    block = min(int(block_size), n)
+    block = -(-block // decimate) * decimate
+    # Data within ``margin`` of the block plus room for the kernel, so nothing wraps.
+    return block, next_fast_len(min(block + margin, n) + margin)
+
+
+def _scale_chunks(margins, n, block_size, decimate):
+    """Split the scales into runs ``(start, stop, margin, block, n_fft)``.
+
+    A run holds consecutive scales whose margins are within a factor of
+    two, and at most :data:`_CHUNK_ELEMENTS` filter coefficients, so only
+    the widest scales pay for the long support.
+    """
+    chunks, start = [], 0
+    while start < margins.size:
+        stop = start + 1
+        while stop < margins.size:
+            group = margins[start:stop + 1]
+            _, n_fft = _block_layout(int(group.max()), n, block_size, decimate)
+            if group.max() > 2 * group.min() or (stop + 1 - start) * n_fft > _CHUNK_ELEMENTS:
+                break
+            stop += 1
+        margin = int(margins[start:stop].max())
+        chunks.append((start, stop, margin) + _block_layout(margin, n, block_size, decimate))
+        start = stop
+    return chunks
+
+
+@instrumented("cwt_blocked")
+def compute_cwt_blocked(signal, wavelet="morlet", scales=None, fs=1.0, out=None,
+                        power=False, dtype=None, decimate=1, block_size=None):
+    """Out-of-core CWT for signals too large for an ``(n_scales, n)`` matrix in RAM.
+
+    The signal (any sliceable array, e.g. a ``numpy.memmap``) is processed
+    in blocks, each padded on both sides by the wavelet support so that
+    block edges are seamless; the signal itself is zero-extended at its
+    ends, as in :func:`compute_cwt`.  Scales are handled in runs of similar
+    support, each with its own padding and block length, so only the
+    widest scales pay for the long support and working memory stays at a
+    few times 2**22 complex values, or at one FFT row of about twice the
+    signal for scales as long as the signal itself.  The signal is read
+    once per run.  ``block_size`` overrides the block length of
+    every run.  Results are written into ``out``: an existing array-like
+    of the right shape (memmap, HDF5 or Zarr dataset) or a path, which is
+    created as a ``.npy`` memmap.
+
+    With ``power=True`` only ``|W|^2`` is stored.  ``dtype`` selects the
+    stored precision (``np.float32`` gives complex64 coefficients or
+    float32 power, and then the blocks are also computed in single
+    precision) and ``decimate`` keeps every k-th time sample.  Complex
+    signals are transformed as such.
+
+    Returns ``(freqs, out)`` with ``out`` of shape ``(n_scales, ceil(n / decimate))``.
+    """
+    check_wavelet(wavelet)
+    n = len(signal)
+    if n == 0:
+        raise SpectralAnalysisError("signal must be non-empty")
+    decimate = int(decimate)
+    if decimate < 1:
+        raise SpectralAnalysisError("decimate must be a positive integer")
+    scales = _resolve_scales(scales, n, fs, wavelet)
+    if power:
+        dtype = np.dtype(dtype or np.float64)
+    else:
+        dtype = np.result_type(dtype or np.complex128, np.complex64)
+    precision = resolve_precision(np.finfo(dtype).dtype)
+    result = _open_output(out, (scales.size, -(-n // decimate)), dtype)
+
+    segment_dtype = precision.complex if np.iscomplexobj(signal) else precision.real
+    for first, last, margin, block, n_fft in _scale_chunks(_margins(wavelet, scales, fs, n), n,
+                                                           block_size, decimate):
+        # Built per run rather than cached: out-of-core banks are large and used once.
+        bank = _build_bank(wavelet, scales[first:last], n_fft, fs, n, precision.complex)
+        segment = np.zeros(n_fft, dtype=segment_dtype)
+        for start in range(0, n, block):
+            stop = min(start + block, n)
+            lo, hi = max(start - margin, 0), min(stop + margin, n)
+            segment[:hi - lo] = signal[lo:hi]
+            segment[hi - lo:] = 0
+            coeffs = np.fft.ifft(np.fft.fft(segment) * bank, axis=-1)
+            coeffs = coeffs[:, start - lo:stop - lo:decimate]
+            if power:
+                coeffs = coeffs.real ** 2 + coeffs.imag ** 2
+            result[first:last, start // decimate:start // decimate + coeffs.shape[1]] = coeffs
+    if hasattr(result, "flush"):
+        result.flush()
+    return 1.0 / (FOURIER_FACTORS[wavelet] * scales), result
@@ -1,3 +1,58 @@
-"""Wavelet families definitions."""
+"""Wavelet families definitions.
+
+Each family is described by its time-domain mother wavelet (Torrence &
+Compo, 1998), its Fourier period per unit scale and the support beyond
+which it is negligible: the CWT samples the wavelet over that support and
+convolves with it by FFT.
+"""
+
+import math
+
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
 
 WAVELETS = ("morlet", "mexh", "paul")
+
+MORLET_OMEGA0 = 6.0
+PAUL_ORDER = 4
+MEXH_ORDER = 2
+
+# Ratio between the equivalent Fourier period and the wavelet scale.
+FOURIER_FACTORS = {
+    "morlet": 4.0 * np.pi / (MORLET_OMEGA0 + np.sqrt(2.0 + MORLET_OMEGA0 ** 2)),
+    "mexh": 2.0 * np.pi / np.sqrt(MEXH_ORDER + 0.5),
+    "paul": 4.0 * np.pi / (2 * PAUL_ORDER + 1),
+}
+
+# Half-width in scale units beyond which |psi(t)| stays below 1e-6 of its
+# peak; sampled wavelets are truncated there, and blocked transforms pad by it.
+SUPPORT = {
+    "morlet": 5.3,
+    "mexh": 6.0,
+    "paul": 16.0,
+}
+
+
+def check_wavelet(wavelet):
+    """Raise unless ``wavelet`` is one of :data:`WAVELETS`."""
+    if wavelet not in WAVELETS:
+        raise SpectralAnalysisError(f"unknown wavelet: {wavelet!r}, expected one of {WAVELETS}")
+
+
+def wavelet_kernel(wavelet, eta):
+    """Return ``wavelet`` in the time domain at non-dimensional times ``eta = t / s``.
+
+    The complex mother wavelets of Torrence & Compo (1998, table 1);
+    multiply by ``sqrt(dt / s)`` for unit energy.
+    """
+    check_wavelet(wavelet)
+    eta = np.asarray(eta, dtype=float)
+    if wavelet == "morlet":
+        return np.pi ** -0.25 * np.exp(1j * MORLET_OMEGA0 * eta - 0.5 * eta ** 2)
+    if wavelet == "paul":
+        m = PAUL_ORDER
+        norm = 2.0 ** m * 1j ** m * math.factorial(m) / np.sqrt(np.pi * math.factorial(2 * m))
+        return norm * (1.0 - 1j * eta) ** -(m + 1)
+    norm = 1.0 / np.sqrt(math.gamma(MEXH_ORDER + 0.5))
+    return (norm * (1.0 - eta ** 2) * np.exp(-0.5 * eta ** 2)).astype(complex)
@@ -1,5 +1,53 @@
 """Scalogram computation and visualization."""
 
-def plot_scalogram(cwt_matrix):
-    """Plot scalogram from CWT matrix."""
-    pass
+import numpy as np
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.wavelet.cwt import compute_cwt_blocked
+
+
+def compute_scalogram(signal, wavelet="morlet", scales=None, fs=1.0, out=None,
+                      dtype=None, decimate=1, block_size=None):
+    """Compute the wavelet power spectrum ``|W|^2`` block by block.
+
+    Only the power is materialised, optionally straight into a memmap or
+    on-disk array given as ``out``; see :func:`compute_cwt_blocked`.
+    Returns ``(freqs, power)``.
+    """
+    return compute_cwt_blocked(signal, wavelet, scales, fs, out=out, power=True,
+                               dtype=dtype, decimate=decimate, block_size=block_size)
+
+
+def plot_scalogram(cwt_matrix, freqs=None, times=None, backend="plotly", log_power=True):
+    """Plot scalogram from CWT matrix.
+
+    ``cwt_matrix`` holds complex coefficients or real power, shaped
+    ``(n_scales, n_times)``.  The plotting library is imported only here:
+    ``backend="plotly"`` returns a ``plotly.graph_objects.Figure`` and
+    ``backend="matplotlib"`` a ``matplotlib.figure.Figure``.
+    """
+    matrix = np.asarray(cwt_matrix)
+    power = np.abs(matrix) ** 2 if np.iscomplexobj(matrix) else matrix
+    if log_power:
+        power = 10.0 * np.log10(power + np.finfo(float).tiny)
+    y = np.arange(power.shape[0]) if freqs is None else np.asarray(freqs)
+    x = np.arange(power.shape[1]) if times is None else np.asarray(times)
+    if backend == "plotly":
+        import plotly.graph_objects as go
+
+        fig = go.Figure(go.Heatmap(z=power, x=x, y=y, colorscale="Viridis"))
+        fig.update_layout(xaxis_title="Time", yaxis_title="Frequency", yaxis_type="log" if freqs is not None else None)
+        return fig
+    if backend == "matplotlib":
+        from matplotlib.figure import Figure
+
+        fig = Figure()
+        ax = fig.add_subplot()
+        mesh = ax.pcolormesh(x, y, power, shading="auto")
+        if freqs is not None:
+            ax.set_yscale("log")
+        ax.set_xlabel("Time")
+        ax.set_ylabel("Frequency")
+        fig.colorbar(mesh, ax=ax, label="Power (dB)" if log_power else "Power")
+        return fig
+    raise SpectralAnalysisError(f"unknown backend: {backend!r}")
@@ -0,0 +1,42 @@
+"""Tests for the benchmark suite's regression gate."""
+
+import importlib.util
+import json
+import os
+
+import pytest
+
+PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                    "benchmarks", "bench_suite.py")
+
+
+@pytest.fixture(scope="module")
+def bench_suite():
+    spec = importlib.util.spec_from_file_location("bench_suite", PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def report(**seconds):
+    return {"results": {key: {"min": value, "median": 2 * value} for key, value in seconds.items()}}
+
+
+def test_compare_flags_only_shared_cases_over_threshold(bench_suite, tmp_path, capsys):
+    base = report(steady=1.0, slower=1.0, edge=1.0, faster=1.0, removed=1.0, zero=0.0)
+    new = report(steady=1.05, slower=1.2, edge=1.1, faster=0.5, added=1.0, zero=1e-6)
+    rows, regressions = bench_suite.compare_results(base, new, threshold=0.10)
+    assert [row[0] for row in rows] == ["edge", "faster", "slower", "steady", "zero"]
+    assert [row[0] for row in regressions] == ["slower", "zero"]
+    assert dict((row[0], row[3]) for row in rows)["faster"] == 0.5
+    assert [row[0] for row in bench_suite.compare_results(base, new, threshold=0.3, stat="median")[1]] == ["zero"]
+
+    paths = []
+    for name, data in (("base.json", base), ("new.json", new)):
+        paths.append(str(tmp_path / name))
+        with open(paths[-1], "w") as fh:
+            json.dump(data, fh)
+    assert bench_suite.main(["compare", *paths, "--threshold", "0.5"]) == 1
+    assert bench_suite.main(["compare", paths[0], paths[0]]) == 0
+    out = capsys.readouterr().out
+    assert "added" in out and "only in current" in out and "only in baseline" in out
@@ -0,0 +1,95 @@
+"""Tests for in-memory caches."""
+
+import os
+
+import numpy as np
+import pytest
+
+import spectranova
+from spectranova.core.cache import LRUCache, ResultCache, disk_cached, set_result_cache
+from spectranova.ml.features import extract_features
+from spectranova.signal.fourier import compute_fft
+
+
+def test_lru_cache_evicts_least_recent():
+    cache = LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert "a" in cache and "c" in cache and "b" not in cache
+
+
+def test_lru_cache_byte_budget():
+    cache = LRUCache(maxsize=None, maxbytes=100)
+    cache.put("a", np.zeros(8))
+    cache.put("b", np.zeros(8))
+    assert "a" not in cache and cache.nbytes == 64
+
+
+def test_get_or_create_counts_hits():
+    cache = LRUCache()
+    calls = []
+    for _ in range(3):
+        cache.get_or_create("k", lambda: calls.append(1) or len(calls))
+    assert calls == [1]
+    assert cache.info()["hits"] == 2
+
+
+def test_result_cache_round_trip(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    x = np.random.default_rng(0).standard_normal(256)
+    freqs, spectrum = compute_fft(x, 100.0, cache=cache)
+    hit_freqs, hit_spectrum = compute_fft(x, 100.0, cache=cache)
+    assert isinstance(hit_spectrum, np.memmap) and not hit_spectrum.flags.writeable
+    np.testing.assert_array_equal(hit_spectrum, spectrum)
+    np.testing.assert_array_equal(hit_freqs, freqs)
+    assert len(cache.entries()) == 1
+    compute_fft(x, 200.0, cache=cache)
+    compute_fft(x + 1.0, 100.0, cache=cache)
+    assert len(cache.entries()) == 3
+
+
+def test_result_cache_default_and_dict_results(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    x = np.sin(np.arange(512) * 0.2)
+    set_result_cache(cache)
+    try:
+        features = extract_features(x, 10.0)
+        assert extract_features(x, 10.0) == features
+        assert extract_features(x, 10.0, cache=False) == pytest.approx(features)
+    finally:
+        set_result_cache(None)
+    assert len(cache.entries()) == 1
+
+
+def test_result_cache_misses_after_version_bump(tmp_path, monkeypatch):
+    cache = ResultCache(str(tmp_path))
+    calls = []
+
+    @disk_cached
+    def square(x):
+        calls.append(x)
+        return x * x
+
+    for _ in range(2):
+        assert square(3, cache=cache) == 9
+    assert len(calls) == 1
+    monkeypatch.setattr(spectranova, "__version__", spectranova.__version__ + ".post1")
+    square(3, cache=cache)
+    square.cache_version += 1
+    square(3, cache=cache)
+    assert len(calls) == 3 and len(cache.entries()) == 3
+
+
+def test_result_cache_evicts_least_recently_used(tmp_path):
+    cache = ResultCache(str(tmp_path), check_every=0)
+    keys = [cache.make_key("f", {"i": i}) for i in range(3)]
+    for i, key in enumerate(keys):
+        cache.put(key, np.zeros(1000))
+        os.utime(cache._path(key), (i, i))
+    cache.get(keys[0])
+    size = cache.entries()[0][1]
+    cache.evict(max_bytes=2 * size)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None and cache.get(keys[2]) is not None
@@ -0,0 +1,83 @@
+"""Tests for the opt-in stage instrumentation."""
+
+import json
+import urllib.request
+
+import numpy as np
+import pytest
+
+from spectranova.core import instrument
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.ml.anomaly import HalfSpaceTrees
+from spectranova.ml.features import extract_features_batch
+from spectranova.signal.welch import compute_welch
+
+
+@pytest.fixture
+def recording():
+    instrument.reset()
+    yield instrument
+    instrument.disable()
+    instrument.reset()
+
+
+def test_disabled_records_nothing_and_enabled_counts_stages(recording):
+    x = np.random.default_rng(0).standard_normal((16, 1024))
+    compute_welch(x, 1000.0, cache=False)
+    assert recording.snapshot()["stages"] == {}
+
+    recording.enable()
+    compute_welch(x, 1000.0, cache=False)
+    compute_welch(x, 1000.0, cache=False)
+    features, _ = extract_features_batch(x, 1000.0)
+    detector = HalfSpaceTrees(n_trees=4, depth=3, window=4, random_state=0).fit(features)
+    detector.predict(features)
+    with pytest.raises(SpectralAnalysisError):
+        compute_welch(x, 1000.0, nperseg=0, cache=False)
+
+    stages = recording.snapshot()["stages"]
+    welch = stages["welch"]
+    assert welch["calls"] == 3 and welch["errors"] == 1 and welch["bytes"] == 3 * x.nbytes
+    assert sum(welch["wall_seconds"]["counts"]) == 3 and welch["wall_seconds"]["sum"] > 0
+    assert welch["peak_alloc"] is None
+    # Nested stages are counted as well: features_batch runs the FFT.
+    assert stages["fft"]["calls"] == 1 and stages["features_batch"]["calls"] == 1
+    assert stages["half_space_trees.predict"]["calls"] == 1
+    assert stages["half_space_trees.score_samples"]["calls"] == 1
+
+
+def test_nested_peak_allocations(recording):
+    recording.enable(memory=True)
+    with recording.measure("outer"):
+        big = np.ones(2 ** 20)
+        del big
+        with recording.measure("inner"):
+            small = np.ones(2 ** 16)
+            del small
+    stages = recording.snapshot()["stages"]
+    assert 2 ** 16 * 8 <= stages["inner"]["peak_alloc"] < 2 ** 20 * 8
+    assert stages["outer"]["peak_alloc"] >= 2 ** 20 * 8
+
+
+def test_prometheus_json_file_and_http_export(recording, tmp_path):
+    recording.enable()
+    compute_welch(np.zeros(1024), 100.0, cache=False)
+    text = recording.to_prometheus()
+    assert 'spectranova_calls_total{stage="welch"} 1' in text
+    assert 'spectranova_wall_seconds_bucket{stage="welch",le="+Inf"} 1' in text
+    assert "spectranova_peak_alloc_bytes{" not in text
+
+    path = recording.write_metrics(tmp_path / "metrics.json")
+    assert json.loads(path.read_text())["stages"]["welch"]["calls"] == 1
+    assert recording.write_metrics(tmp_path / "metrics.prom").read_text() == text
+
+    server = recording.serve(port=0)
+    try:
+        base = "http://%s:%d" % server.server_address[:2]
+        with urllib.request.urlopen(base + "/metrics") as response:
+            assert response.read().decode() == text
+        with urllib.request.urlopen(base + "/metrics.json") as response:
+            assert json.load(response)["stages"]["welch"]["bytes"] == 1024 * 8
+    finally:
+        server.shutdown()
+        server.server_close()
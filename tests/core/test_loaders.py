@@ -0,0 +1,113 @@
+"""Tests for memory-mapped and chunked signal loaders."""
+
+import struct
+
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.loaders import iter_blocks, iter_csv, open_fits, open_raw, open_signal, open_wav
+
+
+def _write_wav(path, payload, tag, channels, bits, rate=8000):
+    align = channels * bits // 8
+    fmt = struct.pack("<HHIIHH", tag, channels, rate, rate * align, align, bits)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt
+    body += b"LIST" + struct.pack("<I", 3) + b"abc\0"  # odd-sized chunk to skip
+    body += b"data" + struct.pack("<I", len(payload)) + payload
+    path.write_bytes(b"RIFF" + struct.pack("<I", len(body)) + body)
+
+
+def _write_fits(path, hdus):
+    out = b""
+    for cards, data in hdus:
+        header = "".join(f"{key:<8}= {value:>20}".ljust(80) for key, value in cards) + "END".ljust(80)
+        header += " " * (-len(header) % 2880)
+        payload = data.tobytes()
+        out += header.encode() + payload + b"\0" * (-len(payload) % 2880)
+    path.write_bytes(out)
+
+
+def test_wav_encodings_are_mapped_and_scaled(tmp_path):
+    rng = np.random.default_rng(0)
+    pcm = rng.integers(-2 ** 23, 2 ** 23, (100, 2)).astype(np.int32)
+    expected = pcm / 2.0 ** 23
+    packed = pcm.astype("<i4").view(np.uint8).reshape(100, 2, 4)[..., :3].tobytes()
+    _write_wav(tmp_path / "a24.wav", packed, 1, 2, 24)
+    _write_wav(tmp_path / "a16.wav", (pcm >> 8).astype("<i2").tobytes(), 1, 2, 16)
+    _write_wav(tmp_path / "a8.wav", ((pcm >> 16) + 128).astype(np.uint8).tobytes(), 1, 2, 8)
+    _write_wav(tmp_path / "af.wav", expected.astype("<f4").tobytes(), 3, 2, 32)
+
+    for name, tol in (("a24.wav", 0), ("a16.wav", 2 ** -15), ("a8.wav", 2 ** -7), ("af.wav", 1e-7)):
+        with open_wav(tmp_path / name) as wav:
+            assert (wav.fs, wav.channels, wav.n_samples) == (8000.0, 2, 100)
+            np.testing.assert_allclose(wav.read(), expected.T, atol=tol)
+            np.testing.assert_allclose(wav.read(10, 20, channel=1), expected[10:20, 1], atol=tol)
+    with open_wav(tmp_path / "a16.wav") as wav:
+        raw = wav.read(channel=0, raw=True)
+        assert np.shares_memory(raw, wav.data)
+        assert raw.dtype == np.int16
+        assert wav.read(precision="single").dtype == np.float32
+    (tmp_path / "bad.wav").write_bytes(b"RIFF\0\0\0\0JUNK")
+    with pytest.raises(SpectralAnalysisError):
+        open_wav(tmp_path / "bad.wav")
+
+
+@pytest.mark.parametrize("block_size,hop,pad", [(64, None, False), (64, 24, False), (50, 80, True), (1000, None, True)])
+def test_blocks_agree_across_formats(tmp_path, block_size, hop, pad):
+    rng = np.random.default_rng(1)
+    x = rng.standard_normal((3, 517))
+    x.T.astype("<f4").tofile(tmp_path / "s.raw")
+    np.save(tmp_path / "s.npy", x)
+    np.savetxt(tmp_path / "s.csv", x.T, delimiter=",", header="a,b,c", comments="", fmt="%.17g")
+
+    starts = range(0, 517, hop or block_size)
+    expected = []
+    for start in starts:
+        block = x[:, start:start + block_size]
+        expected.append(np.pad(block, ((0, 0), (0, block_size - block.shape[1]))) if pad else block)
+        if start + block_size >= 517:
+            break
+    from_npy = list(iter_blocks(tmp_path / "s.npy", block_size, hop, pad=pad))
+    from_raw = list(iter_blocks(tmp_path / "s.raw", block_size, hop, pad=pad, dtype="<f4", channels=3))
+    from_csv = list(iter_blocks(tmp_path / "s.csv", block_size, hop, pad=pad, chunk_rows=37))
+    for blocks, tol in ((from_npy, 0), (from_raw, 1e-6), (from_csv, 0)):
+        assert len(blocks) == len(expected)
+        for got, want in zip(blocks, expected):
+            np.testing.assert_allclose(got, want, atol=tol * np.abs(want).max())
+    single = list(iter_blocks(tmp_path / "s.csv", block_size, hop, channel=2, precision="single", chunk_rows=37))
+    assert single[0].dtype == np.float32 and single[0].shape == (min(block_size, 517),)
+
+    planar = open_raw(tmp_path / "s.raw", "<f4", channels=3, layout="planar")
+    assert planar.channels == 3 and planar.n_samples == 517
+
+
+def test_csv_chunks_header_and_comments(tmp_path):
+    path = tmp_path / "spec.csv"
+    path.write_text("# instrument: test\nwavelength,flux\n" + "".join(
+        f"{i},{i * 0.5}\n" + ("# calibration\n" if i == 4 else "") for i in range(10)))
+    chunks = list(iter_csv(path, columns=["flux"], chunk_rows=3))
+    assert [c.shape for c in chunks] == [(3, 1), (3, 1), (3, 1), (1, 1)]
+    np.testing.assert_array_equal(np.concatenate(chunks)[:, 0], np.arange(10) * 0.5)
+    with pytest.raises(SpectralAnalysisError):
+        list(iter_csv(path, columns=["missing"]))
+
+
+def test_fits_images_are_mapped_with_scaling(tmp_path):
+    image = np.arange(24, dtype=">i2").reshape(2, 12)
+    spectrum = np.linspace(0, 1, 7).astype(">f8")
+    _write_fits(tmp_path / "s.fits", [
+        ([("SIMPLE", "T"), ("BITPIX", 16), ("NAXIS", 2), ("NAXIS1", 12), ("NAXIS2", 2),
+          ("BSCALE", "0.5"), ("BZERO", "1.0D0"), ("OBJECT", "'M31 ''core'''")], image),
+        ([("XTENSION", "'IMAGE   '"), ("BITPIX", -64), ("NAXIS", 1), ("NAXIS1", 7),
+          ("EXTNAME", "'FLUX'")], spectrum),
+    ])
+    with open_signal(tmp_path / "s.fits") as fits:
+        assert (fits.channels, fits.n_samples) == (2, 12)
+        assert fits.header["OBJECT"] == "M31 'core'"
+        np.testing.assert_array_equal(fits.read(), 1.0 + 0.5 * image)
+        assert fits.read(raw=True).dtype == np.dtype(">i2")
+    with open_fits(tmp_path / "s.fits", hdu="FLUX") as fits:
+        np.testing.assert_array_equal(fits.read(channel=0), spectrum)
+    blocks = list(iter_blocks(tmp_path / "s.fits", 5, hdu=1, channel=0))
+    np.testing.assert_array_equal(np.concatenate(blocks), spectrum)
@@ -0,0 +1,64 @@
+"""Tests for the batch runner."""
+
+import csv
+import os
+
+import numpy as np
+
+from spectranova.core.parallel import BatchRunner, iter_files
+
+
+def _row(path):
+    name = os.path.basename(path)
+    if name.startswith("bad"):
+        raise ValueError("corrupt file")
+    if name.startswith("crash"):
+        os._exit(1)
+    return np.load(path)[:3]
+
+
+def _make_files(root, names):
+    root = root / "in"
+    root.mkdir()
+    for name in names:
+        np.save(root / name, np.full(4, float(len(name))))
+    return str(root)
+
+
+def _read(path):
+    with open(path, newline="") as fh:
+        rows = list(csv.reader(fh))
+    return rows[0], {os.path.basename(r[0]): [float(v) for v in r[1:]] for r in rows[1:]}
+
+
+def test_iter_files(tmp_path):
+    (tmp_path / "b").mkdir()
+    for name in ("a.npy", "b/c.wav", "b/skip.json", "d.csv"):
+        (tmp_path / name).write_bytes(b"")
+    found = [os.path.relpath(p, tmp_path) for p in iter_files(str(tmp_path))]
+    assert found == ["a.npy", "d.csv", os.path.join("b", "c.wav")]
+
+
+def test_batch_runner_isolates_failures(tmp_path):
+    root = _make_files(tmp_path, ["a.npy", "bad.npy", "crash.npy", "long_name.npy"])
+    out = str(tmp_path / "features.csv")
+    runner = BatchRunner(_row, ["x", "y", "z"], workers=2, chunksize=2)
+    stats = runner.run(iter_files(root), out)
+    header, rows = _read(out)
+    assert header == ["path", "x", "y", "z"]
+    assert rows == {"a.npy": [5.0] * 3, "long_name.npy": [13.0] * 3}
+    assert stats["processed"] == 2 and stats["failed"] == 2
+
+
+def test_batch_runner_resume(tmp_path):
+    root = _make_files(tmp_path, ["a.npy", "b.npy", "c.npy"])
+    out = str(tmp_path / "features.csv")
+    runner = BatchRunner(_row, ["x", "y", "z"], workers=1, chunksize=1)
+    paths = list(iter_files(root))
+    runner.run(paths[:2], out)
+    with open(out, "a") as fh:
+        fh.write("partial row from an interrupted run")
+    stats = runner.run(paths, out, resume=True)
+    assert stats["skipped"] == 2 and stats["processed"] == 1
+    _, rows = _read(out)
+    assert sorted(rows) == ["a.npy", "b.npy", "c.npy"]
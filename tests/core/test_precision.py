@@ -0,0 +1,89 @@
+"""Tests for the numeric precision policy."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from spectranova.core.cache import ResultCache
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.precision import DOUBLE, SINGLE, get_precision, resolve_precision, use_precision
+from spectranova.ml.features import extract_features, extract_features_batch
+from spectranova.signal.fourier import compute_fft
+from spectranova.signal.spectrogram import compute_spectrogram
+from spectranova.signal.welch import compute_welch
+from spectranova.wavelet.cwt import compute_cwt
+
+FS = 8000.0
+
+
+@pytest.fixture(scope="module")
+def sensor():
+    # 16-bit samples, as delivered by the acquisition hardware.
+    rng = np.random.default_rng(0)
+    t = np.arange(4096) / FS
+    x = 8000 * np.sin(2 * np.pi * 440 * t) + 2000 * np.sin(2 * np.pi * 1700 * t) + 500 * rng.standard_normal(t.size)
+    return np.stack([x, x[::-1]]).astype(np.int16)
+
+
+def rel_error(single, double):
+    return np.max(np.abs(single - double)) / np.max(np.abs(double))
+
+
+def test_policy_resolution_and_context():
+    assert resolve_precision("float32") is SINGLE and resolve_precision(np.complex128) is DOUBLE
+    assert get_precision() is DOUBLE
+    with use_precision("single"):
+        assert get_precision() is SINGLE
+        with use_precision("double"):
+            assert get_precision() is DOUBLE
+        assert get_precision() is SINGLE
+    assert get_precision() is DOUBLE
+    with pytest.raises(SpectralAnalysisError):
+        resolve_precision("half")
+
+    async def task(name):
+        with use_precision(name):
+            await asyncio.sleep(0)
+            return get_precision().name
+
+    async def both():
+        return await asyncio.gather(task("single"), task("double"))
+
+    assert asyncio.run(both()) == ["single", "double"]
+
+
+@pytest.mark.parametrize("name, func, index, tol", [
+    ("fft", lambda x, **kw: compute_fft(x, FS, **kw), 1, 1e-6),
+    ("welch", lambda x, **kw: compute_welch(x, FS, **kw), 1, 1e-5),
+    ("spectrogram", lambda x, **kw: compute_spectrogram(x[0], FS, **kw), 2, 1e-5),
+    ("cwt", lambda x, **kw: compute_cwt(x[0], scales=24, fs=FS, **kw), 1, 1e-5),
+])
+def test_single_precision_matches_double(sensor, name, func, index, tol):
+    double = func(sensor)[index]
+    single = func(sensor, precision="single")[index]
+    assert single.dtype in (np.float32, np.complex64), name
+    assert double.dtype in (np.float64, np.complex128), name
+    assert rel_error(single, double) < tol
+    with use_precision("single"):
+        assert func(sensor)[index].dtype == single.dtype
+
+
+def test_features_in_single_precision(sensor):
+    double, _ = extract_features_batch(sensor, FS)
+    single, _ = extract_features_batch(sensor, FS, precision="single")
+    scale = np.abs(double).max(axis=0) + 1e-12
+    assert np.max(np.abs(single - double) / scale) < 1e-4
+    with use_precision("single"):
+        features = extract_features(sensor[0], FS)
+    assert features["peak_freq_1"] == pytest.approx(440.0, abs=FS / 4096)
+
+
+def test_disk_cache_separates_precisions(tmp_path, sensor):
+    cache = ResultCache(tmp_path)
+    double = compute_welch(sensor[0], FS, cache=cache)[1]
+    with use_precision("single"):
+        single = compute_welch(sensor[0], FS, cache=cache)[1]
+    assert single.dtype == np.float32 and double.dtype == np.float64
+    assert compute_welch(sensor[0], FS, precision="float32", cache=cache)[1].dtype == np.float32
+    assert len(cache.entries()) == 2
@@ -1,4 +1,94 @@
 """Tests for utility functions."""
 
+import tracemalloc
+import wave
+
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.utils import (apply_window, demean, detrend, load_signal, minmax_scale,
+                                    normalize_signal, preprocess, zscore)
+from spectranova.signal.window import get_window_info
+
+
 def test_normalize_signal():
-    pass
+    x = np.array([[0.5, -2.0, 1.0], [0.0, 0.0, 0.0]])
+    np.testing.assert_array_equal(normalize_signal(x), [[0.25, -1.0, 0.5], [0.0, 0.0, 0.0]])
+    out = np.empty_like(x)
+    assert normalize_signal(x, out=out) is out
+
+
+def test_load_signal_formats(tmp_path):
+    data = np.array([0.5, -0.25, 0.125, 0.0])
+    np.save(tmp_path / "s.npy", data)
+    (tmp_path / "s.csv").write_text("value,other\n" + "\n".join(f"{v},1" for v in data))
+    with wave.open(str(tmp_path / "s.wav"), "wb") as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(8000)
+        wf.writeframes((data * 32768).astype("<i2").tobytes())
+
+    for name in ("s.npy", "s.csv"):
+        signal, fs = load_signal(str(tmp_path / name))
+        np.testing.assert_array_equal(signal, data)
+        assert fs is None
+    signal, fs = load_signal(str(tmp_path / "s.wav"))
+    np.testing.assert_array_equal(signal, data)
+    assert fs == 8000.0
+
+
+def test_normalize_signal_in_place_and_integer_input():
+    x = np.array([[3, -6, 0], [-32768, 2, 1]], dtype=np.int16)
+    out = np.empty(x.shape, dtype=np.float32)
+    normalize_signal(x, out=out)
+    np.testing.assert_allclose(out, [[0.5, -1.0, 0.0], [-1.0, 2 / 32768, 1 / 32768]])
+    y = np.array([[0.0, 2.0, -4.0]], dtype=np.float32)
+    assert normalize_signal(y, out=y) is y and y.dtype == np.float32
+    np.testing.assert_array_equal(y, [[0.0, 0.5, -1.0]])
+    assert normalize_signal(np.empty((2, 0))).shape == (2, 0)
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.float32])
+def test_preprocessing_kernels_match_reference(dtype):
+    rng = np.random.default_rng(0)
+    t = np.arange(300)
+    x = (rng.standard_normal((5, 300)) + 0.01 * t + 1e-5 * t ** 2 + 4.0).astype(dtype)
+    tol = 1e-4 if dtype == np.float32 else 1e-10
+    for order in (0, 1, 2):
+        trend = np.stack([np.polyval(np.polyfit(t, row, order), t) for row in x.astype(float)])
+        np.testing.assert_allclose(detrend(x, order), x - trend, atol=tol * 10)
+    expected = {
+        demean: x - x.mean(axis=1, keepdims=True),
+        zscore: (x - x.mean(axis=1, keepdims=True)) / x.std(axis=1, keepdims=True),
+        minmax_scale: (x - x.min(axis=1, keepdims=True)) / np.ptp(x, axis=1, keepdims=True),
+        apply_window: x * get_window_info("hann", 300).window,
+    }
+    for kernel, want in expected.items():
+        got = kernel(x.copy())
+        assert got.dtype == dtype
+        np.testing.assert_allclose(got, want, atol=tol * np.abs(want).max())
+        inplace = x.copy()
+        assert kernel(inplace, out=inplace) is inplace
+        np.testing.assert_allclose(inplace, want, atol=tol * np.abs(want).max())
+    np.testing.assert_array_equal(minmax_scale(np.ones((2, 4)), (-1, 1)), -np.ones((2, 4)))
+    np.testing.assert_array_equal(zscore(np.ones((1, 4))), np.zeros((1, 4)))
+    with pytest.raises(SpectralAnalysisError):
+        detrend(x, order=300)
+
+
+def test_preprocess_chains_in_one_buffer_without_full_size_temporaries():
+    rng = np.random.default_rng(1)
+    x = rng.standard_normal((256, 4096)) + np.linspace(0, 5, 4096)
+    want = apply_window(zscore(detrend(x, 1)), "hann")
+    out = np.empty_like(x)
+    np.testing.assert_allclose(preprocess(x, detrend_order=1, normalize="zscore", window="hann", out=out), want)
+    preprocess(x, 1, "zscore", "hann", out=out)  # warm the basis and window caches
+    tracemalloc.start()
+    preprocess(x, 1, "zscore", "hann", out=out)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert peak < x.nbytes / 8
+    np.testing.assert_array_equal(preprocess(x), x)
+    with pytest.raises(SpectralAnalysisError):
+        preprocess(x, normalize="l2")
@@ -0,0 +1,83 @@
+"""Tests for the reference spectra store and IVF-PQ index."""
+
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.database.index import IVFPQIndex, exact_search
+from spectranova.database.store import SpectralStore, embed_spectra
+
+
+def clustered(rng, n, dim, centres=40):
+    means = rng.standard_normal((centres, dim)).astype(np.float32)
+    return means[rng.integers(centres, size=n)] + 0.3 * rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def test_exact_search_matches_full_sort():
+    rng = np.random.default_rng(0)
+    x, q = rng.standard_normal((1000, 8)), rng.standard_normal((5, 8))
+    d, i = exact_search(x, q, k=7, block=128)
+    full = ((q[:, None, :] - x[None]) ** 2).sum(-1)
+    np.testing.assert_array_equal(i, np.argsort(full, axis=1)[:, :7])
+    np.testing.assert_allclose(d, np.sort(full, axis=1)[:, :7], rtol=1e-4)
+
+
+def test_ivfpq_recall_and_persistence(tmp_path):
+    rng = np.random.default_rng(1)
+    x = clustered(rng, 20000, 16)
+    queries = x[rng.choice(len(x), 50, replace=False)] + 0.05 * rng.standard_normal((50, 16)).astype(np.float32)
+    index = IVFPQIndex(16, n_lists=64, n_subvectors=4).train(x[:8000])
+    index.add(x[:12000])
+    index.add(x[12000:])
+    assert len(index) == len(x) and index.offsets[-1] == len(x)
+    _, truth = exact_search(x, queries, k=10)
+    _, found = index.search(queries, k=10, n_probe=8, rerank=8, vectors=lambda ids: x[ids])
+    recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(truth, found)])
+    assert recall > 0.9
+    index.save(tmp_path / "index")
+    loaded = IVFPQIndex.load(tmp_path / "index")
+    assert isinstance(loaded.codes, np.memmap)
+    np.testing.assert_array_equal(loaded.search(queries, 10, 8)[1], index.search(queries, 10, 8)[1])
+    with pytest.raises(SpectralAnalysisError):
+        IVFPQIndex(10, n_subvectors=4)
+
+
+def test_store_appends_segments_and_queries(tmp_path):
+    rng = np.random.default_rng(2)
+    freqs = np.linspace(0, 500, 257)
+    peaks = rng.uniform(20, 480, 3000)
+    spectra = np.exp(-0.5 * ((freqs[None, :] - peaks[:, None]) / 5.0) ** 2) + 1e-3
+    store = SpectralStore.create(tmp_path / "refs", freqs, dim=32)
+    store.append(spectra[:2000], {"peak": peaks[:2000], "label": np.where(peaks[:2000] > 250, "high", "low")})
+    store.build_index(n_lists=16, n_subvectors=4)
+    ids = store.append(spectra[2000:], {"peak": peaks[2000:]})
+    np.testing.assert_array_equal(ids, np.arange(2000, 3000))
+
+    reopened = SpectralStore(tmp_path / "refs")
+    assert len(reopened) == 3000 and len(reopened.index) == 2000
+    np.testing.assert_array_equal(reopened.spectra([5, 2500]), spectra[[5, 2500]].astype(np.float32))
+    assert reopened.metadata([2500])[0] == {"peak": peaks[2500]}
+    # Scaling a spectrum does not change its embedding.
+    np.testing.assert_allclose(embed_spectra(10 * spectra[:3], 32), reopened.vectors([0, 1, 2]), atol=1e-5)
+
+    for row in (7, 2700):
+        matches = reopened.query(spectra[row] * 3.0, k=5)
+        assert matches[0]["id"] == row and matches[0]["distance"] < 1e-6
+        assert [m["id"] for m in matches] == [int(i) for i in reopened.search(reopened.vectors([row]), 5)[1][0]]
+    reopened.update_index()
+    assert len(reopened.index) == 3000 and reopened.query(spectra[2700], k=1)[0]["id"] == 2700
+    with pytest.raises(SpectralAnalysisError):
+        reopened.append(spectra[:2, :100])
+    with pytest.raises(SpectralAnalysisError):
+        SpectralStore.create(tmp_path / "refs", freqs)
+
+
+def test_small_store_refuses_index_and_searches_exactly(tmp_path):
+    rng = np.random.default_rng(3)
+    freqs = np.linspace(0, 500, 129)
+    spectra = rng.uniform(0.1, 1.0, (100, 129))
+    store = SpectralStore.create(tmp_path / "refs", freqs, dim=32)
+    store.append(spectra, {"label": np.arange(100)})
+    with pytest.raises(SpectralAnalysisError, match="at least 256 rows"):
+        store.build_index(n_subvectors=4)
+    assert store.index is None and store.query(spectra[42], k=1)[0]["id"] == 42
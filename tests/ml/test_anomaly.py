@@ -0,0 +1,56 @@
+"""Tests for the anomaly detectors."""
+
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.ml.anomaly import HalfSpaceTrees, SpectralAnomalyDetector
+
+
+def test_isolation_forest_flags_outliers():
+    pytest.importorskip("sklearn")
+    rng = np.random.default_rng(0)
+    detector = SpectralAnomalyDetector(n_estimators=50, random_state=0).fit(rng.standard_normal((500, 4)))
+    scores = detector.score_samples(np.array([[0.0, 0, 0, 0], [8.0, 8, 8, 8]]))
+    assert scores[1] < scores[0]
+    with pytest.raises(SpectralAnalysisError):
+        SpectralAnomalyDetector().predict(np.zeros((1, 4)))
+
+
+def test_half_space_trees_scores_sparse_regions_low():
+    rng = np.random.default_rng(1)
+    detector = HalfSpaceTrees(n_trees=20, depth=8, window=200, random_state=0).fit(rng.standard_normal((1000, 5)))
+    normal, shifted = rng.standard_normal((300, 5)), rng.standard_normal((300, 5)) + 5
+    assert detector.score_samples(shifted).max() < detector.score_samples(normal).mean()
+    assert (detector.predict(shifted) == -1).all()
+    assert (detector.predict(normal) == -1).mean() < 0.1
+    with pytest.raises(SpectralAnalysisError):
+        HalfSpaceTrees().score_samples(normal)
+
+
+def test_half_space_trees_batches_match_row_by_row():
+    rng = np.random.default_rng(2)
+    x = rng.standard_normal((700, 3))
+    limits = (np.full(3, -4.0), np.full(3, 4.0))
+    batched = HalfSpaceTrees(n_trees=5, depth=6, window=128, limits=limits, random_state=3)
+    single = HalfSpaceTrees(n_trees=5, depth=6, window=128, limits=limits, random_state=3)
+    got = np.concatenate([batched.score_update(x[:300]), batched.score_update(x[300:])])
+    expected = np.array([single.score_update(row)[0] for row in x])
+    np.testing.assert_allclose(got, expected)
+    # Memory is fixed by the tree shape, not by the stream length.
+    assert batched._latest.shape == (5, 2 ** 7 - 1)
+
+
+def test_half_space_trees_snapshots(tmp_path):
+    rng = np.random.default_rng(4)
+    path = tmp_path / "hst.npz"
+    detector = HalfSpaceTrees(n_trees=4, depth=5, window=50, random_state=0,
+                              snapshot_path=str(path), snapshot_every=100)
+    detector.fit(rng.standard_normal((90, 3)))
+    assert not path.exists()
+    detector.update(rng.standard_normal((20, 3)))
+    assert path.exists()
+    restored = HalfSpaceTrees.load(path)
+    probe = rng.standard_normal((40, 3))
+    np.testing.assert_array_equal(restored.score_update(probe), detector.score_update(probe))
+    assert restored.n_seen == detector.n_seen == 150
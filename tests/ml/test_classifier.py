@@ -0,0 +1,81 @@
+"""Tests for the spectral classifier and model registry."""
+
+import threading
+
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.ml.classifier import SpectralClassifier
+from spectranova.ml.registry import list_models, load_model, save_model
+
+pytest.importorskip("sklearn")
+
+
+@pytest.fixture(scope="module")
+def data():
+    rng = np.random.default_rng(0)
+    x = rng.standard_normal((600, 6))
+    y = np.where(x[:, 0] + 0.5 * x[:, 1] > 0, "fault", "ok")
+    return x, y
+
+
+@pytest.fixture(scope="module")
+def forest(data):
+    x, y = data
+    return SpectralClassifier(n_estimators=20, max_depth=8, random_state=0).fit(x[:400], y[:400])
+
+
+def test_flattened_forest_matches_sklearn(data, forest):
+    x, _ = data
+    np.testing.assert_allclose(forest.predict_proba(x), forest.estimator.predict_proba(x), atol=1e-12)
+    np.testing.assert_array_equal(forest.predict(x), forest.estimator.predict(x))
+    with pytest.raises(SpectralAnalysisError):
+        forest.predict(x[:, :3])
+
+
+def test_registry_maps_once_and_compacts(tmp_path, data, forest):
+    x, _ = data
+    save_model(forest, "rf", tmp_path, compact=True)
+    model = load_model("rf", tmp_path)
+    assert load_model("rf", tmp_path) is model
+    assert list_models(tmp_path) == ["rf"]
+    assert isinstance(model.forest.threshold, np.memmap) and model.forest.threshold.dtype == np.float32
+    np.testing.assert_array_equal(model.predict(x), forest.estimator.predict(x))
+    np.testing.assert_allclose(model.predict_proba(x), forest.estimator.predict_proba(x), atol=1e-6)
+    metrics = model.metrics()
+    assert metrics["rows"] == 2 * len(x) and metrics["rows_per_s"] > 0 and metrics["load_seconds"] > 0
+    with pytest.raises(SpectralAnalysisError):
+        load_model("missing", tmp_path)
+
+
+def test_svm_round_trip(tmp_path, data):
+    pytest.importorskip("joblib")
+    x, y = data
+    svm = SpectralClassifier("svm", C=2.0).fit(x[:400], y[:400])
+    save_model(svm, "svm", tmp_path)
+    np.testing.assert_array_equal(load_model("svm", tmp_path).predict(x), svm.predict(x))
+
+
+def test_predict_many_and_batcher(data, forest):
+    x, _ = data
+    expected = forest.predict(x)
+    requests = [x[0], x[1:5], x[5]] + list(x[6:50])
+    results = list(forest.predict_many(requests, max_batch=16))
+    assert results[0] == expected[0] and results[2] == expected[5]
+    np.testing.assert_array_equal(results[1], expected[1:5])
+    np.testing.assert_array_equal(results[3:], expected[6:50])
+
+    calls = []
+    with forest.batcher(max_batch=64, max_delay=0.05) as batcher:
+        batcher.predict = lambda rows: calls.append(len(rows)) or forest.predict(rows)
+        futures = [None] * 40
+        threads = [threading.Thread(target=lambda i=i: futures.__setitem__(i, batcher.submit(x[i])))
+                   for i in range(40)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        got = [f.result(timeout=5) for f in futures]
+    np.testing.assert_array_equal(got, expected[:40])
+    assert len(calls) < 40
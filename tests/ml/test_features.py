@@ -1,4 +1,43 @@
 """Tests for feature extraction."""
 
+import numpy as np
+import pytest
+
+from spectranova.ml.features import FEATURE_NAMES, extract_features, extract_features_batch
+
+
 def test_extract_features():
-    pass
+    fs = 1000.0
+    t = np.arange(2000) / fs
+    features = extract_features(2.0 * np.sin(2 * np.pi * 60 * t) + 0.5 * np.sin(2 * np.pi * 200 * t), fs)
+    assert list(features) == list(FEATURE_NAMES)
+    assert len(FEATURE_NAMES) >= 20
+    assert features["peak_freq_1"] == pytest.approx(60.0, abs=1.0)
+    assert features["peak_amp_1"] == pytest.approx(2.0, rel=0.05)
+    assert features["peak_freq_2"] == pytest.approx(200.0, abs=1.0)
+    assert 60.0 < features["spectral_centroid"] < 200.0
+
+
+def test_extract_features_batch_matches_single():
+    rng = np.random.default_rng(0)
+    batch = rng.standard_normal((10, 512))
+    matrix, names = extract_features_batch(batch, 256.0, batch_size=3)
+    assert matrix.dtype == np.float32 and matrix.flags.c_contiguous
+    assert matrix.shape == (10, len(names))
+    single = extract_features(batch[4], 256.0)
+    np.testing.assert_allclose(matrix[4], np.float32(list(single.values())), rtol=1e-6)
+    from_iter, _ = extract_features_batch(iter(batch), 256.0, batch_size=4)
+    np.testing.assert_array_equal(from_iter, matrix)
+
+
+def test_flatness_separates_noise_from_tone():
+    rng = np.random.default_rng(1)
+    tone = np.sin(np.arange(4096) * 0.5)
+    matrix, names = extract_features_batch(np.stack([tone, rng.standard_normal(4096)]), 1.0)
+    flatness = matrix[:, names.index("spectral_flatness")]
+    assert flatness[0] < 0.01 < flatness[1]
+
+
+def test_extract_features_batch_empty_iterator():
+    matrix, _ = extract_features_batch(iter([]), 1.0)
+    assert matrix.shape == (0, len(FEATURE_NAMES))
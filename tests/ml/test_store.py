@@ -0,0 +1,97 @@
+"""Tests for the columnar feature store."""
+
+import os
+
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.parallel import BatchRunner, iter_files
+from spectranova.ml.anomaly import HalfSpaceTrees
+from spectranova.ml.store import FeatureStore, FeatureStoreWriter
+from spectranova.ml.training import build_training_set, iter_feature_csv, open_training_set
+
+
+def _row(path):
+    return np.load(path)
+
+
+def test_append_project_and_range_reads(tmp_path):
+    rng = np.random.default_rng(0)
+    rows = rng.standard_normal((250, 4)).astype(np.float32)
+    keys = [f"class{i % 3}/file {i}.npy" for i in range(250)]
+    store = FeatureStore.create(tmp_path / "f", ["a", "b", "c", "d"], metadata={"fs": 100.0})
+    for lo in range(0, 250, 100):
+        store.append(rows[lo:lo + 100], keys[lo:lo + 100])
+    store.close()
+
+    reader = FeatureStore(tmp_path / "f")
+    assert len(reader) == 250 and reader.metadata == {"fs": 100.0}
+    assert isinstance(reader.column("c"), np.memmap)
+    np.testing.assert_array_equal(reader.column(2), rows[:, 2])
+    np.testing.assert_array_equal(reader.read(["d", "a"], 90, 210), rows[90:210][:, [3, 0]])
+    assert reader.keys(99, 102) == keys[99:102]
+    chunks = list(reader.iter_chunks(["b"], chunk_rows=64, start=10))
+    assert [len(k) for k, _ in chunks] == [64, 64, 64, 48]
+    np.testing.assert_array_equal(np.vstack([c for _, c in chunks])[:, 0], rows[10:, 1])
+
+    # Bytes past the committed rows (an interrupted append) are discarded.
+    with open(tmp_path / "f" / "col-0000.f32", "ab") as fh:
+        fh.write(b"\0" * 12)
+    reader.append(rows[:2], ["x", "y"])
+    np.testing.assert_array_equal(FeatureStore(tmp_path / "f").column("a")[-3:], rows[[249, 0, 1], 0])
+    reader.truncate(100)
+    assert len(FeatureStore(tmp_path / "f")) == 100 and reader.keys(-1) == [keys[99]]
+    with pytest.raises(SpectralAnalysisError):
+        reader.append(rows[:2, :3], ["x", "y"])
+    with pytest.raises(SpectralAnalysisError):
+        FeatureStore.create(tmp_path / "f", ["a"])
+
+
+def test_batch_runner_store_feeds_training_and_detectors(tmp_path):
+    root = tmp_path / "in"
+    rng = np.random.default_rng(1)
+    for label, shift in (("ok", 0.0), ("fault", 3.0)):
+        (root / label).mkdir(parents=True)
+        for i in range(20):
+            np.save(root / label / f"{i}.npy", rng.standard_normal(3) + shift)
+    out = str(tmp_path / "features.store")
+    runner = BatchRunner(_row, ["x", "y", "z"], workers=1, chunksize=8)
+    paths = list(iter_files(str(root)))
+    runner.run(paths[:25], out, writer_factory=FeatureStoreWriter)
+    stats = runner.run(paths, out, resume=True, writer_factory=FeatureStoreWriter)
+    assert stats["skipped"] == 25 and stats["processed"] == 15
+    store = FeatureStore(out)
+    assert sorted(store.keys()) == sorted(paths)
+    expected = {p: np.load(p).astype(np.float32) for p in paths}
+    np.testing.assert_array_equal(store.read(), [expected[k] for k in store.keys()])
+
+    path = build_training_set(out, tmp_path / "sets", root=str(root), chunk_rows=16)
+    assert build_training_set(out, tmp_path / "sets", root=str(root)) == path
+    features, labels, meta = open_training_set(path)
+    np.testing.assert_array_equal(features, store.read())
+    assert sorted(meta["classes"]) == ["fault", "ok"] and meta["columns"] == ["x", "y", "z"]
+
+    detector = HalfSpaceTrees(n_trees=5, depth=4, window=16, random_state=0).fit(store.read(stop=16))
+    for _, chunk in store.iter_chunks(chunk_rows=16, start=16):
+        detector.update(chunk)
+    assert detector.n_seen == 40
+
+
+def test_export_csv_and_parquet(tmp_path):
+    rng = np.random.default_rng(2)
+    rows = rng.standard_normal((30, 2)).astype(np.float32)
+    store = FeatureStore.create(tmp_path / "f", ["a", "b"])
+    store.append(rows, [os.path.join("d", f"{i}.npy") for i in range(30)])
+    store.export(tmp_path / "f.csv", chunk_rows=7)
+    (paths, back), = iter_feature_csv(tmp_path / "f.csv")
+    assert paths == store.keys()
+    np.testing.assert_array_equal(back, rows)
+    with pytest.raises(SpectralAnalysisError):
+        store.export(tmp_path / "f.json")
+
+    pq = pytest.importorskip("pyarrow.parquet")
+    store.export(tmp_path / "f.parquet", columns=["b"], chunk_rows=7)
+    table = pq.read_table(tmp_path / "f.parquet")
+    assert table.column_names == ["path", "b"]
+    np.testing.assert_array_equal(table.column("b").to_numpy(), rows[:, 1])
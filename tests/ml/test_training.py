@@ -0,0 +1,94 @@
+"""Tests for out-of-core training and hyperparameter search."""
+
+import csv
+import os
+
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.ml.registry import load_model
+from spectranova.ml.training import (build_training_set, iter_feature_csv, label_from_path,
+                                     load_folds, make_folds, open_training_set, search,
+                                     stratified_subsample, train)
+
+pytest.importorskip("sklearn")
+
+
+@pytest.fixture
+def feature_csv(tmp_path):
+    rng = np.random.default_rng(0)
+    path = tmp_path / "features.csv"
+    with open(path, "w", newline="") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(["path", "a", "b", "c"])
+        for i in range(240):
+            label = ("ok", "fault")[i % 2]
+            row = rng.standard_normal(3) + (3.0 if label == "fault" else 0.0)
+            if i == 7:
+                row[1] = np.nan
+            writer.writerow([os.path.join("spectra", label, f"{i}.npy")] + [str(v) for v in row])
+    return str(path)
+
+
+def test_csv_streams_into_memory_mapped_set(tmp_path, feature_csv):
+    chunks = list(iter_feature_csv(feature_csv, chunk_rows=100))
+    assert [c[1].shape for c in chunks] == [(100, 3), (100, 3), (40, 3)]
+    path = build_training_set(feature_csv, tmp_path / "sets", root="spectra", chunk_rows=50)
+    assert build_training_set(feature_csv, tmp_path / "sets", root="spectra") == path
+    features, labels, meta = open_training_set(path)
+    assert isinstance(features, np.memmap) and features.shape == (239, 3)
+    assert isinstance(labels, np.memmap) and labels.dtype == np.int32
+    assert sorted(os.listdir(path)) == ["features.f32", "labels.npy", "meta.json"]
+    assert np.asarray(meta["classes"])[labels].tolist() == [("ok", "fault")[i % 2] for i in range(240) if i != 7]
+    assert meta["dropped"] == 1 and sorted(meta["classes"]) == ["fault", "ok"]
+    expected = np.vstack([c[1] for c in chunks])
+    np.testing.assert_array_equal(features, expected[np.isfinite(expected).all(axis=1)])
+    assert label_from_path(os.path.join("spectra", "ok", "x", "1.npy"), "spectra") == "ok"
+    with pytest.raises(SpectralAnalysisError):
+        label_from_path("elsewhere/1.npy", "spectra")
+
+
+def test_folds_are_stratified_and_cached(tmp_path, feature_csv):
+    labels = np.repeat([0, 1, 2], [50, 30, 20])
+    folds = make_folds(labels, 5, seed=1)
+    for code in range(3):
+        counts = np.bincount(folds[labels == code], minlength=5)
+        assert counts.max() - counts.min() <= 1
+    wide = make_folds(np.zeros(300, dtype=np.int32), 200)
+    assert wide.min() == 0 and wide.max() == 199
+    with pytest.raises(SpectralAnalysisError):
+        make_folds(labels, 1)
+    path = build_training_set(feature_csv, tmp_path / "sets", chunk_rows=64)
+    first = load_folds(path, 4, 0)
+    assert os.path.exists(os.path.join(path, "folds-4-0.npy"))
+    np.testing.assert_array_equal(load_folds(path, 4, 0), first)
+
+
+def test_stratified_subsample_bounds_rows_and_keeps_shares():
+    labels = np.repeat([0, 1, 2], [500, 300, 200])
+    rows = stratified_subsample(labels, 101, seed=3)
+    assert rows.size == 101 and np.all(np.diff(rows) > 0)
+    assert np.bincount(labels[rows]).tolist() == [51, 30, 20]
+    np.testing.assert_array_equal(stratified_subsample(labels, None), np.arange(1000))
+
+
+def test_search_and_train_save_model_with_report(tmp_path, feature_csv):
+    grid = {"n_estimators": [5, 10], "max_depth": [2]}
+    path = build_training_set(feature_csv, tmp_path / "sets")
+    results = search(path, "rf", grid, n_splits=3, workers=2)
+    assert len(results) == 2 and results[0]["mean_accuracy"] >= results[1]["mean_accuracy"]
+    assert results[0]["mean_accuracy"] > 0.9 and len(results[0]["fold_accuracy"]) == 3
+
+    model_path, report = train(feature_csv, "clf", "rf", grid, n_splits=3, workers=2,
+                               cache_dir=tmp_path / "sets", models_dir=tmp_path / "models")
+    assert report["best_params"] in [r["params"] for r in results]
+    assert report["timings"]["trials"] == 6 and report["n_rows"] == 239
+    model = load_model("clf", tmp_path / "models")
+    assert model.meta["training"]["cv_accuracy"] == report["cv_accuracy"]
+    assert "n_jobs" not in model.params or model.params["n_jobs"] == 1
+    assert set(model.predict(np.array([[3.0, 3.0, 3.0], [0.0, 0.0, 0.0]]))) == {"fault", "ok"}
+
+    _, report = train(feature_csv, "small", "rf", grid, n_splits=3, workers=2, max_rows=60,
+                      cache_dir=tmp_path / "sets", models_dir=tmp_path / "models")
+    assert report["n_rows"] == 239 and report["timings"]["refit_rows"] == 60
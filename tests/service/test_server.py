@@ -0,0 +1,81 @@
+"""Tests for the ingestion server and its wire protocol."""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.ml.features import extract_features_batch
+from spectranova.service.client import IngestClient
+from spectranova.service.protocol import (decode_request, decode_response, encode_request, encode_response,
+                                          read_message)
+from spectranova.service.server import IngestServer
+from spectranova.signal.welch import compute_welch
+
+
+def test_protocol_round_trip():
+    samples = np.arange(6, dtype=np.float32)
+    message = encode_request(7, 42, 100.0, samples, "features")
+    assert int.from_bytes(message[:4], "little") == len(message) - 4
+    request = decode_request(message[4:])
+    assert (request.sensor, request.op, request.seq, request.fs) == (7, "features", 42, 100.0)
+    np.testing.assert_array_equal(request.samples, samples)
+
+    response = decode_response(encode_response(7, "welch", 42, [1.5, 2.5])[4:])
+    assert response.error is None and response.values.tolist() == [1.5, 2.5]
+    assert decode_response(encode_response(1, "welch", 2, error="bad")[4:]).error == "bad"
+    with pytest.raises(SpectralAnalysisError):
+        decode_request(message[4:-1])
+
+
+def test_server_batches_and_answers(tmp_path):
+    fs = 1000.0
+    rng = np.random.default_rng(0)
+    frames = rng.standard_normal((24, 512)).astype(np.float32)
+
+    async def scenario():
+        server = IngestServer(workers=2, batch_window=0.01)
+        host, port = await server.start()
+        path = await server.start(path=str(tmp_path / "ingest.sock"))
+        tcp = await IngestClient.connect(host, port)
+        unix = await IngestClient.connect(path=path)
+        welch = await asyncio.gather(*(tcp.request(i, f, fs) for i, f in enumerate(frames[:12])))
+        features = await asyncio.gather(*(unix.request(i, f, fs, "features") for i, f in enumerate(frames[12:])))
+        with pytest.raises(SpectralAnalysisError, match="two samples"):
+            await tcp.request(0, np.zeros(1, np.float32), fs, "features")
+        await tcp.close()
+        await unix.close()
+        await server.close()
+        return welch, features, server.stats
+
+    welch, features, stats = asyncio.run(scenario())
+    expected = compute_welch(frames[:12].astype(float), fs)[1]
+    np.testing.assert_allclose(np.array(welch), expected, rtol=1e-5)
+    np.testing.assert_allclose(np.array(features), extract_features_batch(frames[12:].astype(float), fs)[0],
+                               rtol=1e-5)
+    assert stats["frames"] == 24 and stats["errors"] == 1
+    assert stats["batches"] < 25
+
+
+def test_server_addresses_rejected_frames():
+    bad_dtype = bytearray(encode_request(5, 77, 100.0, np.zeros(8, np.float32)))
+    bad_dtype[4 + 3] = 9
+
+    async def scenario():
+        server = IngestServer(workers=1)
+        host, port = await server.start()
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(bytes(bad_dtype) + encode_request(5, 78, 100.0, np.zeros(512, np.float32)))
+        responses = [decode_response(await read_message(reader)) for _ in range(2)]
+        writer.write(b"\x03\x00\x00\x00abc")
+        eof = await read_message(reader)
+        writer.close()
+        await server.close()
+        return responses, eof, server.stats
+
+    responses, eof, stats = asyncio.run(scenario())
+    rejected = next(r for r in responses if r.error is not None)
+    assert (rejected.sensor, rejected.seq) == (5, 77) and "dtype 9" in rejected.error
+    assert any(r.seq == 78 and r.error is None for r in responses)
+    assert eof is None and stats["rejected"] == 2
@@ -1,4 +1,48 @@
 """Tests for Fourier module."""
 
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.signal.fourier import compute_fft, get_fft_plan, next_fast_len
+
+
 def test_compute_fft():
-    pass
+    fs = 1000.0
+    t = np.arange(1000) / fs
+    freqs, spectrum = compute_fft(np.sin(2 * np.pi * 50 * t), fs, pad=False)
+    assert freqs.shape == spectrum.shape == (501,)
+    assert freqs[np.argmax(np.abs(spectrum))] == pytest.approx(50.0)
+
+
+def test_compute_fft_batch_matches_single():
+    rng = np.random.default_rng(0)
+    batch = rng.standard_normal((8, 1001))
+    freqs, spectra = compute_fft(batch, 500.0)
+    assert spectra.shape == (8, next_fast_len(1001) // 2 + 1)
+    for row, expected in zip(batch, spectra):
+        np.testing.assert_allclose(compute_fft(row, 500.0)[1], expected)
+    _, from_list = compute_fft(list(batch), 500.0)
+    np.testing.assert_array_equal(from_list, spectra)
+
+
+def test_compute_fft_complex_input_uses_full_fft():
+    x = np.exp(2j * np.pi * 0.1 * np.arange(64))
+    freqs, spectrum = compute_fft(x, 1.0)
+    assert spectrum.shape == (64,)
+    assert freqs[np.argmax(np.abs(spectrum))] == pytest.approx(0.1, abs=1 / 64)
+
+
+def test_plan_is_cached_and_read_only():
+    plan = get_fft_plan(1000, 10.0)
+    assert get_fft_plan(1000, 10.0) is plan
+    assert not plan.freqs.flags.writeable
+
+
+def test_next_fast_len():
+    assert [next_fast_len(n) for n in (1, 7, 11, 97, 1001)] == [1, 8, 12, 100, 1024]
+
+
+def test_compute_fft_rejects_ragged_batch():
+    with pytest.raises(SpectralAnalysisError):
+        compute_fft([np.zeros(4), np.zeros(5)], 1.0)
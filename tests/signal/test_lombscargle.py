@@ -0,0 +1,56 @@
+"""Tests for Lomb-Scargle module."""
+
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.signal.lombscargle import lombscargle, lombscargle_batch
+
+
+def _light_curve(rng, n, freq):
+    t = np.sort(rng.uniform(0, 100, n))
+    dy = rng.uniform(0.5, 1.5, n)
+    y = 3.0 + np.sin(2 * np.pi * freq * t) + 0.3 * rng.standard_normal(n)
+    return t, y, dy
+
+
+def _least_squares_power(t, y, dy, f):
+    w = 1 / dy ** 2
+    design = np.column_stack((np.cos(2 * np.pi * f * t), np.sin(2 * np.pi * f * t), np.ones_like(t)))
+    coef = np.linalg.lstsq(design * np.sqrt(w)[:, None], y * np.sqrt(w), rcond=None)[0]
+    chi2 = np.sum(w * (y - design @ coef) ** 2)
+    chi2_ref = np.sum(w * (y - np.average(y, weights=w)) ** 2)
+    return 1 - chi2 / chi2_ref
+
+
+def test_direct_matches_least_squares():
+    rng = np.random.default_rng(0)
+    t, y, dy = _light_curve(rng, 80, 0.31)
+    freqs, power = lombscargle(t, y, dy, f0=0.05, df=0.07, n_freq=20, method="direct")
+    expected = [_least_squares_power(t, y, dy, f) for f in freqs]
+    np.testing.assert_allclose(power, expected, rtol=1e-8)
+
+
+def test_fast_matches_direct_and_finds_peak():
+    rng = np.random.default_rng(1)
+    t, y, dy = _light_curve(rng, 500, 0.31)
+    freqs, fast = lombscargle(t, y, dy)
+    _, direct = lombscargle(t, y, dy, method="direct")
+    assert np.max(np.abs(fast - direct)) < 1e-3
+    assert freqs[np.argmax(fast)] == pytest.approx(0.31, abs=0.002)
+
+
+def test_batch_matches_individual_curves():
+    rng = np.random.default_rng(2)
+    curves = [_light_curve(rng, n, f) for n, f in ((300, 0.2), (450, 0.4), (120, 0.1))]
+    times, values, errors = zip(*curves)
+    freqs, power = lombscargle_batch(times, values, errors, f0=0.01, df=0.002, n_freq=500)
+    assert power.shape == (3, 500)
+    for i, (t, y, dy) in enumerate(curves):
+        np.testing.assert_allclose(lombscargle(t, y, dy, f0=0.01, df=0.002, n_freq=500)[1], power[i])
+        assert freqs[np.argmax(power[i])] == pytest.approx((0.2, 0.4, 0.1)[i], abs=0.004)
+
+
+def test_lombscargle_rejects_bad_grid():
+    with pytest.raises(SpectralAnalysisError):
+        lombscargle(np.arange(5.0), np.ones(5), f0=0.0, df=0.1, n_freq=3)
@@ -0,0 +1,54 @@
+"""Tests for multitaper module."""
+
+import builtins
+
+import numpy as np
+import pytest
+
+from spectranova.signal.multitaper import _solve_dpss, compute_multitaper, get_dpss
+
+
+def test_get_dpss_properties():
+    tapers, eigenvalues = get_dpss(256, 4.0)
+    assert tapers.shape == (7, 256) and not tapers.flags.writeable
+    np.testing.assert_allclose(tapers @ tapers.T, np.eye(7), atol=1e-10)
+    assert np.all(np.diff(eigenvalues) < 0) and eigenvalues[0] > 0.999
+    assert get_dpss(256, 4.0) is get_dpss(256, 4.0)
+
+
+def test_dpss_without_scipy_matches(monkeypatch):
+    expected, expected_ratios = _solve_dpss(128, 3.0, 5, cache=False)
+    real_import = builtins.__import__
+
+    def no_scipy(name, *args, **kwargs):
+        if name.startswith("scipy"):
+            raise ImportError(name)
+        return real_import(name, *args, **kwargs)
+
+    monkeypatch.setattr(builtins, "__import__", no_scipy)
+    tapers, ratios = _solve_dpss(128, 3.0, 5, cache=False)
+    np.testing.assert_allclose(tapers, expected, atol=1e-8)
+    np.testing.assert_allclose(ratios, expected_ratios, atol=1e-10)
+
+
+def test_dpss_matches_scipy():
+    windows = pytest.importorskip("scipy.signal.windows")
+    tapers, ratios = get_dpss(300, 2.5, 4)
+    ref, ref_ratios = windows.dpss(300, 2.5, 4, norm=2, return_ratios=True)
+    np.testing.assert_allclose(tapers, ref, atol=1e-8)
+    np.testing.assert_allclose(ratios, ref_ratios, atol=1e-8)
+
+
+@pytest.mark.parametrize("adaptive", [False, True])
+def test_compute_multitaper(adaptive):
+    fs = 1000.0
+    rng = np.random.default_rng(0)
+    noise = rng.standard_normal((50, 1024))
+    freqs, psd = compute_multitaper(noise, fs, adaptive=adaptive)
+    assert psd.shape == (50, 513)
+    assert np.mean(psd[:, 1:-1]) == pytest.approx(2 / fs, rel=0.05)
+
+    tone = np.sin(2 * np.pi * 125.0 * np.arange(1024) / fs)
+    f1, p1 = compute_multitaper(tone, fs, adaptive=adaptive)
+    assert f1[np.argmax(p1)] == pytest.approx(125.0, abs=1.0)
+    np.testing.assert_allclose(compute_multitaper(noise[3], fs, adaptive=adaptive)[1], psd[3], rtol=1e-8)
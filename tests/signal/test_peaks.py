@@ -0,0 +1,67 @@
+"""Tests for batch peak detection and line identification."""
+
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.signal.lines import LineCatalog, doppler_factor, doppler_velocity
+from spectranova.signal.peaks import find_peaks_batch
+
+
+def gaussian_lines(freqs, centres, width=2.0, floor=1e-3):
+    return floor + np.exp(-0.5 * ((freqs[None, :] - np.asarray(centres)[:, None]) / width) ** 2).sum(axis=0)
+
+
+def test_batch_peaks_are_interpolated_and_filtered():
+    freqs = np.linspace(0, 1000, 2001)
+    centres = [[100.3, 400.1, 402.0, 750.7], [220.2]]
+    spectra = np.stack([gaussian_lines(freqs, c) for c in centres])
+    spectra[1, 1500] = 0.5  # a weaker one-bin spike
+    peaks = find_peaks_batch(freqs, spectra, snr=10.0, distance=5)
+    assert peaks.offsets.tolist() == [0, 3, 5]
+    # Lines 1.9 Hz apart merge into one; sub-bin positions are recovered.
+    np.testing.assert_allclose(peaks.freqs[[0, 2, 3]], [100.3, 750.7, 220.2], atol=1e-6)
+    np.testing.assert_allclose(peaks.amplitudes[[0, 3]], 1.0, atol=1e-3)
+    strongest = find_peaks_batch(freqs, spectra, max_peaks=1)
+    assert strongest.offsets.tolist() == [0, 1, 2]
+    assert strongest.bins[1] == np.argmin(np.abs(freqs - 220.2))
+    with pytest.raises(SpectralAnalysisError):
+        find_peaks_batch(freqs[:10], spectra)
+
+
+def test_catalog_matches_with_tolerance_widths_and_doppler(tmp_path):
+    rng = np.random.default_rng(0)
+    rest = np.sort(rng.uniform(1e9, 2e9, 100000))
+    catalog = LineCatalog(rest[::-1], widths=np.full(rest.size, 10.0), name=np.arange(rest.size)[::-1])
+    np.testing.assert_array_equal(catalog.freqs, rest)
+    picked = rng.choice(rest.size, 50, replace=False)
+    velocity = 30e3
+    observed = rest[picked] * doppler_factor(velocity)
+    assert np.all(observed < rest[picked])
+
+    unshifted = catalog.match(observed, tolerance=100.0, best=True)
+    assert not np.isin(picked, unshifted.line).all()
+    matches = catalog.match(observed, tolerance=100.0, velocity=velocity, best=True)
+    np.testing.assert_array_equal(matches.line, picked)
+    np.testing.assert_allclose(matches.velocity, velocity, rtol=1e-6)
+    assert np.all(matches.error < 1e-3)
+    ranged = catalog.match(observed, tolerance=100.0, velocity_range=(0.0, 50e3), best=True)
+    assert ranged.peak.size == picked.size
+    np.testing.assert_array_equal(catalog.columns["name"][matches.line], picked)
+
+    catalog.save(tmp_path / "lines.npz")
+    loaded = LineCatalog.load(tmp_path / "lines.npz")
+    np.testing.assert_array_equal(loaded.match(observed, 100.0, velocity=velocity).line,
+                                  catalog.match(observed, 100.0, velocity=velocity).line)
+    np.testing.assert_allclose(doppler_velocity(observed, rest[picked]), velocity, rtol=1e-9)
+
+
+def test_matches_cover_every_line_in_window():
+    catalog = LineCatalog([10.0, 10.5, 11.0, 20.0])
+    freqs = np.linspace(0, 30, 301)
+    peaks = find_peaks_batch(freqs, np.stack([gaussian_lines(freqs, [10.5]), gaussian_lines(freqs, [20.0])]))
+    matches = catalog.match(peaks, tolerance=0.6)
+    assert matches.spectrum.tolist() == [0, 0, 0, 1]
+    assert matches.line.tolist() == [0, 1, 2, 3]
+    best = catalog.match(peaks, tolerance=0.6, best=True)
+    assert best.line.tolist() == [1, 3]
@@ -0,0 +1,42 @@
+"""Tests for spectrogram module."""
+
+import numpy as np
+import pytest
+
+from spectranova.signal.spectrogram import StreamingSTFT, compute_spectrogram
+
+
+def test_compute_spectrogram():
+    fs = 1000.0
+    t = np.arange(4000) / fs
+    freqs, times, sxx = compute_spectrogram(np.sin(2 * np.pi * 125 * t), fs, nperseg=256)
+    assert sxx.shape == (129, len(times))
+    assert times[0] == pytest.approx(0.128)
+    assert np.all(freqs[np.argmax(sxx, axis=0)] == 125.0)
+
+
+@pytest.mark.parametrize("nperseg,noverlap", [(256, None), (100, 0), (64, 63), (33, 10)])
+def test_streaming_stft_is_bit_identical(nperseg, noverlap):
+    rng = np.random.default_rng(1)
+    x = rng.standard_normal(20000)
+    _, times, expected = compute_spectrogram(x, 8000.0, nperseg=nperseg, noverlap=noverlap)
+
+    stft = StreamingSTFT(8000.0, nperseg=nperseg, noverlap=noverlap)
+    sizes = rng.integers(1, 3 * nperseg, size=2000)
+    bounds = np.cumsum(np.concatenate(([0], sizes)))
+    chunks = [x[a:b] for a, b in zip(bounds[:-1], bounds[1:]) if a < x.size]
+    got = list(stft.stream(chunks))
+
+    assert len(got) == expected.shape[1]
+    np.testing.assert_array_equal(np.array([f for _, f in got]).T, expected)
+    np.testing.assert_allclose([t for t, _ in got], times)
+    assert stft._tail.size < nperseg
+
+
+def test_streaming_stft_state_advances_without_consuming():
+    x = np.arange(1000.0)
+    stft = StreamingSTFT(1.0, nperseg=128)
+    first = stft.push(x[:500])
+    second = list(stft.push(x[500:]))
+    frames = [f for _, f in first] + [f for _, f in second]
+    np.testing.assert_array_equal(np.array(frames).T, compute_spectrogram(x, 1.0, nperseg=128)[2])
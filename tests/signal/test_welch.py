@@ -1,4 +1,57 @@
 """Tests for Welch module."""
 
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.signal.welch import OnlineWelch, compute_welch
+
+
 def test_compute_welch():
-    pass
+    fs = 1000.0
+    rng = np.random.default_rng(0)
+    x = np.sin(2 * np.pi * 100 * np.arange(10000) / fs) + 0.1 * rng.standard_normal(10000)
+    freqs, psd = compute_welch(x, fs, nperseg=500)
+    assert freqs.shape == psd.shape == (251,)
+    assert freqs[np.argmax(psd)] == pytest.approx(100.0)
+    # White noise of variance s^2 has a one-sided density of 2 s^2 / fs.
+    _, noise = compute_welch(rng.standard_normal(200000), fs)
+    assert np.median(noise) == pytest.approx(2 / fs, rel=0.1)
+
+
+def test_online_welch_matches_batch():
+    rng = np.random.default_rng(2)
+    x = rng.standard_normal(12345)
+    acc = OnlineWelch(2000.0, nperseg=128)
+    for chunk in np.array_split(x, 37):
+        acc.update(chunk)
+    np.testing.assert_allclose(acc.psd(), compute_welch(x, 2000.0, nperseg=128)[1])
+
+
+def test_online_welch_merge():
+    rng = np.random.default_rng(3)
+    a_data, b_data = rng.standard_normal(4096), rng.standard_normal(8192)
+    a, b = OnlineWelch(1.0, nperseg=64), OnlineWelch(1.0, nperseg=64)
+    a.update(a_data)
+    b.update(b_data)
+    n_a, n_b = a.n_segments, b.n_segments
+    expected = (a.psd() * n_a + b.psd() * n_b) / (n_a + n_b)
+    np.testing.assert_allclose(a.merge(b).psd(), expected)
+    with pytest.raises(SpectralAnalysisError):
+        a.merge(OnlineWelch(1.0, nperseg=32))
+
+
+def test_online_welch_forgetting_tracks_change():
+    acc = OnlineWelch(1.0, nperseg=64, noverlap=0, forgetting=0.5)
+    acc.update(np.zeros(64 * 20))
+    acc.update(np.ones(64 * 20))
+    np.testing.assert_allclose(acc.psd(), compute_welch(np.ones(64), 1.0, nperseg=64)[1], rtol=1e-5)
+
+
+def test_compute_welch_batch_matches_rows():
+    rng = np.random.default_rng(4)
+    batch = rng.standard_normal((5, 3000))
+    freqs, psd = compute_welch(batch, 100.0, nperseg=128)
+    assert psd.shape == (5, freqs.size)
+    for row, expected in zip(batch, psd):
+        np.testing.assert_allclose(compute_welch(row, 100.0, nperseg=128)[1], expected)
@@ -0,0 +1,43 @@
+"""Tests for window functions."""
+
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.signal.window import compare_windows, get_window, get_window_info
+
+
+def test_get_window_periodic_hann():
+    win = get_window("hann", 8)
+    np.testing.assert_allclose(win, np.hanning(9)[:-1], atol=1e-15)
+
+
+def test_get_window_kaiser_param():
+    assert not np.allclose(get_window(("kaiser", 2.0), 16), get_window(("kaiser", 14.0), 16))
+
+
+def test_get_window_unknown():
+    with pytest.raises(SpectralAnalysisError):
+        get_window("nope", 8)
+
+
+def test_get_window_is_cached_read_only():
+    win = get_window("hamming", 512)
+    assert get_window("hamming", 512) is win
+    with pytest.raises(ValueError):
+        win[0] = 1.0
+
+
+def test_window_info_constants():
+    info = get_window_info("hann", 1024)
+    assert info.sum == pytest.approx(512.0)
+    assert info.coherent_gain == pytest.approx(0.5)
+    assert info.enbw == pytest.approx(1.5)
+    assert info.scalloping_loss == pytest.approx(1.42, abs=0.01)
+    assert get_window_info("boxcar", 64).scalloping_loss == pytest.approx(3.92, abs=0.01)
+
+
+def test_compare_windows():
+    table = compare_windows(256, names=("hann", ("kaiser", 6.0)))
+    assert set(table) == {"hann", "kaiser"}
+    assert table["hann"].window is get_window("hann", 256)
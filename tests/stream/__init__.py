@@ -0,0 +1 @@
+"""Tests for stream module."""
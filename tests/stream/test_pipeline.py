@@ -0,0 +1,172 @@
+"""Tests for the streaming pipeline."""
+
+import socket
+import threading
+import time
+
+import numpy as np
+import pytest
+
+from spectranova.core.exceptions import SpectralAnalysisError
+from spectranova.core.utils import normalize_signal
+from spectranova.ml.features import extract_features_batch
+from spectranova.stream.buffer import RingBuffer, SlotRing
+from spectranova.stream.pipeline import BoundedQueue, LatencyHistogram, Pipeline
+from spectranova.stream.sources import ArraySource, FileReplaySource, SocketSource, replay_to_socket
+from spectranova.stream.stages import (AnomalyStage, FeatureStage, NormalizeStage, SpectrumStage,
+                                       Stage)
+
+
+class MeanScore:
+    def score_samples(self, features):
+        return -np.abs(features).mean(axis=1)
+
+
+class Sleep(Stage):
+    name = "sleep"
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def process(self, data, out):
+        time.sleep(self.seconds)
+        out[...] = data
+        return True
+
+
+def test_ring_buffer_windows_are_contiguous_views():
+    ring = RingBuffer(2, 8)
+    x = np.arange(40.0).reshape(2, 20)
+    for start in range(0, 20, 3):
+        ring.write(x[:, start:start + 3])
+        n = min(ring.count, 8)
+        window = ring.latest(n)
+        np.testing.assert_array_equal(window, x[:, ring.count - n:ring.count])
+        assert window.strides[1] == window.itemsize and not window.flags.owndata
+    with pytest.raises(SpectralAnalysisError):
+        ring.latest(9)
+
+
+def test_slot_ring_leases():
+    ring = SlotRing(2, (3,))
+    a, b = ring.acquire(), ring.acquire()
+    assert a != b
+    with pytest.raises(SpectralAnalysisError):
+        ring.acquire()
+    ring.release(a)
+    assert ring.acquire() == a
+
+
+def test_bounded_queue_policies():
+    dropped = []
+    q = BoundedQueue(2, "drop_oldest", on_drop=dropped.append)
+    for i in range(4):
+        q.put(i)
+    assert [q.get(), q.get()] == [2, 3] and dropped == [0, 1]
+    q = BoundedQueue(2, "drop_newest")
+    assert [q.put(i) for i in range(3)] == [True, True, False]
+    q.close()
+    assert [q.get(), q.get(), q.get()] == [0, 1, None]
+
+
+def test_latency_histogram_percentiles():
+    hist = LatencyHistogram()
+    for ns in [1_000_000] * 99 + [50_000_000]:
+        hist.record(ns)
+    summary = hist.summary()
+    assert 1.0 <= summary["p50_ms"] <= 1.3
+    assert summary["max_ms"] == pytest.approx(50.0)
+    assert summary["count"] == 100
+
+
+def test_pipeline_matches_offline_features():
+    fs, channels, block, nperseg = 2000.0, 4, 128, 256
+    rng = np.random.default_rng(0)
+    t = np.arange(4096) / fs
+    data = np.sin(2 * np.pi * np.array([[50], [120], [300], [700]]) * t) + 0.1 * rng.standard_normal((channels, t.size))
+
+    features = []
+    pipeline = Pipeline(ArraySource(data, block, fs),
+                        [NormalizeStage(), SpectrumStage(fs, nperseg=nperseg), FeatureStage()],
+                        sink=lambda frame: features.append((frame.seq, frame.data.copy())))
+    stats = pipeline.run()
+
+    assert stats["frames_in"] == 32 and stats["frames_out"] == 31 and stats["dropped"] == 0
+    # Block k completes the window ending at sample (k + 1) * block.
+    seq, got = features[5]
+    end = (seq + 1) * block
+    blocks = normalize_signal(data[:, :end].reshape(channels, -1, block).transpose(1, 0, 2))
+    window = blocks.transpose(1, 0, 2).reshape(channels, -1)[:, end - nperseg:]
+    expected, _ = extract_features_batch(window, fs)
+    np.testing.assert_allclose(got, expected, rtol=1e-4, atol=1e-6)
+    assert set(stats["stages"]) == {"normalize", "spectrum", "features"}
+
+
+def test_backpressure_and_drop_policies():
+    data = np.zeros((2, 64 * 40))
+    slow = Pipeline(ArraySource(data, 64), [Sleep(0.002)], queue_size=2, policy="block")
+    stats = slow.run()
+    assert stats["frames_out"] == 40 and stats["dropped"] == 0
+    assert stats["stages"]["sleep"]["queue_high_water"] <= 2
+
+    lossy = Pipeline(ArraySource(data, 64), [Sleep(0.002)], queue_size=2, policy="drop_oldest")
+    stats = lossy.run()
+    assert stats["frames_out"] + stats["dropped"] == 40 and stats["dropped"] > 0
+
+    late = Pipeline(ArraySource(data, 64), [Sleep(0.002), Sleep(0.0)], max_latency=0.001)
+    stats = late.run()
+    assert stats["stages"]["sleep"]["expired"] > 0
+
+
+def test_stage_errors_propagate():
+    class Broken(Stage):
+        def process(self, data, out):
+            raise ValueError("boom")
+
+    with pytest.raises(ValueError, match="boom"):
+        Pipeline(ArraySource(np.zeros((1, 1000)), 10), [Broken()]).run()
+
+
+def test_file_and_socket_replay(tmp_path):
+    pytest.importorskip("sklearn")
+    from spectranova.ml.anomaly import SpectralAnomalyDetector
+
+    fs, channels, block = 4000.0, 3, 200
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal((channels, 20 * block)).astype(np.float32)
+    np.save(tmp_path / "rec.npy", data)
+    train, _ = extract_features_batch(rng.standard_normal((200, 256)), fs)
+    detector = SpectralAnomalyDetector(n_estimators=20, random_state=0).fit(train)
+
+    def stages():
+        return [NormalizeStage(decay=0.99), SpectrumStage(fs), FeatureStage(), AnomalyStage(detector)]
+
+    from_file = []
+    Pipeline(FileReplaySource(tmp_path / "rec.npy", block, fs), stages(),
+             sink=lambda f: from_file.append(f.data.copy())).run()
+
+    left, right = socket.socketpair()
+    sender = threading.Thread(target=lambda: (replay_to_socket(left, data, block), left.close()))
+    sender.start()
+    from_socket = []
+    Pipeline(SocketSource(right, channels, block), stages(),
+             sink=lambda f: from_socket.append(f.data.copy())).run()
+    sender.join()
+    right.close()
+
+    assert len(from_file) == len(from_socket) == 19
+    assert from_file[0].shape == (channels,)
+    np.testing.assert_allclose(np.array(from_file), np.array(from_socket))
+
+
+def test_online_detector_learns_in_pipeline():
+    from spectranova.ml.anomaly import HalfSpaceTrees
+
+    fs, block = 1000.0, 100
+    data = np.random.default_rng(2).standard_normal((8, 30 * block))
+    train, _ = extract_features_batch(np.random.default_rng(3).standard_normal((64, 256)), fs)
+    detector = HalfSpaceTrees(n_trees=5, depth=6, window=32, random_state=0).fit(train)
+    seen = detector.n_seen
+    Pipeline(ArraySource(data, block, fs),
+             [SpectrumStage(fs), FeatureStage(), AnomalyStage(detector, learn=True)]).run()
+    assert detector.n_seen == seen + 8 * 28
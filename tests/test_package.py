@@ -0,0 +1,32 @@
+"""Tests for the lazy package namespaces."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import spectranova
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def test_import_is_lazy():
+    code = (
+        "import sys, spectranova, spectranova.signal, spectranova.ml;"
+        "print(sorted(m for m in ('numpy', 'spectranova.signal.fourier', 'spectranova.ml.features') if m in sys.modules))"
+    )
+    env = dict(os.environ, PYTHONPATH=SRC)
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_lazy_attributes_resolve():
+    from spectranova.signal.fourier import compute_fft
+
+    assert spectranova.compute_fft is compute_fft
+    assert spectranova.signal.compute_fft is compute_fft
+    assert "compute_welch" in dir(spectranova.signal)
+    assert spectranova.wavelet.WAVELETS == ("morlet", "mexh", "paul")
+    with pytest.raises(AttributeError):
+        spectranova.signal.not_there